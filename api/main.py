@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import pandas as pd
 
@@ -6,7 +10,9 @@ from src.app_service import (
     run_random_mode,
     run_forecast_mode,
     run_evaluation_mode,
-    load_model
+    load_model,
+    predict_rainfall,
+    PredictionCache
 )
 
 from src.schema import (
@@ -17,12 +23,33 @@ from src.schema import (
 )
 
 from src.external import build_external_features
-from src.config import MODEL_DIR, RAW_DIR, PROCESS_DIR
+from src.feature_state import load_feature_state
+from src.model import attach_feature_state
+from src.numeric import build_numeric_pipeline, load_feature_order
+from src.profiling import PROFILER, profile_pipeline
+from src.feature_store import open_feature_store
+from src.artifact import is_artifact
+from src.registry import ModelRegistry
+from src.config import (
+    RAW_DIR,
+    PROCESS_DIR,
+    FEATURE_STATE_SNAPSHOT,
+    FLOAT32_FAST_PATH,
+    REGRESSOR_GATE_EPSILON,
+    PROFILING_ENABLED,
+    FEATURE_STORE_DIR,
+    MODEL_VERSIONS,
+    DEFAULT_MODEL_VERSION,
+    MAX_RESIDENT_MODELS,
+    SHADOW_MODEL_VERSION,
+    SHADOW_FRACTION,
+    SHADOW_MAX_PENDING,
+    PREDICTION_CACHE_ENABLED
+)
 
 # ===================================== APP INIT =====================================
 
 app = FastAPI(title="Rainfall Forecasting API")
-_model = load_model(model_path=MODEL_DIR/'xgb_model.pkl')
 
 # ===================================== LOAD EXTERNAL FEATURES ONCE =====================================
 
@@ -37,23 +64,115 @@ external_df = build_external_features(external_sources)
 train = pd.read_csv(PROCESS_DIR/'train.csv')
 test = pd.read_csv(PROCESS_DIR/'test.csv')
 
-train_min_date = train["date"].min()
-train_max_date = train["date"].max()
+# ===================================== ONLINE FEATURE STATE =====================================
+
+feature_state = load_feature_state(FEATURE_STATE_SNAPSHOT, train, test)
+
+# ===================================== MODEL REGISTRY =====================================
+
+@dataclass
+class ServedModel:
+    model: object
+    feature_store: object
+
+
+def load_served_model(path: Path) -> ServedModel:
+    # A converted artifact directory next to the .pkl wins.
+    artifact = path.with_suffix("")
+    model = load_model(model_path=artifact if is_artifact(artifact) else path)
+    model.named_steps["model"].set_params(gate_epsilon=REGRESSOR_GATE_EPSILON)
+    model = attach_feature_state(model, feature_state)
+
+    if FLOAT32_FAST_PATH and "preprocess" in model.named_steps:
+        model = build_numeric_pipeline(model, load_feature_order())
+
+    # Built on first start for this model's feature step, topped up with
+    # any new train/test keys afterwards.
+    feature_store = open_feature_store(
+        FEATURE_STORE_DIR,
+        model.named_steps["features"],
+        pd.concat([train, test]).drop(
+            columns=["daily_rainfall_total_mm"], errors="ignore"
+        )
+    )
+
+    if PROFILING_ENABLED:
+        model = profile_pipeline(model)
+
+    return ServedModel(model, feature_store)
+
+
+registry = ModelRegistry(
+    loader=load_served_model,
+    versions=MODEL_VERSIONS,
+    default=DEFAULT_MODEL_VERSION,
+    max_resident=MAX_RESIDENT_MODELS,
+    shadow=SHADOW_MODEL_VERSION,
+    shadow_fraction=SHADOW_FRACTION,
+    shadow_max_pending=SHADOW_MAX_PENDING
+)
+registry.get()  # fail fast on a broken default model
+
+# Repeated (location, date) and scenario requests skip the pipeline.
+# Entries follow the served model object, so a re-registered or
+# reloaded version never answers from its predecessor's entries.
+prediction_cache = PredictionCache() if PREDICTION_CACHE_ENABLED else None
+
+
+def serve(run, version: str | None, use_feature_store: bool = False,
+          **kwargs):
+    """Run one prediction mode on the requested (or default) version."""
+    try:
+        version = registry.resolve(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    served = registry.get(version)
+    if use_feature_store:
+        kwargs["feature_store"] = served.feature_store
+
+    # The feature frame of this request, reused by the shadow model so
+    # it repeats no HTTP calls and no feature-state updates.
+    frames = []
+    response = run(
+        model=served.model,
+        cache=prediction_cache,
+        version=version,
+        on_features=frames.append,
+        **kwargs
+    )
+    response["meta"]["model_version"] = version
+
+    if frames:
+        X = frames[-1]
+        registry.shadow(
+            lambda shadow: round(predict_rainfall(
+                shadow.model, X,
+                cache=prediction_cache, version=registry.shadow_version
+            ), 3),
+            primary=response["prediction"]["daily_rainfall_mm"],
+            version=version
+        )
+    return response
+
 
 # ===================================== REQUEST SCHEMAS =====================================
 
 class RandomRequest(BaseModel):
     features: dict
+    model_version: Optional[str] = None
 
 
 class ForecastRequest(BaseModel):
     location: str
     date: str
+    model_version: Optional[str] = None
 
 
 class EvaluationRequest(BaseModel):
     location: str
     date: str
+    model_version: Optional[str] = None
 
 # ===================================== ROUTES =====================================
 
@@ -64,8 +183,9 @@ def root():
 
 @app.post("/random", response_model=PredictionResponse)
 def random_mode(req: RandomRequest):
-    return run_random_mode(
-        model=_model,
+    return serve(
+        run_random_mode,
+        req.model_version,
         user_input=req.features,
         external_df=external_df
     )
@@ -73,8 +193,9 @@ def random_mode(req: RandomRequest):
 
 @app.post("/forecast", response_model=PredictionResponse)
 def forecast_mode(req: ForecastRequest):
-    return run_forecast_mode(
-        model=_model,
+    return serve(
+        run_forecast_mode,
+        req.model_version,
         location=req.location,
         date=req.date,
         external_df=external_df
@@ -83,15 +204,40 @@ def forecast_mode(req: ForecastRequest):
 
 @app.post("/evaluate", response_model=PredictionResponse)
 def evaluation_mode(req: EvaluationRequest):
-    return run_evaluation_mode(
-        model=_model,
+    return serve(
+        run_evaluation_mode,
+        req.model_version,
+        use_feature_store=True,
         location=req.location,
         date=req.date,
         external_df=external_df,
         train_df=train,
-        test_df=test
+        test_df=test,
+        feature_state=feature_state
     )
 
+@app.get("/models")
+def get_models():
+    return registry.stats()
+
+@app.get("/cache")
+def get_cache():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/profile")
+def get_profile():
+    if not PROFILING_ENABLED:
+        return {"enabled": False, "steps": []}
+
+    report = PROFILER.report()
+    return {
+        "enabled": True,
+        "steps": report.astype({"output_shape": str}).to_dict("records")
+        if not report.empty else []
+    }
+
 @app.get("/validity")
 def get_validity():
     return {
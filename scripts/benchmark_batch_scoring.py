@@ -0,0 +1,59 @@
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.artifact import export_artifact, load_artifact
+from src.batch_scoring import read_submission, score_batch, submission_frame
+from src.benchmark import synthetic_weather_frame, train_small_pipeline
+from src.model import inference_data
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+N_ROWS = 44 * 365 * 10
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        artifact = export_artifact(train_small_pipeline(), tmp / "model")
+        model = load_artifact(artifact)
+
+        X = synthetic_weather_frame(N_ROWS, seed=7)
+        X.to_csv(tmp / "backfill.csv", index=False)
+
+        start = time.perf_counter()
+        expected = submission_frame(
+            X, inference_data(model, X, return_dataframe=False)
+        )
+        logger.info(
+            "single predict  | %d rows | %.1fs", N_ROWS,
+            time.perf_counter() - start
+        )
+
+        for workers in [1, 2]:
+            output = tmp / f"out_{workers}"
+            stats = score_batch(
+                [tmp / "backfill.csv"], artifact, output,
+                chunksize=50_000, n_workers=workers
+            )
+            scored = read_submission(output)
+            diff = np.abs(scored["prediksi"] - expected["prediksi"]).max()
+            assert (scored["ID (kota)"] == expected["ID (kota)"]).all()
+            assert diff < 1e-4, diff
+            logger.info(
+                "batch %d worker(s) | %d chunks | %.1fs | %.0f rows/sec | "
+                "max |diff| %.1e",
+                workers, stats.chunks, stats.seconds, stats.rows_per_sec, diff
+            )
+
+
+if __name__ == "__main__":
+    main()
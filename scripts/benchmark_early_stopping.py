@@ -0,0 +1,58 @@
+import logging
+import tempfile
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error
+
+from src.artifact import export_artifact, load_artifact
+from src.benchmark import synthetic_weather_frame, time_call
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+N_TRAIN = 50_000
+
+
+def main():
+    df = synthetic_weather_frame(N_TRAIN + 20_000, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    y = df["daily_rainfall_total_mm"]
+    X_train, y_train = X.iloc[:N_TRAIN], y.iloc[:N_TRAIN]
+    X_test, y_test = X.iloc[N_TRAIN:], y.iloc[N_TRAIN:]
+
+    for transform_target in [False, True]:
+        for rounds in [None, 50]:
+            pipe = build_pipeline(
+                transform_target=transform_target,
+                early_stopping_rounds=rounds,
+                profile=False
+            )
+            t_fit, _ = time_call(pipe.fit, X_train, y_train, repeat=1)
+            t_pred, preds = time_call(pipe.predict, X_test, repeat=3)
+
+            model = pipe.named_steps["model"]
+            logger.info(
+                "log-target %-5s | early stopping %-4s | fit %6.2fs | "
+                "predict %7.1f ms | test MAE %.4f | best iterations %s",
+                transform_target, rounds, t_fit, t_pred * 1e3,
+                mean_absolute_error(y_test, preds), model.best_iterations_
+            )
+
+            if rounds is None:
+                continue
+
+            # The exported boosters keep only the rounds that are used.
+            with tempfile.TemporaryDirectory() as tmp:
+                loaded = load_artifact(export_artifact(pipe, tmp))
+                diff = np.abs(loaded.predict(X_test) - preds).max()
+            assert diff < 1e-4, diff
+            logger.info("artifact | max |diff| %.1e", diff)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import logging
+
+import pandas as pd
+
+from src.benchmark import synthetic_weather_frame, time_call
+from src.model import (
+    build_feature_pipeline,
+    build_pipeline,
+    required_feature_columns
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+SIZES = [10_000, 1_000_000]
+
+
+def main():
+    required = required_feature_columns(build_pipeline())
+
+    for n_rows in SIZES:
+        X = synthetic_weather_frame(n_rows)
+
+        chained = build_feature_pipeline().fit(X)
+        fused = build_feature_pipeline(fused=True).fit(X)
+
+        repeat = 5 if n_rows <= 100_000 else 2
+        t_chained, out_chained = time_call(
+            chained.transform, X, repeat=repeat
+        )
+        t_fused, out_fused = time_call(fused.transform, X, repeat=repeat)
+        pruned = fused.set_params(output_cols=required)
+        t_pruned, out_pruned = time_call(
+            pruned.transform, X, repeat=repeat
+        )
+
+        pd.testing.assert_frame_equal(
+            out_chained, out_fused, check_dtype=False, rtol=1e-9
+        )
+        pd.testing.assert_frame_equal(
+            out_chained[required], out_pruned, rtol=1e-9
+        )
+
+        logger.info(
+            "%9d rows | chained %8.3fs | fused %8.3fs | speedup %5.1fx",
+            n_rows, t_chained, t_fused, t_chained / t_fused
+        )
+        logger.info(
+            "%9d rows | pruned to %d consumed columns %8.3fs | "
+            "speedup %5.1fx",
+            n_rows, len(required), t_pruned, t_chained / t_pruned
+        )
+
+
+if __name__ == "__main__":
+    main()
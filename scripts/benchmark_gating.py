@@ -0,0 +1,47 @@
+import logging
+import pickle
+
+import numpy as np
+
+from src.benchmark import synthetic_weather_frame, time_call, train_small_pipeline
+from src.numeric import build_numeric_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+EPSILONS = [1e-4, 1e-3, 1e-2, 5e-2]
+N_TEST = 200_000
+
+
+def main():
+    logger.info("Training benchmark model...")
+    pipe = train_small_pipeline(n_rows=50_000, n_estimators=500)
+    numeric = build_numeric_pipeline(pickle.loads(pickle.dumps(pipe)))
+
+    X_test = synthetic_weather_frame(N_TEST, seed=7)
+    # Time the model stage alone on the prepared float32 matrix.
+    matrix = numeric[:-1].transform(X_test)
+    model = numeric.named_steps["model"]
+    p_rain = model.clf_.predict_proba(matrix)[:, 1]
+
+    model.set_params(gate_epsilon=None)
+    t_base, base = time_call(model.predict, matrix, repeat=3)
+    logger.info("ungated | %d rows | %.3fs", len(matrix), t_base)
+
+    for eps in EPSILONS:
+        model.set_params(gate_epsilon=eps)
+        seconds, gated = time_call(model.predict, matrix, repeat=3)
+        logger.info(
+            "eps %-6g | %5.1f%% rows gated | %.3fs | speedup %.2fx | "
+            "max |diff| %.2e mm",
+            eps, 100 * np.mean(p_rain < eps), seconds, t_base / seconds,
+            np.abs(gated - base).max()
+        )
+
+
+if __name__ == "__main__":
+    main()
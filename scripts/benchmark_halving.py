@@ -0,0 +1,61 @@
+import logging
+import time
+
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.benchmark import synthetic_weather_frame
+from src.config import SEARCH_SPACES_PATH
+from src.cv_cache import CachedGridSearch
+from src.halving import HalvingSearch, load_search_space
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    df = synthetic_weather_frame(20_000, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    rain = df["daily_rainfall_total_mm"]
+
+    for model_type in ["classifier", "two_stage"]:
+        param_grid, settings = load_search_space(SEARCH_SPACES_PATH, model_type)
+        y = (rain > 0.1).astype(int) if model_type == "classifier" else rain
+        cv = TimeSeriesSplit(n_splits=settings["n_splits"])
+        pipe = build_pipeline(model_type=model_type, profile=False)
+
+        start = time.perf_counter()
+        grid = CachedGridSearch(
+            pipe, param_grid, cv, scoring=settings["scoring"]
+        ).fit(X, y)
+        t_grid = time.perf_counter() - start
+
+        halving = HalvingSearch(
+            pipe, param_grid, cv,
+            scoring=settings["scoring"],
+            factor=settings["factor"],
+            min_resource=settings["min_resource"],
+            resource=settings["resource"]
+        ).fit(X, y)
+
+        # Where the halving winner ranks in the exhaustive grid.
+        rank = grid.cv_results_.loc[
+            grid.cv_results_["params"] == halving.best_params_,
+            "rank_test_score"
+        ].iloc[0]
+        logger.info(
+            "%-10s | grid %5.1fs (%d fits) | halving %5.1fs (%d fits) | "
+            "speedup %.1fx | same best: %s (grid rank %d of %d)",
+            model_type, t_grid, len(grid.cv_results_) * cv.n_splits,
+            halving.seconds_, halving.n_fits_, t_grid / halving.seconds_,
+            halving.best_params_ == grid.best_params_, rank,
+            len(grid.cv_results_)
+        )
+
+
+if __name__ == "__main__":
+    main()
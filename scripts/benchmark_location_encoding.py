@@ -0,0 +1,49 @@
+import logging
+
+import numpy as np
+
+from src.benchmark import synthetic_weather_frame, time_call
+from src.model import build_pipeline
+from src.numeric import build_numeric_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    df = synthetic_weather_frame(200_000, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    y = df["daily_rainfall_total_mm"]
+    X_single = X.iloc[[0]]
+
+    for encoding in ["onehot", "native"]:
+        pipe = build_pipeline(
+            fused_features=True,
+            prune_features=True,
+            location_encoding=encoding
+        )
+        pipe.set_params(
+            model__classifier__n_estimators=200,
+            model__regressor__n_estimators=200
+        )
+
+        t_fit, _ = time_call(pipe.fit, X, y, repeat=1)
+        t_batch, preds = time_call(pipe.predict, X, repeat=3)
+        numeric = build_numeric_pipeline(pipe)
+        t_single, _ = time_call(numeric.predict, X_single, repeat=50)
+
+        width = pipe[:-1].transform(X_single).shape[1]
+        logger.info(
+            "%-6s | %2d booster columns | fit %6.2fs | predict %d rows "
+            "%6.3fs | single row (float32 path) %6.2f ms | mean pred %.3f",
+            encoding, width, t_fit, len(X), t_batch, t_single * 1e3,
+            np.mean(preds)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import logging
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.artifact import export_artifact, load_artifact
+from src.benchmark import synthetic_weather_frame, time_call, train_small_pipeline
+from src.numeric import build_numeric_pipeline
+from src.app_service import load_model
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+# Cold start in a fresh interpreter: load + first prediction, after the
+# (shared) imports.
+COLD_START = """
+import time
+from pathlib import Path
+from src.app_service import load_model
+from src.benchmark import synthetic_weather_frame
+from src.numeric import build_numeric_pipeline
+X = synthetic_weather_frame(1)
+start = time.perf_counter()
+model = load_model(Path({path!r}))
+if "preprocess" in model.named_steps:
+    model = build_numeric_pipeline(model)
+model.predict(X)
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(path):
+    out = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(path=str(path))],
+        capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    logger.info("Training benchmark model...")
+    pipe = train_small_pipeline(n_estimators=500)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl = Path(tmp) / "xgb_model.pkl"
+        artifact = Path(tmp) / "xgb_model"
+        joblib.dump(pipe, pkl)
+        export_artifact(joblib.load(pkl), artifact)
+
+        t_pkl, model = time_call(
+            lambda: build_numeric_pipeline(load_model(pkl)), repeat=5
+        )
+        t_art, loaded = time_call(load_model, artifact, repeat=5)
+
+        X = synthetic_weather_frame(10_000, seed=7)
+        diff = np.abs(model.predict(X) - loaded.predict(X)).max()
+
+        logger.info(
+            "load | pickle %.1f ms | artifact %.1f ms | %.1fx | "
+            "max |diff| %.1e",
+            t_pkl * 1e3, t_art * 1e3, t_pkl / t_art, diff
+        )
+        logger.info(
+            "cold start (fresh process, after imports) | pickle %.1f ms | "
+            "artifact %.1f ms",
+            cold_start(pkl) * 1e3, cold_start(artifact) * 1e3
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import logging
+import pickle
+
+import numpy as np
+
+from src.benchmark import (
+    synthetic_weather_frame,
+    time_call,
+    peak_allocation,
+    train_small_pipeline
+)
+from src.numeric import build_numeric_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+SIZES = [1, 100, 100_000]
+
+
+def main():
+    logger.info("Training benchmark model...")
+    pipe = train_small_pipeline()
+    numeric = build_numeric_pipeline(pickle.loads(pickle.dumps(pipe)))
+
+    X_all = synthetic_weather_frame(max(SIZES), seed=7)
+
+    for n_rows in SIZES:
+        X = X_all.iloc[:n_rows]
+        repeat = 50 if n_rows <= 100 else 3
+
+        results = {}
+        for name, model in [("pandas", pipe), ("float32", numeric)]:
+            seconds, preds = time_call(model.predict, X, repeat=repeat)
+            peak = peak_allocation(model.predict, X)
+            results[name] = (seconds, peak, preds)
+
+        deviation = np.abs(results["pandas"][2] - results["float32"][2]).max()
+        for name, (seconds, peak, _) in results.items():
+            logger.info(
+                "%7d rows | %-7s | %9.3f ms/predict | peak alloc %10.1f KiB",
+                n_rows, name, seconds * 1e3, peak / 1024
+            )
+        logger.info("%7d rows | max abs deviation %.2e", n_rows, deviation)
+
+
+if __name__ == "__main__":
+    main()
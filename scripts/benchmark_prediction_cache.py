@@ -0,0 +1,72 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.app_service import PredictionCache, predict_rainfall
+from src.benchmark import synthetic_weather_frame, time_call, train_small_pipeline
+from src.feature_state import FeatureStateStore
+from src.model import attach_feature_state
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+N_ROWS = 20_000
+
+
+def main():
+    history = synthetic_weather_frame(N_ROWS)
+    state = FeatureStateStore().seed(history)
+    model = attach_feature_state(train_small_pipeline(N_ROWS), state)
+
+    # A request for the day after the seeded history, which reads the
+    # state. Cache correctness is covered by tests/test_prediction_cache.py.
+    last = history.iloc[[-1]].copy()
+    request = last.assign(
+        date=(pd.Timestamp(last["date"].iloc[0]) + pd.Timedelta(days=1))
+        .strftime("%Y-%m-%d")
+    )
+
+    cache = PredictionCache(max_entries=1000, ttl_seconds=3600)
+    t_full, _ = time_call(predict_rainfall, model, request, repeat=20)
+    predict_rainfall(model, request, cache=cache, version="v1")
+    t_hit, _ = time_call(
+        predict_rainfall, model, request, cache=cache, version="v1", repeat=20
+    )
+    t_key, _ = time_call(cache.key, "v1", model, request, repeat=20)
+
+    logger.info(
+        "single row | full pipeline %.2f ms | cache hit %.3f ms "
+        "(key %.3f ms) | %.0fx",
+        t_full * 1e3, t_hit * 1e3, t_key * 1e3, t_full / t_hit
+    )
+
+    # Repeat traffic: 2000 requests over 200 distinct (location, date) rows.
+    rng = np.random.default_rng(0)
+    rows = [history.iloc[[i]] for i in rng.integers(0, N_ROWS, 200)]
+    traffic = rng.integers(0, len(rows), 2000)
+    cache = PredictionCache()
+    t_cached, _ = time_call(
+        lambda: [
+            predict_rainfall(model, rows[i], cache=cache, version="v1")
+            for i in traffic
+        ],
+        repeat=1
+    )
+    t_plain, _ = time_call(
+        lambda: [predict_rainfall(model, rows[i]) for i in traffic[:200]],
+        repeat=1
+    )
+    logger.info(
+        "2000 requests | uncached %.2fs (extrapolated) | cached %.2fs | "
+        "hit rate %.2f",
+        t_plain * 10, t_cached, cache.stats()["hit_rate"]
+    )
+
+
+if __name__ == "__main__":
+    main()
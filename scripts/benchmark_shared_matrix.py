@@ -0,0 +1,52 @@
+import logging
+
+import numpy as np
+
+from src.benchmark import synthetic_weather_frame, time_call
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+SIZES = [1, 100, 200_000]
+
+
+def main():
+    df = synthetic_weather_frame(50_000, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    y = df["daily_rainfall_total_mm"]
+    X_test = synthetic_weather_frame(max(SIZES), seed=7)
+
+    for encoding in ["onehot", "native"]:
+        pipe = build_pipeline(location_encoding=encoding, profile=False)
+        pipe.set_params(
+            model__classifier__n_estimators=300,
+            model__regressor__n_estimators=300
+        )
+        pipe.fit(X, y)
+        model = pipe.named_steps["model"]
+
+        for n_rows in SIZES:
+            matrix = pipe[:-1].transform(X_test.iloc[:n_rows])
+            repeat = 50 if n_rows <= 100 else 3
+
+            results = {}
+            for shared in [False, True]:
+                model.set_params(shared_matrix=shared)
+                results[shared] = time_call(model.predict, matrix, repeat=repeat)
+
+            (t_wrapper, wrapper), (t_shared, shared) = results[False], results[True]
+            logger.info(
+                "%-6s | %6d rows | wrapper %8.2f ms | shared %8.2f ms | "
+                "speedup %.2fx | max |diff| %.1e",
+                encoding, n_rows, t_wrapper * 1e3, t_shared * 1e3,
+                t_wrapper / t_shared, np.abs(wrapper - shared).max()
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import logging
+import time
+
+import numpy as np
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.benchmark import synthetic_weather_frame
+from src.cv_cache import FoldFeatureCache, cached_cross_val_score, split_pipeline
+from src.cv_runner import ThreadBudget, available_cores
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+N_SPLITS = 5
+
+
+def main():
+    df = synthetic_weather_frame(40_000, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    y = df["daily_rainfall_total_mm"]
+
+    pipe = build_pipeline(profile=False)
+    pipe.set_params(
+        model__classifier__n_estimators=200,
+        model__regressor__n_estimators=200
+    )
+    cv = TimeSeriesSplit(n_splits=N_SPLITS)
+
+    # Fold matrices are computed once so only the model fits are timed.
+    cache = FoldFeatureCache(split_pipeline(pipe)[0], cv)
+    cache.folds(X, y)
+
+    n_cores = len(available_cores())
+    start = time.perf_counter()
+    baseline = cached_cross_val_score(
+        pipe, X, y, cv, scoring="neg_mean_squared_error",
+        n_jobs=-1, cache=cache
+    )
+    seconds = time.perf_counter() - start
+    logger.info(
+        "n_jobs=-1 everywhere | %d cores | %.1fs | %.0f fits/hour",
+        n_cores, seconds, N_SPLITS / seconds * 3600
+    )
+
+    plans = {
+        "auto": ThreadBudget(),
+        "1 fit x all threads": ThreadBudget(threads_per_fit=n_cores),
+        "pinned auto": ThreadBudget(pin=True),
+    }
+    for name, budget in plans.items():
+        scores = cached_cross_val_score(
+            pipe, X, y, cv, scoring="neg_mean_squared_error",
+            cache=cache, budget=budget
+        )
+        stats = budget.stats_
+        logger.info(
+            "%-20s | %d workers x %d threads | %.1fs | %.0f fits/hour | "
+            "max |score diff| %.1e",
+            name, stats.workers, stats.threads_per_fit, stats.seconds,
+            stats.fits_per_hour, np.abs(scores - baseline).max()
+        )
+
+
+if __name__ == "__main__":
+    main()
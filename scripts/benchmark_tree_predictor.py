@@ -0,0 +1,54 @@
+import logging
+import pickle
+
+import numpy as np
+
+from src.benchmark import synthetic_weather_frame, time_call, train_small_pipeline
+from src.numeric import build_numeric_pipeline
+from src.tree_predictor import compile_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+SIZES = [1, 10, 1000, 100_000]
+
+
+def main():
+    logger.info("Training benchmark model...")
+    pipe = train_small_pipeline()
+    numeric = build_numeric_pipeline(pickle.loads(pickle.dumps(pipe)))
+    compiled = compile_pipeline(numeric)
+
+    X_all = synthetic_weather_frame(max(SIZES), seed=7)
+    model = numeric.named_steps["model"]
+    tables = compiled.named_steps["model"]
+
+    for n_rows in SIZES:
+        matrix = numeric[:-1].transform(X_all.iloc[:n_rows])
+        repeat = 200 if n_rows <= 10 else 3
+
+        t_booster, booster = time_call(model.predict, matrix, repeat=repeat)
+        t_numpy, numpy = time_call(tables.predict, matrix, repeat=repeat)
+        # Parity is tested in tests/test_tree_predictor.py.
+        logger.info(
+            "%6d rows | booster %9.3f ms | numpy %9.3f ms | speedup %5.2fx "
+            "| max |diff| %.1e mm",
+            n_rows, t_booster * 1e3, t_numpy * 1e3, t_booster / t_numpy,
+            np.abs(booster - numpy).max()
+        )
+
+    X = X_all.iloc[[0]]
+    t_booster, _ = time_call(numeric.predict, X, repeat=200)
+    t_numpy, _ = time_call(compiled.predict, X, repeat=200)
+    logger.info(
+        "end to end single row | booster %.3f ms | numpy %.3f ms",
+        t_booster * 1e3, t_numpy * 1e3
+    )
+
+
+if __name__ == "__main__":
+    main()
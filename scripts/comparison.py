@@ -2,13 +2,16 @@ import pandas as pd
 from pathlib import Path
 import joblib
 
-from src.config import CLEAN_DIR, MODEL_DIR
+from src.config import CLEAN_DIR, MODEL_DIR, FEATURE_STORE_DIR
+from src.feature_store import open_feature_store
 
 train = pd.read_csv(CLEAN_DIR/'train_1226.csv')
 nea = pd.read_csv(CLEAN_DIR/'nea.csv')
 
 model = joblib.load(MODEL_DIR/'xgb_model_1226.pkl')
-train['predicted_mm'] = model.predict(train.drop(columns=['daily_rainfall_total_mm']))
+X = train.drop(columns=['daily_rainfall_total_mm'])
+store = open_feature_store(FEATURE_STORE_DIR, model.named_steps['features'], X)
+train['predicted_mm'] = model[1:].predict(store.get_frame(X))
 
 train = train[['date', 'location', 'daily_rainfall_total_mm', "predicted_mm"]]
 
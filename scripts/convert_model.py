@@ -0,0 +1,42 @@
+import argparse
+import logging
+from pathlib import Path
+
+import joblib
+
+from src.artifact import export_artifact
+from src.config import MODEL_DIR, MODEL_ARTIFACT_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Convert a pickled pipeline into a model artifact "
+                    "directory (native boosters + manifest)."
+    )
+    parser.add_argument(
+        "model", nargs="?", default=MODEL_DIR / "xgb_model.pkl",
+        help="Pickled sklearn pipeline"
+    )
+    parser.add_argument("--output", default=MODEL_ARTIFACT_DIR)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    model = joblib.load(args.model)
+    path = export_artifact(model, Path(args.output))
+
+    size = sum(f.stat().st_size for f in path.iterdir())
+    logger.info("Wrote %s (%.1f MB)", path, size / 2**20)
+
+
+if __name__ == "__main__":
+    main()
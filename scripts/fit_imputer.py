@@ -0,0 +1,65 @@
+import argparse
+import logging
+import time
+
+import joblib
+
+from src.config import (
+    CLEAN_DIR,
+    MODEL_DIR,
+    SKETCH_CHUNKSIZE,
+    SKETCH_RELATIVE_ACCURACY
+)
+from src.sketch import fit_imputer_out_of_core
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fit the structural imputer out of core from "
+                    "partitioned files using mergeable median sketches."
+    )
+    parser.add_argument(
+        "inputs", nargs="*", default=[CLEAN_DIR / "train_1226.csv"],
+        help="CSV/Parquet files or directories of partitions"
+    )
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument("--chunksize", type=int, default=SKETCH_CHUNKSIZE)
+    parser.add_argument(
+        "--relative-accuracy", type=float, default=SKETCH_RELATIVE_ACCURACY
+    )
+    parser.add_argument(
+        "--output", default=MODEL_DIR / "structural_imputer.pkl"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    logger.info("Sketching %d source(s)...", len(args.inputs))
+    start = time.perf_counter()
+    imputer = fit_imputer_out_of_core(
+        args.inputs,
+        n_jobs=args.n_jobs,
+        chunksize=args.chunksize,
+        relative_accuracy=args.relative_accuracy,
+        exclude=["daily_rainfall_total_mm"]
+    )
+    logger.info(
+        "Fitted medians for %d locations x %d columns in %.1fs",
+        *imputer.loc_median_.shape, time.perf_counter() - start
+    )
+
+    joblib.dump(imputer, args.output)
+    logger.info("Imputer saved to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import logging
+
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.config import (
+    CLEAN_DIR,
+    CV_CACHE_DIR,
+    CV_CORES,
+    CV_THREADS_PER_FIT,
+    CV_PIN_CPUS,
+    SEARCH_SPACES_PATH
+)
+from src.cv_runner import ThreadBudget
+from src.halving import HalvingSearch, load_search_space
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Successive-halving hyperparameter search over "
+                    "boosting rounds and training rows."
+    )
+    parser.add_argument(
+        "--model", choices=["classifier", "two_stage"], default="two_stage"
+    )
+    parser.add_argument("--space", default=SEARCH_SPACES_PATH,
+                        help="Search-space TOML file")
+    parser.add_argument("--data", default=CLEAN_DIR / "train_1226.csv")
+    parser.add_argument("--output", default=None,
+                        help="CSV file for the per-rung results")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    param_grid, settings = load_search_space(args.space, args.model)
+
+    train = pd.read_csv(args.data)
+    train.sort_values(["date", "location"], inplace=True)
+
+    X = train.drop(columns=["daily_rainfall_total_mm"])
+    y = train["daily_rainfall_total_mm"].fillna(0)
+    if args.model == "classifier":
+        y = (y > 0.1).astype(int)
+
+    search = HalvingSearch(
+        build_pipeline(model_type=args.model),
+        param_grid,
+        cv=TimeSeriesSplit(n_splits=settings.get("n_splits", 3)),
+        scoring=settings["scoring"],
+        factor=settings.get("factor", 3),
+        min_resource=settings.get("min_resource", 1 / 9),
+        resource=settings.get("resource", "both"),
+        n_candidates=settings.get("n_candidates"),
+        cache_dir=CV_CACHE_DIR,
+        budget=ThreadBudget(CV_CORES, CV_THREADS_PER_FIT, pin=CV_PIN_CPUS)
+    ).fit(X, y)
+
+    logger.info(
+        "%d fits in %.1fs; best %s = %.5f with %s",
+        search.n_fits_, search.seconds_, settings["scoring"],
+        search.best_score_, json.dumps(search.best_params_)
+    )
+    if args.output:
+        search.cv_results_.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
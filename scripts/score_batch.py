@@ -0,0 +1,64 @@
+import argparse
+import logging
+import os
+
+from src.artifact import is_artifact
+from src.batch_scoring import score_batch
+from src.config import (
+    CLEAN_DIR,
+    INFERENCE_BACKEND,
+    INFERENCE_DIR,
+    MODEL_ARTIFACT_DIR,
+    MODEL_DIR,
+    SKETCH_CHUNKSIZE
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Score CSV/Parquet inputs in chunks on a process pool "
+                    "and write submission-schema parts per year."
+    )
+    parser.add_argument(
+        "inputs", nargs="*", default=[CLEAN_DIR / "test.csv"],
+        help="Files or directories of partitions, sorted by date"
+    )
+    parser.add_argument(
+        "--model",
+        default=(MODEL_ARTIFACT_DIR if is_artifact(MODEL_ARTIFACT_DIR)
+                 else MODEL_DIR / "xgb_model.pkl"),
+        help="Artifact directory or pickled pipeline"
+    )
+    parser.add_argument("--output", default=INFERENCE_DIR / "batch")
+    parser.add_argument("--chunksize", type=int, default=SKETCH_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument(
+        "--backend", choices=["booster", "numpy"], default=INFERENCE_BACKEND
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    score_batch(
+        args.inputs,
+        model_path=args.model,
+        output_dir=args.output,
+        chunksize=args.chunksize,
+        n_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        backend=args.backend
+    )
+    logger.info("Submission parts written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
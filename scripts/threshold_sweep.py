@@ -0,0 +1,103 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.app_service import load_model
+from src.artifact import is_artifact
+from src.config import (
+    CLEAN_DIR,
+    MODEL_ARTIFACT_DIR,
+    MODEL_DIR,
+    PROCESS_DIR
+)
+from src.thresholds import OVERALL, best_threshold, gating_threshold, threshold_sweep
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Precision/recall/F1 of the rain classifier for every "
+                    "probability cut, per location and overall."
+    )
+    parser.add_argument("--data", default=CLEAN_DIR / "train_1226.csv")
+    parser.add_argument(
+        "--model",
+        default=(MODEL_ARTIFACT_DIR if is_artifact(MODEL_ARTIFACT_DIR)
+                 else MODEL_DIR / "xgb_model.pkl")
+    )
+    parser.add_argument(
+        "--holdout-fraction", type=float, default=0.2,
+        help="Evaluate on the most recent share of the rows"
+    )
+    parser.add_argument("--thresholds", type=int, default=101,
+                        help="Evenly spaced cuts in [0, 1]; 0 = every score")
+    parser.add_argument("--metric", default="f1")
+    parser.add_argument(
+        "--min-recall", type=float, default=0.99,
+        help="Rain recall the suggested gate_epsilon must keep"
+    )
+    parser.add_argument("--output", default=PROCESS_DIR / "threshold_sweep.csv")
+    return parser.parse_args()
+
+
+def rain_probability(model, X):
+    final = model.steps[-1][1]
+    if hasattr(final, "predict_rain_proba"):
+        return final.predict_rain_proba(model[:-1].transform(X))
+    return model.predict_proba(X)[:, 1]
+
+
+def main():
+    args = parse_args()
+
+    data = pd.read_csv(args.data)
+    data.sort_values(["date", "location"], inplace=True)
+    data = data.iloc[int(len(data) * (1 - args.holdout_fraction)):]
+
+    model = load_model(args.model)
+    X = data.drop(columns=["daily_rainfall_total_mm"])
+    rain_threshold = getattr(model.steps[-1][1], "rain_threshold", 0.1)
+    y = data["daily_rainfall_total_mm"].fillna(0).to_numpy() > rain_threshold
+
+    proba = rain_probability(model, X)
+    sweep = threshold_sweep(
+        y, proba, thresholds=args.thresholds or None, groups=X["location"]
+    )
+    sweep.to_csv(args.output, index=False)
+    logger.info("Sweep of %d rows written to %s", len(X), args.output)
+
+    best = best_threshold(sweep, metric=args.metric).set_index("location")
+    gate = gating_threshold(sweep, min_recall=args.min_recall).set_index("location")
+
+    overall = best.loc[OVERALL]
+    logger.info(
+        "Best %s cut overall: %.3f (precision %.3f, recall %.3f, f1 %.3f)",
+        args.metric, overall["threshold"], overall["precision"],
+        overall["recall"], overall["f1"]
+    )
+    if OVERALL in gate.index:
+        logger.info(
+            "Suggested gate_epsilon: %.3f (recall %.4f, %.1f%% of rows "
+            "skip the regressor)",
+            gate.loc[OVERALL, "threshold"], gate.loc[OVERALL, "recall"],
+            100 * (1 - gate.loc[OVERALL, "positive_rate"])
+        )
+
+    per_location = best.drop(index=OVERALL)[["threshold", "precision", "recall", args.metric]]
+    print(per_location.to_string())
+    logger.info(
+        "Per-location best cuts range %.3f-%.3f",
+        np.nanmin(per_location["threshold"]), np.nanmax(per_location["threshold"])
+    )
+
+
+if __name__ == "__main__":
+    main()
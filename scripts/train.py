@@ -1,7 +1,7 @@
 from warnings import filterwarnings
 filterwarnings('ignore')
 
-from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
 import joblib
@@ -12,6 +12,16 @@ from pathlib import Path
 from src.config import (
     CLEAN_DIR,
     INFERENCE_DIR,
+    MODEL_DIR,
+    FEATURE_ORDER_PATH,
+    CV_CACHE_DIR,
+    CV_CORES,
+    CV_THREADS_PER_FIT,
+    CV_PIN_CPUS,
+    PROFILING_ENABLED,
+    PROFILE_REPORT_PATH,
+    EARLY_STOPPING_ROUNDS,
+    VALIDATION_FRACTION,
 )
 from src.model import (
     build_feature_pipeline,
@@ -19,6 +29,11 @@ from src.model import (
     build_model,
     build_pipeline
 )
+from src.numeric import save_feature_order
+from src.cv_cache import cached_cross_val_score
+from src.cv_runner import ThreadBudget
+from src.profiling import PROFILER, strip_profiling
+from src.batch_scoring import submission_frame
 
 print("Loading data...")
 train = pd.read_csv(CLEAN_DIR / "train_1226.csv")
@@ -34,42 +49,60 @@ train.sort_values(["date", "location"], inplace=True)
 X = train.drop(columns=["daily_rainfall_total_mm"])
 y = train["daily_rainfall_total_mm"].fillna(0)
 
-pipe = build_pipeline(model_type='two_stage')
+pipe = build_pipeline(
+    model_type='two_stage',
+    early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+    validation_fraction=VALIDATION_FRACTION
+)
 
 tscv = TimeSeriesSplit(n_splits=5)
 
+# Folds and XGBoost threads share one core budget instead of both using
+# every core.
+budget = ThreadBudget(CV_CORES, CV_THREADS_PER_FIT, pin=CV_PIN_CPUS)
+
 print("Cross validating...")
-scores = cross_val_score(
+scores = cached_cross_val_score(
     pipe,
     X,
     y,
     cv=tscv,
     scoring="neg_mean_squared_error",
-    n_jobs=-1
+    cache_dir=CV_CACHE_DIR,
+    budget=budget
 )
 
 print("MSE per fold:", -scores)
 print("Mean MSE:", -scores.mean())
+print(
+    f"{budget.stats_.fits_per_hour:.0f} fits/hour "
+    f"({budget.stats_.workers} workers x "
+    f"{budget.stats_.threads_per_fit} threads)"
+)
 
 print("Fitting final model...")
 pipe.fit(X, y)
 
 y_pred = pipe.predict(X)
 
+print("Best iterations:", pipe.named_steps["model"].best_iterations_)
+
 print("Mean Absolute Error :", mean_absolute_error(y, y_pred))
 print("Mean Squared Error  :", mean_squared_error(y, y_pred))
 
 test = pd.read_csv(CLEAN_DIR / "test.csv")
 
-test['prediksi'] = pipe.predict(test.drop(columns=['daily_rainfall_total_mm']))
-test['date'] = pd.to_datetime(test['date'])
-test['tahun'] = test['date'].dt.year
-test['bulan'] = test['date'].dt.month
-test['hari'] = test['date'].dt.day
-test['ID (kota)'] = (
-    test['location'].str.lower() + "_" + test['date'].dt.strftime("%Y_%m_%d")
+X_test = test.drop(columns=['daily_rainfall_total_mm'])
+submission_frame(X_test, pipe.predict(X_test)).to_csv(
+    INFERENCE_DIR / 'submission_1226.csv', index=False
 )
 
-test[['ID (kota)', 'tahun', 'bulan', 'hari', 'prediksi']].to_csv(INFERENCE_DIR/'submission_1226.csv', index=False)
+if PROFILING_ENABLED:
+    report = PROFILER.report()
+    print(report.to_string())
+    report.to_csv(PROFILE_REPORT_PATH, index=False)
+    strip_profiling(pipe)
+
 # joblib.dump(pipe, MODEL_DIR/'xgb_model_1226.pkl')
+# save_feature_order(pipe, FEATURE_ORDER_PATH)
 # print("Model saved!")
\ No newline at end of file
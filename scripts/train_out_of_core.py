@@ -0,0 +1,76 @@
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from src.artifact import export_artifact
+from src.config import (
+    MODEL_DIR,
+    PARTITIONS_DIR,
+    SKETCH_CHUNKSIZE,
+    XGB_CACHE_DIR
+)
+from src.out_of_core import list_partitions, train_out_of_core, write_partitions
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Train the two-stage model from per-location/year "
+                    "partitions through XGBoost external memory."
+    )
+    parser.add_argument("--partitions", default=PARTITIONS_DIR)
+    parser.add_argument(
+        "--split", nargs="*", default=None,
+        help="CSV/Parquet sources to (re)write into --partitions first"
+    )
+    parser.add_argument("--cache-dir", default=XGB_CACHE_DIR)
+    parser.add_argument("--chunksize", type=int, default=SKETCH_CHUNKSIZE)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument(
+        "--location-encoding", choices=["onehot", "native"], default="onehot"
+    )
+    parser.add_argument("--transform-target", action="store_true")
+    parser.add_argument("--output", default=MODEL_DIR / "xgb_model_ooc")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.split:
+        start = time.perf_counter()
+        written = write_partitions(args.split, args.partitions, args.chunksize)
+        logger.info(
+            "Wrote %d partitions in %.1fs", len(written),
+            time.perf_counter() - start
+        )
+
+    partitions = list_partitions(args.partitions)
+    if not partitions:
+        raise SystemExit(f"No partitions under {args.partitions}")
+
+    logger.info("Training on %d partitions...", len(partitions))
+    start = time.perf_counter()
+    model = train_out_of_core(
+        partitions,
+        cache_dir=args.cache_dir,
+        transform_target=args.transform_target,
+        location_encoding=args.location_encoding,
+        chunksize=args.chunksize,
+        n_jobs=args.n_jobs
+    )
+    logger.info("Trained in %.1fs", time.perf_counter() - start)
+
+    path = export_artifact(model, Path(args.output))
+    logger.info("Artifact saved to %s", path)
+
+
+if __name__ == "__main__":
+    main()
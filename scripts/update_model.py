@@ -0,0 +1,118 @@
+import argparse
+import logging
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.artifact import export_artifact, is_artifact, load_artifact, read_manifest
+from src.config import (
+    CLEAN_DIR,
+    EARLY_STOPPING_ROUNDS,
+    MAX_ADDED_ROUNDS,
+    MODEL_ARTIFACT_DIR,
+    VALIDATION_FRACTION
+)
+from src.incremental import continue_boosting, full_retrain_reason, new_rows
+from src.model import build_pipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(message)s",
+    datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+TARGET_COL = "daily_rainfall_total_mm"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Refresh the model artifact with newly appended days: "
+                    "continue boosting on the new window, or retrain fully "
+                    "when one is due."
+    )
+    parser.add_argument("--data", default=CLEAN_DIR / "train_1226.csv")
+    parser.add_argument("--artifact", default=MODEL_ARTIFACT_DIR)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ADDED_ROUNDS)
+    parser.add_argument("--full", action="store_true",
+                        help="Retrain from scratch regardless of schedule")
+    return parser.parse_args()
+
+
+def replace_artifact(model, path: Path, training: dict):
+    """Write the new artifact next to the old one, then swap directories."""
+    path = Path(path)
+    staging = export_artifact(
+        model, path.with_name(path.name + ".new"), training=training
+    )
+    if path.exists():
+        retired = path.with_name(path.name + ".old")
+        shutil.rmtree(retired, ignore_errors=True)
+        path.rename(retired)
+        staging.rename(path)
+        shutil.rmtree(retired)
+    else:
+        staging.rename(path)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+
+    train = pd.read_csv(args.data)
+    train.sort_values(["date", "location"], inplace=True)
+    X = train.drop(columns=[TARGET_COL])
+    y = train[TARGET_COL].fillna(0)
+    through = str(pd.to_datetime(X["date"]).max().date())
+
+    training = (
+        read_manifest(args.artifact).get("training", {})
+        if is_artifact(args.artifact) else {}
+    )
+    reason = "requested" if args.full else full_retrain_reason(
+        training, through, max_rounds=args.max_rounds
+    )
+
+    if reason is None:
+        window, context = new_rows(X, training["trained_through"])
+        if window.empty:
+            logger.info("No rows after %s; nothing to do",
+                        training["trained_through"])
+            return
+
+        model, added = continue_boosting(
+            load_artifact(args.artifact), window, y.loc[window.index],
+            context=context, max_rounds=args.max_rounds
+        )
+        training = {
+            **training,
+            "trained_through": through,
+            "added_rounds": training.get("added_rounds", 0)
+            + max(added.values()),
+        }
+        logger.info(
+            "Continued boosting on %d new rows (%s): %s rounds added",
+            len(window), through, added
+        )
+    else:
+        logger.info("Full retrain (%s) on %d rows", reason, len(X))
+        model = build_pipeline(
+            model_type="two_stage",
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            validation_fraction=VALIDATION_FRACTION
+        ).fit(X, y)
+        training = {
+            "trained_through": through,
+            "last_full_retrain": through,
+            "added_rounds": 0,
+        }
+
+    replace_artifact(model, args.artifact, training)
+    logger.info("Artifact %s updated in %.1fs", args.artifact,
+                time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
 import pandas as pd
 import joblib
 from pathlib import Path
@@ -5,30 +11,233 @@ from fastapi import HTTPException
 
 from src.pipeline import build_features_from_api
 from src.external import get_external_features_for_date, build_external_features
-from src.model import inference_data
+from src.model import inference_data, prune_feature_pipeline
+from src.artifact import is_artifact, load_artifact
 from src.observed import get_observed_daily_rainfall
 
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from src.config import RAW_DIR, PROCESS_DIR, MODEL_DIR
+from src.config import (
+    RAW_DIR,
+    PROCESS_DIR,
+    MODEL_DIR,
+    INFERENCE_BACKEND,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL
+)
 
-def load_model(model_path: Path):
+def load_model(model_path: Path, prune_features: bool = True):
     if not model_path.exists():
         raise FileNotFoundError(f"Model not found at {model_path}")
 
+    # Artifact directories are already fused, pruned and float32.
+    if is_artifact(model_path):
+        return load_artifact(model_path)
+
     model = joblib.load(model_path)
+
+    if prune_features:
+        model = prune_feature_pipeline(model)
+
     return model
 
+
+# Key namespace of cached NEA observations in a ``PredictionCache``.
+OBSERVED = "__observed__"
+
+
+def feature_fingerprint(X: pd.DataFrame) -> str:
+    """
+    Hash of the column names and values of ``X``. Meant for request-sized
+    frames: the exact repr of each value is cheaper than
+    ``hash_pandas_object`` on a few wide rows.
+    """
+    return hashlib.blake2b(
+        repr((list(X.columns), X.to_numpy(dtype=object).tolist())).encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+def _feature_state(model):
+    """The ``FeatureStateStore`` the model's feature step reads, if any."""
+    params = model.named_steps["features"].get_params(deep=True)
+    return next((
+        value for key, value in params.items()
+        if (key == "state" or key.endswith("__state"))
+        and hasattr(value, "history")
+    ), None)
+
+
+class PredictionCache:
+    """
+    LRU cache of single-row predictions keyed by model version and a
+    hash of the final feature row. External features are part of that
+    row, so a swapped external table never hits old entries.
+
+    Entries expire after ``ttl_seconds``; at most ``max_entries`` are
+    kept, and since each is a short key and one float that also bounds
+    memory. Past-day NEA observations share the cache under the
+    ``OBSERVED`` key namespace.
+
+    A version's entries are dropped once it is served by another model
+    object (re-registered or reloaded), and the key carries the
+    feature-state revision of the row's location, so new observations
+    invalidate the forecasts that read them.
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE,
+                 ttl_seconds: float = PREDICTION_CACHE_TTL,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._models = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _bind(self, version, model):
+        with self._lock:
+            bound = self._models.get(version)
+            if bound is not None and bound[0]() is model:
+                return bound[1], bound[2]
+
+            generation = 0
+            if bound is not None:
+                generation = bound[1] + 1
+                self._drop(version)
+            state = _feature_state(model)
+            self._models[version] = (weakref.ref(model), generation, state)
+            return generation, state
+
+    def _drop(self, version=None):
+        stale = [
+            key for key in self._entries
+            if version is None or key[0] == version
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def key(self, version: str, model, X: pd.DataFrame) -> tuple:
+        generation, state = self._bind(version, model)
+        revision = ()
+        if state is not None and "location" in X.columns:
+            revision = state.revision(X["location"].tolist())
+        return version, generation, revision, feature_fingerprint(X)
+
+    def get(self, key):
+        """Cached value for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version: str | None = None):
+        """Drop the entries of ``version``, or all of them."""
+        with self._lock:
+            self._drop(version)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def predict_rainfall(model, X: pd.DataFrame, cache=None, version=None,
+                     predict=None) -> float:
+    """
+    Prediction for the single row ``X``, through ``cache`` when given.
+    ``predict()`` replaces the full-pipeline call (e.g. feature-store
+    rows); it must give the same value for the same ``X``.
+    """
+    if predict is None:
+        def predict():
+            return inference_data(
+                model, X, return_dataframe=False, backend=INFERENCE_BACKEND
+            )[0]
+
+    if cache is None:
+        return float(predict())
+
+    key = cache.key(version, model, X)
+    value = cache.get(key)
+    if value is None:
+        value = float(predict())
+        cache.put(key, value)
+    return value
+
+
 def get_last_observed_date_sg():
     now_sg = datetime.now(ZoneInfo("Asia/Singapore"))
     return (now_sg.date() - timedelta(days=1)).strftime("%Y-%m-%d")
 
 
+def observed_rainfall(location: str, date: str,
+                      cache: PredictionCache | None = None) -> float | None:
+    """
+    NEA rainfall (mm) at the station nearest ``location`` on ``date``,
+    None when there is none. Totals of past days are final, so they go
+    through ``cache`` (same TTL and LRU bound as predictions).
+    """
+    date = pd.Timestamp(date).strftime("%Y-%m-%d")
+    key = (OBSERVED, location, date)
+    final = cache is not None and date <= get_last_observed_date_sg()
+    if final:
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    observed_df = get_observed_daily_rainfall(location, date)
+    if observed_df.empty:
+        return None
+
+    value = float(observed_df["daily_rainfall_total_mm"].iloc[0])
+    if final:
+        cache.put(key, value)
+    return value
+
+
 def run_random_mode(
     model,
     user_input: dict,
-    external_df: pd.DataFrame
+    external_df: pd.DataFrame,
+    cache: PredictionCache | None = None,
+    version: str | None = None,
+    on_features=None
 ) -> pd.DataFrame:
     if "date" not in user_input:
         raise ValueError("Random mode requires 'date' for external features.")
@@ -43,14 +252,15 @@ def run_random_mode(
     )
     X = X.assign(**external_feats)
 
-    result = inference_data(model, X)
-    result["feature_source"] = "random_user_input"
+    if on_features is not None:
+        on_features(X)
+    pred_mm = predict_rainfall(model, X, cache=cache, version=version)
 
     return format_response(
         mode="random",
         location=user_input['location'],
         date=date,
-        pred_mm=result["predicted_daily_rainfall_mm"].iloc[0],
+        pred_mm=pred_mm,
         feature_source="random_user_input",
         external_month_used=external_feats.get("external_month"),
         notes=["Scenario-based prediction"]
@@ -77,7 +287,10 @@ def run_forecast_mode(
     model,
     location: str,
     date: str,
-    external_df: pd.DataFrame
+    external_df: pd.DataFrame,
+    cache: PredictionCache | None = None,
+    version: str | None = None,
+    on_features=None
 ) -> pd.DataFrame:
     validate_forecast_date(date)
 
@@ -90,12 +303,14 @@ def run_forecast_mode(
 
     X = X.assign(**external_feats)
 
-    result = inference_data(model, X)
+    if on_features is not None:
+        on_features(X)
+    pred_mm = predict_rainfall(model, X, cache=cache, version=version)
     return format_response(
         mode="forecast",
         location=location,
         date=date,
-        pred_mm=result["predicted_daily_rainfall_mm"].iloc[0],
+        pred_mm=pred_mm,
         feature_source="open_meteo",
         external_month_used=external_feats.get("external_month"),
         notes=["Forecast limited to short-term weather window"]
@@ -109,6 +324,11 @@ def run_evaluation_mode(
     external_df: pd.DataFrame,
     train_df: pd.DataFrame | None = None,
     test_df: pd.DataFrame | None = None,
+    feature_state=None,
+    feature_store=None,
+    cache: PredictionCache | None = None,
+    version: str | None = None,
+    on_features=None
 ) -> pd.DataFrame:
     feature_source = None
 
@@ -156,27 +376,39 @@ def run_evaluation_mode(
         X = X.assign(**external_feats)
         feature_source = "open_meteo"
 
-    pred_df = inference_data(model, X)
-    observed_df = get_observed_daily_rainfall(location, date)
-    if observed_df.empty:
+        # Past-date Open-Meteo rows are observations; keep the online
+        # lag/rolling state current with them.
+        if feature_state is not None:
+            feature_state.update(X)
+
+    predict = None
+    if (
+        feature_source == "train_dataset"
+        and feature_store is not None
+        and feature_store.contains(location, date)
+    ):
+        # Materialized features: only the preprocessor and model run.
+        def predict():
+            return inference_data(
+                model[1:],
+                feature_store.get([location], [date]),
+                return_dataframe=False,
+                backend=INFERENCE_BACKEND
+            )[0]
+
+    if on_features is not None:
+        on_features(X)
+    pred_mm = predict_rainfall(
+        model, X, cache=cache, version=version, predict=predict
+    )
+
+    obs_mm = observed_rainfall(location, date, cache=cache)
+    if obs_mm is None:
         raise HTTPException(
             status_code=404,
             detail="Observed rainfall not available for this date"
         )
 
-    result = pred_df.copy()
-    result["observed_daily_rainfall_mm"] = (
-        observed_df["daily_rainfall_total_mm"].iloc[0]
-    )
-    result["error_mm"] = (
-        result["predicted_daily_rainfall_mm"]
-        - result["observed_daily_rainfall_mm"]
-    )
-    result["feature_source"] = feature_source
-
-    pred_mm = pred_df["predicted_daily_rainfall_mm"].iloc[0]
-    obs_mm = observed_df["daily_rainfall_total_mm"].iloc[0]
-
     return format_response(
         mode="evaluation",
         location=location,
@@ -0,0 +1,241 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier, XGBRegressor
+
+from src.features import FusedFeatures
+from src.model import TwoStageRainfallModel, _iteration_range
+from src.numeric import NumericFeatureMatrix, build_numeric_pipeline
+
+ARTIFACT_FORMAT = 1
+MANIFEST = "manifest.json"
+
+# Target transforms an artifact can restore, by name.
+TARGET_TRANSFORMS = {
+    "log1p": (np.log1p, np.expm1),
+}
+
+
+def _target_transform(regressor):
+    if not isinstance(regressor, TransformedTargetRegressor):
+        return None
+    for name, (func, inverse) in TARGET_TRANSFORMS.items():
+        if regressor.func is func and regressor.inverse_func is inverse:
+            return name
+    raise ValueError("Only log1p/expm1 target transforms can be exported")
+
+
+def _booster_of(estimator):
+    if isinstance(estimator, TransformedTargetRegressor):
+        estimator = estimator.regressor_
+    return estimator
+
+
+def export_artifact(model: Pipeline, path: Path,
+                    training: dict | None = None) -> Path:
+    """
+    Write a fitted pipeline as a model artifact directory:
+
+    - ``manifest.json``: feature step parameters, booster input layout
+      (``feature_order``) and two-stage settings,
+    - ``medians.npy`` / ``global_median.npy``: imputer medians, and
+      ``median_matrix.npy``: the dense (location + 1, column) matrix the
+      imputer reads, loaded memory-mapped and used in place so workers
+      share its pages,
+    - ``classifier.ubj`` / ``regressor.ubj``: XGBoost native boosters,
+      cut to the best iteration when trained with early stopping, and
+      their training parameters (``*.config.json``) so boosting can be
+      continued with the same settings.
+
+    ``training`` (e.g. the last date trained on) is kept in the manifest
+    for incremental updates.
+
+    No pickles, so loading does not depend on the sklearn version.
+    ``model`` may also be a numeric pipeline (``NumericFeatureMatrix`` +
+    two-stage model), e.g. a loaded artifact or an out-of-core fit.
+    """
+    numeric = (
+        model if isinstance(model.steps[0][1], NumericFeatureMatrix)
+        else build_numeric_pipeline(model)
+    )
+    matrix = numeric.named_steps["features"]
+    features = matrix.features
+    two_stage = numeric.named_steps["model"]
+
+    path = Path(path)
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+
+    np.save(path / "medians.npy",
+            features.loc_median_.to_numpy(dtype=np.float64))
+    np.save(path / "global_median.npy",
+            features.global_median_.to_numpy(dtype=np.float64))
+    np.save(path / "median_matrix.npy",
+            np.ascontiguousarray(features.median_matrix_, dtype=np.float64))
+
+    stages = {"classifier": two_stage.clf_}
+    if two_stage.has_regressor_:
+        stages["regressor"] = _booster_of(two_stage.reg_)
+    best_iterations = {}
+    for name, estimator in stages.items():
+        best_iterations[name] = getattr(estimator, "best_iteration", None)
+        if best_iterations[name] is None:
+            estimator.save_model(path / f"{name}.ubj")
+        else:
+            # Rounds past the best one are never used for prediction.
+            booster = estimator.get_booster()
+            booster[slice(*_iteration_range(estimator))].save_model(
+                path / f"{name}.ubj"
+            )
+        (path / f"{name}.config.json").write_text(
+            estimator.get_booster().save_config()
+        )
+
+    output_cols = features.output_cols
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "features": {
+            "location_col": features.location_col,
+            "lag_days": features.lag_days,
+            "drop_cols": list(features.drop_cols),
+            "output_cols": None if output_cols is None else list(output_cols),
+            "group_col": features.group_col,
+        },
+        "medians": {
+            "locations": features.loc_median_.index.tolist(),
+            "columns": features.loc_median_.columns.tolist(),
+            "global_columns": features.global_median_.index.tolist(),
+        },
+        "feature_order": matrix.order,
+        "model": {
+            "rain_threshold": two_stage.rain_threshold,
+            "gate_epsilon": two_stage.gate_epsilon,
+            "has_regressor": bool(two_stage.has_regressor_),
+            "target_transform": _target_transform(two_stage.reg_),
+            "best_iteration": best_iterations,
+        },
+        "training": training or {},
+    }
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return path
+
+
+def is_artifact(path: Path) -> bool:
+    return (Path(path) / MANIFEST).exists()
+
+
+def read_manifest(path: Path) -> dict:
+    return json.loads((Path(path) / MANIFEST).read_text())
+
+
+def _load_booster(estimator, path: Path, name: str):
+    estimator.load_model(path / f"{name}.ubj")
+    config = path / f"{name}.config.json"
+    if config.exists():
+        estimator.get_booster().load_config(config.read_text())
+    return estimator
+
+
+def _restore_target_transform(regressor, name, n_features):
+    func, inverse = TARGET_TRANSFORMS[name]
+    # Fit the wrapper on a dummy row through the public API, then put
+    # the real booster in place.
+    wrapper = TransformedTargetRegressor(
+        regressor=XGBRegressor(n_estimators=1),
+        func=func, inverse_func=inverse, check_inverse=False
+    )
+    wrapper.fit(np.zeros((2, n_features)), np.zeros(2))
+    wrapper.regressor_ = regressor
+    return wrapper
+
+
+def fitted_two_stage(classifier, regressor, rain_threshold,
+                     gate_epsilon=None, target_transform=None,
+                     n_features=None) -> TwoStageRainfallModel:
+    """
+    ``TwoStageRainfallModel`` around already trained XGBoost estimators
+    (``regressor`` None when no rainy rows were seen).
+    """
+    has_regressor = regressor is not None
+    if not has_regressor:
+        regressor = XGBRegressor()
+    elif target_transform:
+        regressor = _restore_target_transform(
+            regressor, target_transform, n_features
+        )
+
+    two_stage = TwoStageRainfallModel(
+        classifier=classifier,
+        regressor=regressor,
+        rain_threshold=rain_threshold,
+        gate_epsilon=gate_epsilon
+    )
+    two_stage.clf_ = classifier
+    two_stage.reg_ = regressor
+    two_stage.has_regressor_ = has_regressor
+    return two_stage
+
+
+def load_artifact(path: Path) -> Pipeline:
+    """
+    Inference pipeline (``NumericFeatureMatrix`` + fitted
+    ``TwoStageRainfallModel``) from an ``export_artifact`` directory.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    if manifest["format"] != ARTIFACT_FORMAT:
+        raise ValueError(
+            f"Unsupported artifact format {manifest['format']}"
+        )
+
+    medians = manifest["medians"]
+    params = {
+        **manifest["features"],
+        "drop_cols": tuple(manifest["features"]["drop_cols"]),
+    }
+    loc_median = pd.DataFrame(
+        np.load(path / "medians.npy", mmap_mode="r"),
+        index=pd.Index(medians["locations"], name=params["location_col"]),
+        columns=medians["columns"],
+        copy=False
+    )
+    global_median = pd.Series(
+        np.load(path / "global_median.npy", mmap_mode="r"),
+        index=medians["global_columns"],
+        copy=False
+    )
+    # Artifacts written before the matrix was stored rebuild it privately.
+    median_matrix = None
+    if (path / "median_matrix.npy").exists():
+        median_matrix = np.load(path / "median_matrix.npy", mmap_mode="r")
+    features = FusedFeatures.from_medians(
+        loc_median, global_median, median_matrix=median_matrix, **params
+    )
+
+    settings = manifest["model"]
+    clf = _load_booster(XGBClassifier(), path, "classifier")
+
+    reg = None
+    if settings["has_regressor"]:
+        reg = _load_booster(XGBRegressor(), path, "regressor")
+
+    two_stage = fitted_two_stage(
+        clf, reg,
+        rain_threshold=settings["rain_threshold"],
+        gate_epsilon=settings["gate_epsilon"],
+        target_transform=settings["target_transform"],
+        n_features=len(manifest["feature_order"]["columns"])
+    )
+
+    return Pipeline(steps=[
+        ("features", NumericFeatureMatrix(
+            features, manifest["feature_order"]
+        )),
+        ("model", two_stage),
+    ])
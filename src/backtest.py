@@ -0,0 +1,239 @@
+import logging
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+from src.config import FEATURE_STATE_DAYS
+from src.cv_cache import Fold, FoldFeatureCache, split_pipeline
+from src.model import _take_rows
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"year": "Y", "month": "M"}
+
+# Tables of ``error_tables``: name -> grouping keys.
+TABLES = {
+    "overall": [],
+    "fold": ["fold"],
+    "location": ["location"],
+    "month": ["month"],
+    "location_month": ["location", "month"],
+}
+
+
+class CalendarSplit:
+    """
+    Rolling-origin splits on calendar dates: each fold tests one
+    ``period`` ("year" or "month") and trains on every earlier day, or
+    on the last ``window`` periods only. Origins are the starts of the
+    last ``n_splits`` periods in the data, so e.g. the final fold trains
+    up to year Y and tests year Y+1. Rows need not be sorted; all
+    locations share the same cut.
+    """
+
+    def __init__(self, n_splits=3, period="year", window=None,
+                 date_col="date"):
+        self.n_splits = n_splits
+        self.period = period
+        self.window = window
+        self.date_col = date_col
+
+    def _periods(self, X):
+        if self.period not in PERIODS:
+            raise ValueError(f"Unknown period: {self.period}")
+        return pd.to_datetime(X[self.date_col]).dt.to_period(
+            PERIODS[self.period]
+        ).to_numpy()
+
+    def origins(self, X) -> list:
+        """The test period of every fold, oldest first."""
+        periods = np.unique(self._periods(X))
+        if len(periods) <= self.n_splits:
+            raise ValueError(
+                f"{len(periods)} {self.period}s of data cannot give "
+                f"{self.n_splits} splits with training data before each"
+            )
+        return list(periods[-self.n_splits:])
+
+    def split(self, X, y=None, groups=None):
+        periods = self._periods(X)
+        for origin in self.origins(X):
+            train = periods < origin
+            if self.window:
+                train &= periods >= origin - self.window
+            yield np.flatnonzero(train), np.flatnonzero(periods == origin)
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return self.n_splits
+
+
+class BacktestFeatureCache(FoldFeatureCache):
+    """
+    ``FoldFeatureCache`` whose test matrices are built with the last
+    ``context_days`` training rows of every location in front, so lag
+    and rolling features on the first test days see the real previous
+    days, as they do at inference time. Training rows need not be
+    sorted: the context is taken by date.
+    """
+
+    def __init__(self, transformer, cv, cache_dir=None,
+                 context_days: int = FEATURE_STATE_DAYS,
+                 location_col: str = "location", date_col: str = "date"):
+        super().__init__(transformer, cv, cache_dir)
+        self.context_days = context_days
+        self.location_col = location_col
+        self.date_col = date_col
+
+    def _transformer_key(self):
+        # Never share entries with plain FoldFeatureCache folds.
+        return joblib.hash(
+            (clone(self.transformer), "context", self.context_days,
+             self.date_col)
+        )
+
+    def _compute(self, X, y, train_idx, test_idx):
+        transformer = clone(self.transformer)
+        X_train = X.iloc[train_idx]
+        matrix = transformer.fit_transform(X_train, y.iloc[train_idx])
+
+        order = np.argsort(
+            pd.to_datetime(X_train[self.date_col]).to_numpy(), kind="stable"
+        )
+        context = X_train.iloc[order].groupby(
+            self.location_col, sort=False
+        ).tail(self.context_days)
+        X_test = transformer.transform(pd.concat([context, X.iloc[test_idx]]))
+        X_test = _take_rows(X_test, slice(len(context), None))
+        return Fold(train_idx, test_idx, matrix, X_test)
+
+
+def _fit_and_predict(model, params, fold, y):
+    estimator = clone(model).set_params(**params)
+    estimator.fit(fold.X_train, y.iloc[fold.train_idx])
+    return estimator.predict(fold.X_test)
+
+
+def _error_metrics(sums: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "n": sums["n"].astype(np.int64),
+        "mae": sums["abs"] / sums["n"],
+        "rmse": np.sqrt(sums["sq"] / sums["n"]),
+        "bias": sums["err"] / sums["n"],
+    }, index=sums.index)
+
+
+def error_tables(predictions: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    MAE, RMSE, bias (mean of prediction minus actual) and row counts per
+    fold, location, month and location x month, plus overall. One
+    groupby sums the errors per (fold, location, month); every table is
+    rolled up from those sums.
+    """
+    err = predictions["y_pred"].to_numpy() - predictions["y_true"].to_numpy()
+    sums = pd.DataFrame({
+        "fold": predictions["fold"].to_numpy(),
+        "location": predictions["location"].to_numpy(),
+        "month": predictions["month"].to_numpy(),
+        "n": 1,
+        "err": err,
+        "abs": np.abs(err),
+        "sq": err ** 2,
+    }).groupby(["fold", "location", "month"], sort=True).sum()
+
+    tables = {}
+    for name, keys in TABLES.items():
+        rolled = (
+            sums.groupby(level=keys).sum() if keys
+            else sums.sum().to_frame().T
+        )
+        tables[name] = _error_metrics(rolled).reset_index(drop=not keys)
+    return tables
+
+
+class Backtest:
+    """
+    Rolling-origin backtest of a full pipeline: one fit per
+    ``CalendarSplit`` fold, run concurrently (``n_jobs`` or a
+    ``ThreadBudget``), with fold feature matrices from
+    ``BacktestFeatureCache`` so repeated backtests of model settings
+    skip the feature pipeline.
+
+    After ``run``: ``predictions_`` (one row per test row), ``folds_``
+    (date ranges and sizes) and ``tables_`` (``error_tables``).
+    """
+
+    def __init__(self, pipe, cv=None, n_jobs=1, cache_dir=None, budget=None,
+                 context_days: int = FEATURE_STATE_DAYS,
+                 date_col: str = "date", location_col: str = "location"):
+        self.pipe = pipe
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.budget = budget
+        self.context_days = context_days
+        self.date_col = date_col
+        self.location_col = location_col
+
+    def _predict_folds(self, model, folds, y):
+        if self.budget is not None:
+            return self.budget.map(
+                _fit_and_predict, model,
+                [({}, i) for i in range(len(folds))], folds, y
+            )
+        return Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_and_predict)(model, {}, fold, y) for fold in folds
+        )
+
+    def run(self, X: pd.DataFrame, y: pd.Series):
+        start = time.perf_counter()
+        cv = self.cv if self.cv is not None else CalendarSplit(
+            date_col=self.date_col
+        )
+        transformer, model = split_pipeline(self.pipe)
+        self.cache_ = BacktestFeatureCache(
+            transformer, cv, self.cache_dir,
+            context_days=self.context_days, location_col=self.location_col,
+            date_col=self.date_col
+        )
+        folds = self.cache_.folds(X, y)
+        preds = self._predict_folds(model, folds, y)
+
+        dates = pd.to_datetime(X[self.date_col]).to_numpy()
+        test_idx = np.concatenate([fold.test_idx for fold in folds])
+        test_dates = pd.DatetimeIndex(dates[test_idx])
+        self.predictions_ = pd.DataFrame({
+            "fold": np.repeat(
+                np.arange(len(folds)), [len(fold.test_idx) for fold in folds]
+            ),
+            "date": test_dates,
+            "location": X[self.location_col].to_numpy()[test_idx],
+            "month": test_dates.month,
+            "y_true": np.asarray(y)[test_idx],
+            "y_pred": np.concatenate(preds),
+        })
+        self.folds_ = pd.DataFrame([
+            {
+                "fold": i,
+                "train_start": dates[fold.train_idx].min(),
+                "train_end": dates[fold.train_idx].max(),
+                "test_start": dates[fold.test_idx].min(),
+                "test_end": dates[fold.test_idx].max(),
+                "n_train": len(fold.train_idx),
+                "n_test": len(fold.test_idx),
+            }
+            for i, fold in enumerate(folds)
+        ])
+        self.tables_ = error_tables(self.predictions_)
+        self.seconds_ = time.perf_counter() - start
+
+        for row in self.tables_["fold"].merge(self.folds_, on="fold").itertuples():
+            logger.info(
+                "Fold %d (test %s to %s): MAE %.4f, RMSE %.4f, bias %+.4f",
+                row.fold, pd.Timestamp(row.test_start).date(),
+                pd.Timestamp(row.test_end).date(), row.mae, row.rmse, row.bias
+            )
+        return self
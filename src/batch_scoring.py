@@ -0,0 +1,194 @@
+import logging
+import multiprocessing
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.artifact import is_artifact, load_artifact
+from src.config import FEATURE_STATE_DAYS, INFERENCE_BACKEND, SKETCH_CHUNKSIZE
+from src.model import inference_data, prune_feature_pipeline
+from src.sketch import iter_chunks
+
+logger = logging.getLogger(__name__)
+
+TARGET_COL = "daily_rainfall_total_mm"
+SUBMISSION_COLUMNS = ["ID (kota)", "tahun", "bulan", "hari", "prediksi"]
+
+
+def submission_frame(data: pd.DataFrame, preds) -> pd.DataFrame:
+    """Predictions in the submission schema (``SUBMISSION_COLUMNS``)."""
+    dates = pd.to_datetime(data["date"])
+    return pd.DataFrame({
+        "ID (kota)": (
+            data["location"].str.lower() + "_" + dates.dt.strftime("%Y_%m_%d")
+        ).to_numpy(),
+        "tahun": dates.dt.year.to_numpy(),
+        "bulan": dates.dt.month.to_numpy(),
+        "hari": dates.dt.day.to_numpy(),
+        "prediksi": np.asarray(preds),
+    })
+
+
+def chunks_with_context(sources, chunksize: int = SKETCH_CHUNKSIZE,
+                        context_days: int = FEATURE_STATE_DAYS,
+                        location_col: str = "location"):
+    """
+    Yield ``(frame, n_context)``: each input chunk preceded by the last
+    ``context_days`` rows of every location seen so far, so lag features
+    at chunk boundaries match a single full-frame predict. Input must be
+    sorted by date.
+    """
+    context = None
+    for chunk in iter_chunks(sources, chunksize):
+        chunk = chunk.drop(columns=[TARGET_COL], errors="ignore")
+        frame = chunk if context is None else pd.concat(
+            [context, chunk], ignore_index=True
+        )
+        yield frame, len(frame) - len(chunk)
+        context = frame.groupby(location_col, sort=False).tail(context_days)
+
+
+# Set once per worker process by ``_init_worker``.
+_WORKER = {}
+
+
+def _init_worker(model_path, threads, backend):
+    # Same as app_service.load_model, without importing the API stack
+    # into every worker.
+    model_path = Path(model_path)
+    model = (
+        load_artifact(model_path) if is_artifact(model_path)
+        else prune_feature_pipeline(joblib.load(model_path))
+    )
+    # One pool process per core: keep each booster single-threaded.
+    two_stage = model.steps[-1][1]
+    for stage in ("clf_", "reg_"):
+        estimator = getattr(two_stage, stage, None)
+        estimator = getattr(estimator, "regressor_", estimator)
+        if hasattr(estimator, "get_booster"):
+            estimator.get_booster().set_param("nthread", threads)
+    _WORKER.update(model=model, backend=backend)
+
+
+def _score_chunk(index, frame, n_context, output_dir):
+    start = time.perf_counter()
+    preds = inference_data(
+        _WORKER["model"], frame,
+        return_dataframe=False, backend=_WORKER["backend"]
+    )[n_context:]
+    scored = frame.iloc[n_context:]
+    return index, len(scored), _write_parts(
+        submission_frame(scored, preds), index, output_dir
+    ), time.perf_counter() - start
+
+
+def _write_parts(submission, index, output_dir):
+    """One file per year: ``<output_dir>/tahun=<year>/part-<index>.csv``."""
+    paths = []
+    for year, part in submission.groupby("tahun", sort=True):
+        path = Path(output_dir) / f"tahun={year}" / f"part-{index:05d}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@dataclass
+class ScoringStats:
+    rows: int
+    chunks: int
+    workers: int
+    seconds: float
+    worker_seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else np.nan
+
+
+def score_batch(sources, model_path: Path, output_dir: Path,
+                chunksize: int = SKETCH_CHUNKSIZE, n_workers: int = 1,
+                threads_per_worker: int = 1,
+                backend: str = INFERENCE_BACKEND) -> ScoringStats:
+    """
+    Score CSV/Parquet sources chunk by chunk in a process pool. Each
+    worker loads the model once (artifact medians are memory-mapped, so
+    workers share their pages) and writes its chunks' submission rows
+    straight to ``output_dir``. At most two chunks per worker are in
+    flight, so memory does not grow with the input.
+
+    Parts are written to a staging directory next to ``output_dir``
+    that replaces it once every chunk is scored, so parts of an earlier
+    run never mix with this one and a failed run leaves the previous
+    output intact.
+    """
+    output_dir = Path(output_dir)
+    staging = output_dir.with_name(f".{output_dir.name}.partial")
+    if staging.exists():
+        shutil.rmtree(staging)
+    start = time.perf_counter()
+    rows = chunks = 0
+    worker_seconds = 0.0
+
+    # spawn: forked children can deadlock in OpenMP after the parent
+    # has used it.
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(model_path), threads_per_worker, backend),
+    ) as pool:
+        pending = set()
+
+        def collect(done):
+            nonlocal rows, chunks, worker_seconds
+            for future in done:
+                index, n_rows, _, seconds = future.result()
+                rows += n_rows
+                chunks += 1
+                worker_seconds += seconds
+                logger.debug("Chunk %d: %d rows in %.2fs", index, n_rows, seconds)
+
+        for index, (frame, n_context) in enumerate(
+            chunks_with_context(sources, chunksize)
+        ):
+            if len(pending) >= 2 * n_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(pool.submit(
+                _score_chunk, index, frame, n_context, staging
+            ))
+
+        collect(wait(pending).done)
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    staging.mkdir(parents=True, exist_ok=True)
+    staging.rename(output_dir)
+
+    stats = ScoringStats(
+        rows=rows, chunks=chunks, workers=n_workers,
+        seconds=time.perf_counter() - start, worker_seconds=worker_seconds
+    )
+    logger.info(
+        "Scored %d rows in %d chunks with %d workers in %.1fs "
+        "(%.0f rows/sec)",
+        stats.rows, stats.chunks, stats.workers, stats.seconds,
+        stats.rows_per_sec
+    )
+    return stats
+
+
+def read_submission(output_dir: Path) -> pd.DataFrame:
+    """All parts under ``output_dir`` as one frame, in input order."""
+    parts = sorted(
+        Path(output_dir).glob("tahun=*/part-*.csv"),
+        key=lambda p: (p.name, p.parent.name)
+    )
+    return pd.concat([pd.read_csv(p) for p in parts], ignore_index=True)
@@ -0,0 +1,108 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    METEOROGICAL_COLUMNS,
+    RAIN_EXTREME_COLUMNS,
+    VALID_LOCATIONS
+)
+
+EXTERNAL_SOURCES = ["dmi", "aqi", "oni", "rh"]
+
+
+def synthetic_weather_frame(
+    n_rows: int,
+    seed: int = 42,
+    missing_rate: float = 0.05,
+    with_target: bool = False
+) -> pd.DataFrame:
+    """
+    Random frame with the column layout of ``data/clean/train_1226.csv``,
+    sorted by ``["date", "location"]`` like the training scripts.
+    """
+    rng = np.random.default_rng(seed)
+    n_locations = len(VALID_LOCATIONS)
+    n_days = -(-n_rows // n_locations)
+
+    dates = pd.date_range("2009-01-01", periods=n_days, freq="D")
+    df = pd.DataFrame({
+        "date": np.repeat(dates.strftime("%Y-%m-%d"), n_locations)[:n_rows],
+        "location": np.tile(VALID_LOCATIONS, n_days)[:n_rows],
+    })
+
+    base = {
+        "mean_temperature_c": (27.5, 1.5),
+        "maximum_temperature_c": (31.0, 1.5),
+        "minimum_temperature_c": (24.5, 1.2),
+        "mean_wind_speed_kmh": (8.0, 3.0),
+        "max_wind_speed_kmh": (30.0, 8.0),
+    }
+    for col in METEOROGICAL_COLUMNS:
+        mean, std = base[col]
+        df[col] = rng.normal(mean, std, n_rows).clip(0)
+
+    rain = rng.exponential(6.0, n_rows) * (rng.random(n_rows) < 0.4)
+    for i, col in enumerate(RAIN_EXTREME_COLUMNS):
+        df[col] = rain * (1 + 0.5 * i)
+
+    for col in METEOROGICAL_COLUMNS + RAIN_EXTREME_COLUMNS:
+        df.loc[rng.random(n_rows) < missing_rate, col] = np.nan
+
+    for source in EXTERNAL_SOURCES:
+        monthly = rng.normal(0, 1, n_days // 28 + 2)
+        value = monthly[np.arange(n_rows) // (28 * n_locations)]
+        df[f"feature_{source}"] = value
+        for lag in [1, 2, 3, 6]:
+            df[f"{source}_lag_{lag}"] = np.roll(value, lag * 28)
+        for window in [3, 6, 12]:
+            df[f"{source}_rolling_mean_{window}"] = value
+
+    if with_target:
+        df["daily_rainfall_total_mm"] = rain * rng.uniform(1, 4, n_rows)
+
+    return df
+
+
+def time_call(fn, *args, repeat: int = 3, **kwargs):
+    """Best wall time in seconds over ``repeat`` calls, and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_allocation(fn, *args, **kwargs):
+    """Peak bytes allocated (Python and NumPy) during one call."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def train_small_pipeline(n_rows: int = 20_000, n_estimators: int = 200,
+                         **pipeline_params):
+    """Two-stage pipeline fitted on synthetic data, for benchmarks."""
+    from src.model import build_pipeline
+
+    df = synthetic_weather_frame(n_rows, with_target=True)
+    X = df.drop(columns=["daily_rainfall_total_mm"])
+    y = df["daily_rainfall_total_mm"]
+
+    # Benchmarks time the bare steps even when RAINFALL_PROFILE is set.
+    pipeline_params.setdefault("profile", False)
+    pipe = build_pipeline(**pipeline_params)
+    pipe.set_params(
+        model__classifier__n_estimators=n_estimators,
+        model__regressor__n_estimators=n_estimators
+    )
+    return pipe.fit(X, y)
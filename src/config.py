@@ -33,4 +33,72 @@ TIMEZONE = CONFIG["weather"]["timezone"]
 ROLLING_WINDOWS = CONFIG["features"]["rolling_windows"]
 RAIN_EXTREME_COLUMNS = CONFIG['features']['rain_extreme_columns']
 METEOROGICAL_COLUMNS = CONFIG['features']['meteorogical_columns']
-VALID_LOCATIONS = CONFIG['features']['locations']
\ No newline at end of file
+VALID_LOCATIONS = CONFIG['features']['locations']
+
+# Online feature state
+FEATURE_STATE_DAYS = CONFIG["feature_state"]["history_days"]
+FEATURE_STATE_SNAPSHOT = MODEL_DIR / CONFIG["feature_state"]["snapshot"]
+
+# Out-of-core imputer fitting
+SKETCH_RELATIVE_ACCURACY = CONFIG["imputer"]["sketch_relative_accuracy"]
+SKETCH_CHUNKSIZE = CONFIG["imputer"]["chunksize"]
+
+# Inference
+MODEL_ARTIFACT_DIR = MODEL_DIR / CONFIG["inference"]["artifact"]
+FEATURE_ORDER_PATH = MODEL_DIR / CONFIG["inference"]["feature_order"]
+FLOAT32_FAST_PATH = CONFIG["inference"]["float32_fast_path"]
+REGRESSOR_GATE_EPSILON = CONFIG["inference"]["regressor_gate_epsilon"]
+INFERENCE_BACKEND = CONFIG["inference"]["backend"]
+
+# Prediction cache
+PREDICTION_CACHE_ENABLED = CONFIG["prediction_cache"]["enabled"]
+PREDICTION_CACHE_SIZE = CONFIG["prediction_cache"]["max_entries"]
+PREDICTION_CACHE_TTL = CONFIG["prediction_cache"]["ttl_seconds"]
+
+# Model registry
+MODEL_VERSIONS = {
+    name: MODEL_DIR / file
+    for name, file in CONFIG["registry"]["versions"].items()
+}
+DEFAULT_MODEL_VERSION = CONFIG["registry"]["default"]
+MAX_RESIDENT_MODELS = CONFIG["registry"]["max_resident"]
+SHADOW_MODEL_VERSION = CONFIG["registry"]["shadow"] or None
+SHADOW_FRACTION = CONFIG["registry"]["shadow_fraction"]
+SHADOW_MAX_PENDING = CONFIG["registry"]["shadow_max_pending"]
+
+# Training
+EARLY_STOPPING_ROUNDS = CONFIG["training"]["early_stopping_rounds"] or None
+VALIDATION_FRACTION = CONFIG["training"]["validation_fraction"]
+
+# Out-of-core training
+PARTITIONS_DIR = PROJECT_ROOT / CONFIG["out_of_core"]["partitions_dir"]
+XGB_CACHE_DIR = PROJECT_ROOT / CONFIG["out_of_core"]["cache_dir"]
+
+# Incremental updates
+MAX_ADDED_ROUNDS = CONFIG["incremental"]["max_added_rounds"]
+MAX_TOTAL_ADDED_ROUNDS = CONFIG["incremental"]["max_total_added_rounds"]
+FULL_RETRAIN_DAYS = CONFIG["incremental"]["full_retrain_days"]
+
+# Hyperparameter search
+SEARCH_SPACES_PATH = PROJECT_ROOT / CONFIG["tuning"]["search_spaces"]
+
+# Cross-validation
+CV_CACHE_DIR = PROJECT_ROOT / CONFIG["cv"]["cache_dir"]
+CV_CORES = CONFIG["cv"]["cores"] or None
+CV_THREADS_PER_FIT = CONFIG["cv"]["threads_per_fit"] or None
+CV_PIN_CPUS = CONFIG["cv"]["pin_cpus"]
+
+# Backtesting
+BACKTEST_PERIOD = CONFIG["backtest"]["period"]
+BACKTEST_SPLITS = CONFIG["backtest"]["n_splits"]
+BACKTEST_WINDOW = CONFIG["backtest"]["window"] or None
+BACKTEST_DIR = PROJECT_ROOT / CONFIG["backtest"]["report_dir"]
+
+# Materialized features
+FEATURE_STORE_DIR = PROJECT_ROOT / CONFIG["feature_store"]["dir"]
+
+# Step profiling (RAINFALL_PROFILE=1 overrides the config switch)
+PROFILING_ENABLED = os.getenv(
+    "RAINFALL_PROFILE", str(CONFIG["profiling"]["enabled"])
+).lower() in ("1", "true", "yes")
+PROFILE_REPORT_PATH = PROJECT_ROOT / CONFIG["profiling"]["report"]
\ No newline at end of file
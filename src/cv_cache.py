@@ -0,0 +1,203 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid
+
+
+def data_fingerprint(*objs) -> str:
+    """Content hash of frames/series/arrays (values, index, columns, dtypes)."""
+    digest = hashlib.sha256()
+    for obj in objs:
+        if obj is None:
+            continue
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            digest.update(
+                pd.util.hash_pandas_object(obj, index=True)
+                  .to_numpy().tobytes()
+            )
+            columns = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+            dtypes = obj.dtypes if isinstance(obj, pd.DataFrame) else [obj.dtype]
+            digest.update(repr((list(columns), list(map(str, dtypes)))).encode())
+        else:
+            digest.update(joblib.hash(obj).encode())
+    return digest.hexdigest()[:16]
+
+
+def split_pipeline(pipe):
+    """``(transformer, model)``: every step but the last, and the last."""
+    return pipe[:-1], pipe.steps[-1][1]
+
+
+@dataclass
+class Fold:
+    train_idx: np.ndarray
+    test_idx: np.ndarray
+    X_train: object
+    X_test: object
+
+
+class FoldFeatureCache:
+    """
+    Transformed feature matrices per CV fold, computed once and reused
+    across every hyperparameter candidate that only changes the model.
+
+    Keys combine the transformer's parameters, a fingerprint of X and y,
+    and the fold indices, so changed data or feature settings never hit
+    a stale entry. With ``cache_dir`` folds also persist across runs and
+    worker processes.
+    """
+
+    def __init__(self, transformer, cv, cache_dir: Path | None = None):
+        self.transformer = transformer
+        self.cv = cv
+        self.cache_dir = cache_dir
+        self._memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _transformer_key(self):
+        return joblib.hash(clone(self.transformer))
+
+    def _compute(self, X, y, train_idx, test_idx):
+        transformer = clone(self.transformer)
+        X_train = transformer.fit_transform(
+            X.iloc[train_idx], y.iloc[train_idx]
+        )
+        X_test = transformer.transform(X.iloc[test_idx])
+        return Fold(train_idx, test_idx, X_train, X_test)
+
+    def _fold(self, key, X, y, train_idx, test_idx):
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key]
+
+        path = None
+        if self.cache_dir is not None:
+            path = Path(self.cache_dir) / f"fold_{key}.joblib"
+            if path.exists():
+                self.hits += 1
+                self._memory[key] = joblib.load(path)
+                return self._memory[key]
+
+        self.misses += 1
+        fold = self._compute(X, y, train_idx, test_idx)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump(fold, path)
+        self._memory[key] = fold
+        return fold
+
+    def folds(self, X: pd.DataFrame, y: pd.Series) -> list[Fold]:
+        base = (self._transformer_key(), data_fingerprint(X, y))
+        return [
+            self._fold(
+                joblib.hash(base + (train_idx, test_idx)),
+                X, y, train_idx, test_idx
+            )
+            for train_idx, test_idx in self.cv.split(X, y)
+        ]
+
+
+def _strip_prefix(params, prefix="model__"):
+    return {
+        (k[len(prefix):] if k.startswith(prefix) else k): v
+        for k, v in params.items()
+    }
+
+
+def _fit_and_score(model, params, fold, y, scoring):
+    estimator = clone(model).set_params(**params)
+    estimator.fit(fold.X_train, y.iloc[fold.train_idx])
+    scorer = check_scoring(estimator, scoring=scoring)
+    return scorer(estimator, fold.X_test, y.iloc[fold.test_idx])
+
+
+def cached_cross_val_score(pipe, X, y, cv, scoring=None, n_jobs=1,
+                           cache_dir=None, cache=None, budget=None):
+    """
+    ``cross_val_score`` that reuses cached per-fold feature matrices.
+    With a ``ThreadBudget`` the folds run within its core budget and
+    ``n_jobs`` is ignored.
+    """
+    transformer, model = split_pipeline(pipe)
+    cache = cache or FoldFeatureCache(transformer, cv, cache_dir)
+    folds = cache.folds(X, y)
+
+    if budget is not None:
+        return budget.run(
+            model, [({}, i) for i in range(len(folds))], folds, y, scoring
+        )
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_and_score)(model, {}, fold, y, scoring)
+        for fold in folds
+    )
+    return np.asarray(scores)
+
+
+class CachedGridSearch:
+    """
+    Grid search over model hyperparameters (``model__*`` keys, as with
+    ``GridSearchCV`` on the full pipeline) where the feature pipeline
+    and preprocessor run once per fold instead of once per candidate.
+    A ``budget`` (``ThreadBudget``) replaces ``n_jobs``.
+    """
+
+    def __init__(self, pipe, param_grid, cv, scoring=None, n_jobs=1,
+                 cache_dir=None, verbose=0, budget=None):
+        self.pipe = pipe
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.budget = budget
+
+    def fit(self, X, y):
+        transformer, model = split_pipeline(self.pipe)
+        self.cache_ = FoldFeatureCache(transformer, self.cv, self.cache_dir)
+        folds = self.cache_.folds(X, y)
+        candidates = list(ParameterGrid(self.param_grid))
+
+        if self.budget is not None:
+            scores = self.budget.run(
+                model,
+                [(_strip_prefix(params), i)
+                 for params in candidates for i in range(len(folds))],
+                folds, y, self.scoring
+            )
+            self.run_stats_ = self.budget.stats_
+        else:
+            scores = Parallel(n_jobs=self.n_jobs, verbose=self.verbose)(
+                delayed(_fit_and_score)(
+                    model, _strip_prefix(params), fold, y, self.scoring
+                )
+                for params in candidates
+                for fold in folds
+            )
+        scores = np.asarray(scores).reshape(len(candidates), len(folds))
+
+        self.cv_results_ = pd.DataFrame({
+            "params": candidates,
+            **{f"split{i}_test_score": scores[:, i] for i in range(len(folds))},
+            "mean_test_score": scores.mean(axis=1),
+            "std_test_score": scores.std(axis=1),
+        })
+        self.cv_results_["rank_test_score"] = (
+            self.cv_results_["mean_test_score"]
+            .rank(ascending=False, method="min").astype(int)
+        )
+
+        best = int(np.argmax(scores.mean(axis=1)))
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = scores[best].mean()
+        return self
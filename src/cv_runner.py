@@ -0,0 +1,152 @@
+import logging
+import multiprocessing
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+from threadpoolctl import threadpool_limits
+
+from src.cv_cache import _fit_and_score
+
+logger = logging.getLogger(__name__)
+
+CAN_PIN = hasattr(os, "sched_setaffinity")
+
+
+def available_cores() -> list[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_model_threads(estimator, threads: int):
+    """Set every ``n_jobs`` parameter of ``estimator`` (nested ones too)."""
+    params = {
+        key: threads for key in estimator.get_params(deep=True)
+        if key == "n_jobs" or key.endswith("__n_jobs")
+    }
+    return estimator.set_params(**params)
+
+
+@dataclass
+class BudgetPlan:
+    workers: int
+    threads_per_fit: int
+    cores: list[int]
+
+    def slot_cores(self, slot: int) -> list[int]:
+        start = slot * self.threads_per_fit
+        return self.cores[start:start + self.threads_per_fit]
+
+
+@dataclass
+class RunStats:
+    fits: int
+    workers: int
+    threads_per_fit: int
+    seconds: float
+
+    @property
+    def fits_per_hour(self) -> float:
+        return self.fits / self.seconds * 3600 if self.seconds > 0 else np.nan
+
+
+def _budgeted_call(func, model, params, fold, y, args, threads,
+                  slots=None, plan=None):
+    original = os.sched_getaffinity(0) if slots is not None else None
+    slot = slots.get() if slots is not None else None
+    try:
+        if slot is not None:
+            os.sched_setaffinity(0, plan.slot_cores(slot))
+        with threadpool_limits(threads):
+            return func(
+                set_model_threads(clone(model), threads),
+                params, fold, y, *args
+            )
+    finally:
+        if slot is not None:
+            os.sched_setaffinity(0, original)
+            slots.put(slot)
+
+
+class ThreadBudget:
+    """
+    Runs CV fits (fold x candidate) within ``cores`` CPUs in total:
+    ``workers`` fits at a time with ``threads_per_fit`` threads each,
+    instead of ``n_jobs=-1`` both across fits and inside every booster.
+
+    Without ``threads_per_fit`` the split favours concurrent fits, which
+    scale better than more threads per XGBoost model. ``pin`` binds each
+    running fit to its own cores (Linux only). ``stats_`` holds the
+    throughput of the last ``run``.
+    """
+
+    def __init__(self, cores: int | None = None,
+                 threads_per_fit: int | None = None, pin: bool = False):
+        self.cores = cores
+        self.threads_per_fit = threads_per_fit
+        self.pin = pin
+
+    def plan(self, n_tasks: int) -> BudgetPlan:
+        cores = available_cores()
+        if self.cores:
+            cores = cores[:self.cores]
+
+        threads = self.threads_per_fit or max(1, len(cores) // max(n_tasks, 1))
+        threads = min(threads, len(cores))
+        workers = max(1, min(n_tasks, len(cores) // threads))
+        return BudgetPlan(workers, threads, cores)
+
+    def run(self, model, tasks, folds, y, scoring=None) -> np.ndarray:
+        """Scores of ``tasks``: ``(params, fold index)`` pairs."""
+        return np.asarray(
+            self.map(_fit_and_score, model, tasks, folds, y, scoring)
+        )
+
+    def map(self, func, model, tasks, folds, y, *args) -> list:
+        """
+        ``func(model, params, fold, y, *args)`` for every task, within
+        the budget (``model`` already limited to the fit's threads).
+        """
+        plan = self.plan(len(tasks))
+        pin = self.pin and CAN_PIN
+        if self.pin and not CAN_PIN:
+            logger.warning("CPU pinning is not supported here; ignoring it")
+
+        start = time.perf_counter()
+        with multiprocessing.Manager() if pin else nullcontext() as manager:
+            slots = None
+            if pin:
+                slots = manager.Queue()
+                for slot in range(plan.workers):
+                    slots.put(slot)
+
+            with parallel_config(backend="loky",
+                                 inner_max_num_threads=plan.threads_per_fit):
+                results = Parallel(n_jobs=plan.workers)(
+                    delayed(_budgeted_call)(
+                        func, model, params, folds[i], y, args,
+                        plan.threads_per_fit, slots, plan
+                    )
+                    for params, i in tasks
+                )
+
+        self.stats_ = RunStats(
+            fits=len(tasks),
+            workers=plan.workers,
+            threads_per_fit=plan.threads_per_fit,
+            seconds=time.perf_counter() - start,
+        )
+        logger.info(
+            "%d fits on %d workers x %d threads in %.1fs (%.0f fits/hour)",
+            self.stats_.fits, self.stats_.workers,
+            self.stats_.threads_per_fit, self.stats_.seconds,
+            self.stats_.fits_per_hour
+        )
+        return results
+
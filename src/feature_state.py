@@ -0,0 +1,224 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.config import FEATURE_STATE_DAYS
+from src.features import LAG_COLUMNS
+
+
+class FeatureStateStore:
+    """
+    Per-location ring buffers of the last ``history_days`` observations
+    of the columns the lag/rolling features read.
+
+    ``FusedFeatures(state=store)`` prepends ``history()`` rows to each
+    location's sequence, so a one-row request gets real lag and rolling
+    values. Reads and writes are O(history_days) per location and are
+    safe to call from concurrent request threads.
+    """
+
+    def __init__(self, columns=None, history_days: int = FEATURE_STATE_DAYS,
+                 location_col: str = "location"):
+        self.columns = list(columns or LAG_COLUMNS)
+        self.history_days = history_days
+        self.location_col = location_col
+
+        self._index = {}
+        self._values = np.full(
+            (0, history_days, len(self.columns)), np.nan
+        )
+        self._dates = np.full((0, history_days), "NaT", "datetime64[D]")
+        self._head = np.zeros(0, dtype=np.int64)
+        self._count = np.zeros(0, dtype=np.int64)
+        self._revisions = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(locations={len(self._index)}, "
+            f"history_days={self.history_days})"
+        )
+
+    def __len__(self):
+        return len(self._index)
+
+    def _slot(self, location):
+        if location in self._index:
+            return self._index[location]
+
+        i = len(self._index)
+        if i == len(self._head):
+            grow = max(len(self._head), 8)
+            self._values = np.concatenate([
+                self._values,
+                np.full((grow,) + self._values.shape[1:], np.nan)
+            ])
+            self._dates = np.concatenate([
+                self._dates,
+                np.full((grow, self.history_days), "NaT", "datetime64[D]")
+            ])
+            self._head = np.concatenate([self._head, np.zeros(grow, int)])
+            self._count = np.concatenate([self._count, np.zeros(grow, int)])
+
+        self._index[location] = i
+        return i
+
+    def _push(self, i, date, values) -> bool:
+        """Buffer one observation; True when the buffer changed."""
+        n = self.history_days
+        if self._count[i]:
+            latest = (self._head[i] - 1) % n
+            if date < self._dates[i, latest]:
+                return False
+            if date == self._dates[i, latest]:
+                if np.array_equal(self._values[i, latest], values,
+                                  equal_nan=True):
+                    return False
+                self._values[i, latest] = values
+                return True
+
+        slot = self._head[i]
+        self._values[i, slot] = values
+        self._dates[i, slot] = date
+        self._head[i] = (slot + 1) % n
+        self._count[i] = min(self._count[i] + 1, n)
+        return True
+
+    def update(self, frame: pd.DataFrame):
+        """
+        Push new observations. Rows older than a location's latest
+        buffered date are ignored; a row for that same date replaces it.
+        """
+        dates = pd.to_datetime(frame["date"]).to_numpy("datetime64[D]")
+        order = np.argsort(dates, kind="stable")
+        values = frame.reindex(columns=self.columns).to_numpy(np.float64)
+        locations = frame[self.location_col].to_numpy()
+
+        with self._lock:
+            changed = {
+                locations[row] for row in order
+                if self._push(self._slot(locations[row]), dates[row], values[row])
+            }
+            for location in changed:
+                self._revisions[location] = self._revisions.get(location, 0) + 1
+        return self
+
+    def revision(self, locations) -> tuple:
+        """Per-location counters that change whenever a buffer does."""
+        return tuple(self._revisions.get(location, 0) for location in locations)
+
+    def seed(self, *frames: pd.DataFrame):
+        """Fill the buffers with the last days of historical frames."""
+        data = pd.concat(
+            [f[[self.location_col, "date"] + self.columns] for f in frames],
+            ignore_index=True
+        )
+        data["date"] = pd.to_datetime(data["date"])
+        tail = (
+            data.sort_values("date", kind="stable")
+                .groupby(self.location_col)
+                .tail(self.history_days)
+        )
+        return self.update(tail)
+
+    def history(self, locations, dates) -> pd.DataFrame:
+        """
+        Buffered rows for each location dated before the earliest date
+        requested for it, oldest first. Like the training features, lags
+        and rolling windows then run over the last rows that exist, so a
+        missing day is skipped rather than imputed.
+        """
+        first = (
+            pd.DataFrame({
+                "location": np.asarray(locations),
+                "date": pd.to_datetime(np.asarray(dates))
+                         .to_numpy("datetime64[D]"),
+            })
+            .groupby("location")["date"].min()
+        )
+
+        n = self.history_days
+        rows = []
+        with self._lock:
+            for location, before in first.items():
+                i = self._index.get(location)
+                if i is None or not self._count[i]:
+                    continue
+                ring = (
+                    self._head[i] - self._count[i] + np.arange(self._count[i])
+                ) % n
+                buffered = self._dates[i, ring]
+                ring = ring[buffered < before]
+                if len(ring):
+                    rows.append(
+                        (location, self._dates[i, ring], self._values[i, ring])
+                    )
+
+        history = pd.DataFrame({
+            self.location_col: np.concatenate(
+                [[loc] * len(d) for loc, d, _ in rows] or [[]]
+            ).astype(object),
+            "date": np.concatenate(
+                [d for _, d, _ in rows] or [np.array([], "datetime64[D]")]
+            ),
+        })
+        values = (
+            np.vstack([v for _, _, v in rows]) if rows
+            else np.empty((0, len(self.columns)))
+        )
+        for j, col in enumerate(self.columns):
+            history[col] = values[:, j]
+        return history
+
+    def snapshot(self, path: Path):
+        """Write the buffers to an ``.npz`` file."""
+        with self._lock:
+            n = len(self._index)
+            np.savez(
+                path,
+                locations=np.array(list(self._index), dtype=str),
+                columns=np.array(self.columns, dtype=str),
+                location_col=np.array(self.location_col),
+                values=self._values[:n],
+                dates=self._dates[:n],
+                head=self._head[:n],
+                count=self._count[:n],
+            )
+
+    @classmethod
+    def restore(cls, path: Path):
+        """Load buffers written by ``snapshot``."""
+        with np.load(path, allow_pickle=False) as data:
+            store = cls(
+                columns=data["columns"].tolist(),
+                history_days=data["values"].shape[1],
+                location_col=str(data["location_col"]),
+            )
+            store._index = {
+                loc: i for i, loc in enumerate(data["locations"].tolist())
+            }
+            store._values = data["values"].copy()
+            store._dates = data["dates"].copy()
+            store._head = data["head"].copy()
+            store._count = data["count"].copy()
+        return store
+
+
+def load_feature_state(snapshot_path: Path, *frames: pd.DataFrame,
+                       history_days: int = FEATURE_STATE_DAYS):
+    """Restore a snapshot when present, otherwise seed from ``frames``."""
+    if snapshot_path is not None and Path(snapshot_path).exists():
+        return FeatureStateStore.restore(snapshot_path)
+
+    return FeatureStateStore(history_days=history_days).seed(*frames)
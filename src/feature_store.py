@@ -0,0 +1,294 @@
+import json
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.feature_state import FeatureStateStore
+
+KEY_FILES = {"location": "_key_location.npy", "date": "_key_date.npy"}
+
+
+def feature_pipeline_version(features) -> str:
+    """
+    Content hash of a fitted feature step (parameters and fitted
+    medians). An attached ``FeatureStateStore`` is left out: it changes
+    with every observation but not what the transformers compute.
+    """
+    params = features.get_params(deep=True) if hasattr(features, "get_params") else {}
+    detached = {
+        key: value for key, value in params.items()
+        if isinstance(value, FeatureStateStore)
+    }
+    if detached:
+        features.set_params(**{key: None for key in detached})
+    try:
+        return joblib.hash(features)[:12]
+    finally:
+        if detached:
+            features.set_params(**detached)
+
+
+def _to_storable(values):
+    values = np.asarray(values)
+    if values.dtype.kind == "O":
+        # Fixed-width unicode keeps string columns memory-mappable.
+        values = np.where(pd.isna(values), "", values).astype(str)
+    return values
+
+
+def _from_storable(values, dtype):
+    if values.dtype.kind == "U" and dtype in ("object", "str", "string"):
+        values = values.astype(object)
+        values[values == ""] = np.nan
+    return values
+
+
+class FeatureStore:
+    """
+    Output of a fitted ``features`` step, materialized once and read back
+    by ``(location, date)`` without running the transformers.
+
+    Each feature-pipeline version gets its own directory under ``root``
+    holding a ``manifest.json`` and one sub-directory per appended part,
+    with one ``.npy`` file per column, opened memory-mapped.
+    """
+
+    def __init__(self, root: Path, features, location_col: str = "location",
+                 date_col: str = "date"):
+        self.features = features
+        self.location_col = location_col
+        self.date_col = date_col
+        self.version = feature_pipeline_version(features)
+        self.path = Path(root) / self.version
+        self._load()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(version={self.version!r}, "
+            f"rows={len(self)}, parts={len(self._parts)})"
+        )
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    @property
+    def exists(self) -> bool:
+        return bool(self._parts)
+
+    # --------------------------------------------------------------- I/O
+
+    def _load(self):
+        manifest_path = self.path / "manifest.json"
+        self.manifest = (
+            json.loads(manifest_path.read_text())
+            if manifest_path.exists() else None
+        )
+        self._parts = []
+        locations, dates = [], []
+
+        for part in (self.manifest or {}).get("parts", []):
+            part_dir = self.path / part["name"]
+            columns = {
+                col: np.load(part_dir / f"{i}.npy", mmap_mode="r")
+                for i, col in enumerate(self.manifest["columns"])
+            }
+            self._parts.append(columns)
+            locations.append(np.load(part_dir / KEY_FILES["location"]))
+            dates.append(np.load(part_dir / KEY_FILES["date"]))
+
+        sizes = [len(loc) for loc in locations]
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self._index = pd.MultiIndex.from_arrays([
+            np.concatenate(locations) if locations else np.array([], str),
+            np.concatenate(dates) if dates else np.array([], "datetime64[D]"),
+        ])
+
+    def _keys(self, X):
+        return (
+            X[self.location_col].to_numpy().astype(str),
+            pd.to_datetime(X[self.date_col]).to_numpy().astype("datetime64[D]"),
+        )
+
+    def _check_unique(self, X):
+        keys = pd.MultiIndex.from_arrays(self._keys(X))
+        if keys.has_duplicates:
+            duplicated = keys[keys.duplicated()]
+            raise ValueError(
+                f"{len(duplicated)} duplicate ({self.location_col}, "
+                f"{self.date_col}) keys, e.g. {duplicated[0]}"
+            )
+
+    def _write_part(self, X, output):
+        kind = "frame" if isinstance(output, pd.DataFrame) else "array"
+        if kind == "array":
+            output = pd.DataFrame(np.asarray(output))
+        columns = [str(c) for c in output.columns]
+        dtypes = [str(t) for t in output.dtypes]
+
+        manifest = self.manifest or {
+            "version": self.version,
+            "kind": kind,
+            "columns": columns,
+            "dtypes": dtypes,
+            "parts": [],
+        }
+        if manifest["columns"] != columns:
+            raise ValueError(
+                "Feature output columns differ from the stored version"
+            )
+
+        name = f"part-{len(manifest['parts']):05d}"
+        part_dir = self.path / name
+        part_dir.mkdir(parents=True, exist_ok=True)
+
+        locations, dates = self._keys(X)
+        np.save(part_dir / KEY_FILES["location"], locations)
+        np.save(part_dir / KEY_FILES["date"], dates)
+        for i, col in enumerate(output.columns):
+            np.save(part_dir / f"{i}.npy", _to_storable(output[col]))
+
+        manifest["parts"].append({
+            "name": name,
+            "rows": len(X),
+            "min_date": str(dates.min()) if len(dates) else None,
+            "max_date": str(dates.max()) if len(dates) else None,
+        })
+        (self.path / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        self._load()
+
+    # ------------------------------------------------------------ writes
+
+    def materialize(self, X: pd.DataFrame):
+        """
+        (Re)build the store for this version from the full frame ``X``.
+        Keys must be unique: duplicate ``(location, date)`` rows raise a
+        ``ValueError``.
+        """
+        self._check_unique(X)
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.manifest = None
+        self._write_part(X, self.features.transform(X))
+        return self
+
+    def append(self, X_new: pd.DataFrame,
+               context: pd.DataFrame | None = None) -> int:
+        """
+        Add the rows of ``X_new`` whose keys are not stored yet. Lag and
+        rolling features need the preceding days: pass them as
+        ``context`` and they are transformed along but not stored.
+        Returns the number of rows added. Keys must be unique within
+        ``X_new``: duplicate ``(location, date)`` rows raise a
+        ``ValueError``.
+        """
+        self._check_unique(X_new)
+        if not self.exists:
+            self._write_part(X_new, self.features.transform(X_new))
+            return len(X_new)
+
+        locations, dates = self._keys(X_new)
+        new = self._index.get_indexer(
+            pd.MultiIndex.from_arrays([locations, dates])
+        ) < 0
+        X_new = X_new.loc[new]
+        if X_new.empty:
+            return 0
+
+        if context is not None:
+            ctx_locations, ctx_dates = self._keys(context)
+            overlap = pd.MultiIndex.from_arrays([ctx_locations, ctx_dates]).isin(
+                pd.MultiIndex.from_arrays(self._keys(X_new))
+            )
+            context = context.loc[~overlap]
+        frame = X_new if context is None else pd.concat([context, X_new])
+        output = self.features.transform(frame)
+        tail = slice(len(frame) - len(X_new), None)
+        output = (
+            output.iloc[tail] if isinstance(output, pd.DataFrame)
+            else np.asarray(output)[tail]
+        )
+
+        self._write_part(X_new, output)
+        return len(X_new)
+
+    # ------------------------------------------------------------- reads
+
+    def _take(self, positions):
+        part = np.searchsorted(self._offsets, positions, side="right") - 1
+        order = np.argsort(part, kind="stable")
+        restore = np.empty_like(order)
+        restore[order] = np.arange(len(order))
+
+        columns = {}
+        for col, dtype in zip(self.manifest["columns"], self.manifest["dtypes"]):
+            pieces = [
+                self._parts[p][col][positions[order][part[order] == p]
+                                    - self._offsets[p]]
+                for p in np.unique(part)
+            ]
+            values = np.concatenate(pieces) if pieces else np.array([])
+            columns[col] = _from_storable(values[restore], dtype)
+
+        frame = pd.DataFrame(columns)
+        if self.manifest["kind"] == "array":
+            return frame.to_numpy()
+        return frame.astype(dict(zip(self.manifest["columns"],
+                                     self.manifest["dtypes"])),
+                            errors="ignore")
+
+    def get(self, locations, dates):
+        """Stored rows for the given keys, in request order."""
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(locations).astype(str),
+            pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]"),
+        ])
+        positions = self._index.get_indexer(keys)
+        if (positions < 0).any():
+            missing = keys[positions < 0]
+            raise KeyError(f"{len(missing)} keys not in the feature store, "
+                           f"e.g. {missing[0]}")
+        return self._take(positions)
+
+    def get_frame(self, X: pd.DataFrame):
+        """Stored rows matching the keys of ``X``."""
+        return self.get(X[self.location_col], X[self.date_col])
+
+    def contains(self, location, date) -> bool:
+        key = (str(location), np.datetime64(pd.to_datetime(date), "D"))
+        return key in self._index
+
+    def range(self, location=None, start=None, end=None):
+        """Stored rows for one location and/or a date range, by date."""
+        locations = self._index.get_level_values(0).to_numpy()
+        dates = self._index.get_level_values(1).to_numpy()
+
+        mask = np.ones(len(self), dtype=bool)
+        if location is not None:
+            mask &= locations == str(location)
+        if start is not None:
+            mask &= dates >= np.datetime64(pd.to_datetime(start), "D")
+        if end is not None:
+            mask &= dates <= np.datetime64(pd.to_datetime(end), "D")
+
+        positions = np.flatnonzero(mask)
+        positions = positions[np.argsort(dates[positions], kind="stable")]
+        return self._take(positions)
+
+
+def open_feature_store(root: Path, features, X: pd.DataFrame | None = None,
+                       **kwargs) -> FeatureStore:
+    """
+    Store for the current version of ``features``; materialized from
+    ``X`` on first use, otherwise topped up with any new keys of ``X``.
+    """
+    store = FeatureStore(root, features, **kwargs)
+    if X is None:
+        return store
+    if not store.exists:
+        return store.materialize(X)
+
+    store.append(X, context=X)
+    return store
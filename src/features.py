@@ -2,10 +2,67 @@ import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+TIME_COLUMNS = ["month", "day_of_week", "day_of_year", "week_of_year"]
+LAG_COLUMNS = [
+    "mean_temperature_c",
+    "highest_60_min_rainfall_mm",
+    "mean_wind_speed_kmh",
+]
+
+def _median_matrix(loc_median: pd.DataFrame, global_median: pd.Series):
+    """
+    Dense (location + 1, column) medians in ``global_median`` column
+    order. The last row is the global median, which also stands in for
+    location medians that are NaN.
+    """
+    matrix = np.vstack([
+        loc_median.reindex(columns=global_median.index).to_numpy(np.float64),
+        global_median.to_numpy(np.float64),
+    ])
+    return np.where(np.isnan(matrix), matrix[-1], matrix)
+
+
+def _fill_by_location(values, locations, location_index, matrix):
+    # Fills ``values`` in place: one fancy-indexed gather from the median
+    # matrix at the NaN positions only. Unknown (or missing) locations
+    # map to the global row.
+    rows, cols = np.nonzero(np.isnan(values))
+    if len(rows):
+        codes = location_index.get_indexer(locations)
+        codes[codes < 0] = len(matrix) - 1
+        values[rows, cols] = matrix[codes[rows], cols]
+    return values
+
+
 class StructuralWeatherImputer(BaseEstimator, TransformerMixin):
     def __init__(self, location_col="location"):
         self.location_col = location_col
 
+    def __setstate__(self, state):
+        # Pickles saved before the dense matrix existed.
+        if "loc_median_" in state and "median_matrix_" not in state:
+            state["median_matrix_"] = _median_matrix(
+                state["loc_median_"], state["global_median_"]
+            )
+        super().__setstate__(state)
+
+    @classmethod
+    def from_medians(cls, loc_median, global_median, median_matrix=None,
+                     **params):
+        """
+        Fitted imputer from precomputed (e.g. sketched) medians.
+        ``median_matrix`` (e.g. memory-mapped from an artifact) is used
+        as is instead of being rebuilt.
+        """
+        imputer = cls(**params)
+        imputer.loc_median_ = loc_median
+        imputer.global_median_ = global_median
+        imputer.median_matrix_ = (
+            _median_matrix(loc_median, global_median)
+            if median_matrix is None else median_matrix
+        )
+        return imputer
+
     def fit(self, X: pd.DataFrame, y=None):
         self.loc_median_ = (
             X.groupby(self.location_col)
@@ -13,22 +70,29 @@ class StructuralWeatherImputer(BaseEstimator, TransformerMixin):
         )
 
         self.global_median_ = X.median(numeric_only=True)
+        self.median_matrix_ = _median_matrix(
+            self.loc_median_, self.global_median_
+        )
         return self
 
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         df = X.copy()
 
-        for col in self.global_median_.index:
-            if col not in df.columns:
-                continue
-
-            # Location-based fill
-            df[col] = df[col].fillna(
-                df[self.location_col].map(self.loc_median_[col])
-            )
-
-            # Global fallback
-            df[col] = df[col].fillna(self.global_median_[col])
+        # Integer columns cannot hold NaN, so only float ones need filling.
+        cols = [
+            col for col in self.global_median_.index
+            if col in df.columns and df[col].dtype.kind == "f"
+        ]
+        if not cols:
+            return df
+
+        idx = self.global_median_.index.get_indexer(cols)
+        df[cols] = _fill_by_location(
+            df[cols].to_numpy(np.float64, copy=True),
+            df[self.location_col],
+            self.loc_median_.index,
+            self.median_matrix_[:, idx]
+        )
 
         return df
 
@@ -37,6 +101,14 @@ class LocationMedianImputer(BaseEstimator, TransformerMixin):
         self.cols = cols
         self.location_col = location_col
 
+    def __setstate__(self, state):
+        # Pickles saved before the dense matrix existed.
+        if "medians_" in state and "median_matrix_" not in state:
+            state["median_matrix_"] = _median_matrix(
+                state["medians_"], state["global_median_"]
+            )
+        super().__setstate__(state)
+
     def fit(self, X, y=None):
         X_ = X[[self.location_col] + self.cols]
         self.medians_ = (
@@ -45,16 +117,19 @@ class LocationMedianImputer(BaseEstimator, TransformerMixin):
             .median()
         )
         self.global_median_ = X_[self.cols].median()
+        self.median_matrix_ = _median_matrix(
+            self.medians_, self.global_median_
+        )
         return self
 
     def transform(self, X):
         X = X.copy()
-        for col in self.cols:
-            X[col] = X[col].fillna(
-                X[self.location_col].map(self.medians_[col])
-            )
-
-            X[col] = X[col].fillna(self.global_median_[col])
+        X[self.cols] = _fill_by_location(
+            X[self.cols].to_numpy(np.float64, copy=True),
+            X[self.location_col],
+            self.medians_.index,
+            self.median_matrix_
+        )
         return X
 
 
@@ -110,8 +185,19 @@ class WindRainFeatures(BaseEstimator, TransformerMixin):
 
 
 class LagFeatures(BaseEstimator, TransformerMixin):
-    def __init__(self, lag_days: int = 1):
+    """
+    Lagged weather columns. With ``group_col`` the lag is taken within
+    each location ordered by date; without it, in row order.
+    """
+
+    def __init__(self, lag_days: int = 1, group_col=None):
         self.lag_days = lag_days
+        self.group_col = group_col
+
+    def __setstate__(self, state):
+        # Pickles saved before group_col existed lagged in row order.
+        state.setdefault("group_col", None)
+        super().__setstate__(state)
 
     def fit(self, X, y=None):
         return self
@@ -119,6 +205,17 @@ class LagFeatures(BaseEstimator, TransformerMixin):
     def transform(self, X):
         df = X.copy()
 
+        if self.group_col is not None:
+            lagged = _in_group_order(
+                _lag,
+                df[LAG_COLUMNS].to_numpy(dtype=np.float64),
+                _group_layout(df, self.group_col),
+                self.lag_days
+            )
+            for i, col in enumerate(LAG_COLUMNS):
+                df[f"{col}_lag{self.lag_days}"] = lagged[:, i]
+            return df
+
         for col in [
             "mean_temperature_c",
             "highest_60_min_rainfall_mm",
@@ -131,12 +228,42 @@ class LagFeatures(BaseEstimator, TransformerMixin):
 
 
 class RollingStatsFeatures(BaseEstimator, TransformerMixin):
+    """
+    Rolling 7-day means and 3-day max. With ``group_col`` windows never
+    cross locations and follow date order; without it, row order.
+    """
+
+    def __init__(self, group_col=None):
+        self.group_col = group_col
+
+    def __setstate__(self, state):
+        # Pickles saved before group_col existed rolled in row order.
+        state.setdefault("group_col", None)
+        super().__setstate__(state)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
         df = X.copy()
 
+        if self.group_col is not None:
+            layout = _group_layout(df, self.group_col)
+            means = _in_group_order(
+                _rolling_mean,
+                df[["mean_temperature_c", "mean_wind_speed_kmh"]]
+                .to_numpy(dtype=np.float64),
+                layout, 7
+            )
+            df["mean_temp_roll_7d"] = means[:, 0]
+            df["max_rain_roll_3d"] = _in_group_order(
+                _rolling_max,
+                df["highest_60_min_rainfall_mm"].to_numpy(dtype=np.float64),
+                layout, 3
+            )
+            df["mean_wind_roll_7d"] = means[:, 1]
+            return df
+
         df["mean_temp_roll_7d"] = (
             df["mean_temperature_c"].rolling(7, min_periods=1).mean()
         )
@@ -190,18 +317,461 @@ class DropFeatures(BaseEstimator, TransformerMixin):
     def fit(self, X: pd.DataFrame, y=None):
         return self
 
+    def __sklearn_is_fitted__(self):
+        # Stateless; lets Pipeline.transform pass its fitted check.
+        return True
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         df = X.copy()
         return df.drop(columns=self.cols, errors="ignore")
 
 
-class DebugTransformer(BaseEstimator, TransformerMixin):
-    def __init__(self, name):
-        self.name = name
+class LocationCategoryEncoder(BaseEstimator, TransformerMixin):
+    """
+    Encodes location as stable integer category codes (position in
+    ``categories``) for XGBoost's native categorical support. Unknown
+    locations become NaN, i.e. missing.
+    """
+
+    def __init__(self, categories):
+        self.categories = categories
 
     def fit(self, X, y=None):
+        self.categories_ = list(self.categories)
         return self
 
     def transform(self, X):
-        print(self.name, type(X), getattr(X, "shape", None))
-        return X
\ No newline at end of file
+        values = pd.DataFrame(X).iloc[:, 0].astype(str)
+        # Raw folder names use underscores ("Bukit_Panjang").
+        codes = pd.Index(self.categories_).get_indexer(
+            values.str.replace("_", " ", regex=False)
+        )
+        codes = codes.astype(np.float64)
+        codes[codes < 0] = np.nan
+        return codes.reshape(-1, 1)
+
+    def get_feature_names_out(self, input_features=None):
+        if input_features is None:
+            return np.array(["location"], dtype=object)
+        return np.asarray(input_features, dtype=object)
+
+
+
+def feature_dependencies(lag_days: int = 1) -> dict[str, list[str]]:
+    """Input columns of every column derived by the feature transformers."""
+    deps = {col: ["date"] for col in TIME_COLUMNS}
+    deps.update({
+        "temp_range_c": ["maximum_temperature_c", "minimum_temperature_c"],
+        "wind_gust_factor": ["max_wind_speed_kmh", "mean_wind_speed_kmh"],
+        "rain_intensity_ratio": [
+            "highest_60_min_rainfall_mm", "highest_30_min_rainfall_mm"
+        ],
+    })
+    # Lag and rolling columns also read location/date when grouped.
+    keys = ["location", "date"]
+    deps.update({
+        f"{col}_lag{lag_days}": [col] + keys for col in LAG_COLUMNS
+    })
+    deps.update({
+        "mean_temp_roll_7d": ["mean_temperature_c"] + keys,
+        "max_rain_roll_3d": ["highest_60_min_rainfall_mm"] + keys,
+        "mean_wind_roll_7d": ["mean_wind_speed_kmh"] + keys,
+        "day_of_year_sin": ["day_of_year"],
+        "day_of_year_cos": ["day_of_year"],
+        "wind_x_rain": ["mean_wind_speed_kmh", "highest_60_min_rainfall_mm"],
+        "oni_x_temp": ["feature_oni", "mean_temperature_c"],
+        "dmi_x_rainfall": ["feature_dmi", "highest_60_min_rainfall_mm"],
+        "heat_index_proxy": ["feature_rh", "mean_temperature_c"],
+        "aqi_x_temp_range": ["feature_aqi", "temp_range_c"],
+    })
+    return deps
+
+
+def feature_step_outputs(lag_days: int = 1) -> dict[str, list[str]]:
+    """Columns added by each step of ``build_feature_pipeline``."""
+    return {
+        "time": TIME_COLUMNS,
+        "temp": ["temp_range_c"],
+        "wind_rain": ["wind_gust_factor", "rain_intensity_ratio"],
+        "lag": [f"{col}_lag{lag_days}" for col in LAG_COLUMNS],
+        "rolling": [
+            "mean_temp_roll_7d", "max_rain_roll_3d", "mean_wind_roll_7d"
+        ],
+        "cyclical": [
+            "day_of_year_sin", "day_of_year_cos", "wind_x_rain",
+            "oni_x_temp", "dmi_x_rainfall", "heat_index_proxy",
+            "aqi_x_temp_range"
+        ],
+    }
+
+
+def resolve_feature_columns(required, lag_days: int = 1) -> set[str]:
+    """Transitive closure of ``required`` over the feature dependencies."""
+    deps = feature_dependencies(lag_days)
+    needed = set()
+    stack = list(required)
+    while stack:
+        col = stack.pop()
+        if col in needed:
+            continue
+        needed.add(col)
+        stack.extend(deps.get(col, []))
+    return needed
+
+
+def _ratio_or_one(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = num / den
+    return np.where(np.isfinite(ratio), ratio, 1.0)
+
+
+def _group_layout(X, group_col, dates=None):
+    """
+    Permutation that makes each group contiguous and date ordered, plus
+    the start index of each sorted row's group.
+    """
+    if dates is None:
+        dates = pd.to_datetime(X["date"])
+    codes = pd.factorize(X[group_col])[0]
+    order = np.lexsort((np.asarray(dates), codes))
+
+    sorted_codes = codes[order]
+    boundary = np.ones(len(order), dtype=bool)
+    boundary[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.maximum.accumulate(
+        np.where(boundary, np.arange(len(order)), 0)
+    )
+    return order, starts
+
+
+def _in_group_order(fn, values, layout, *args):
+    # Apply a sequence op on the contiguous per-group layout and scatter
+    # the result back to the original row order.
+    order, starts = layout
+    out = np.empty_like(values)
+    out[order] = fn(values[order], *args, starts=starts)
+    return out
+
+
+def _lag(values, lag_days, starts=None):
+    # Works on 1-D or (rows, cols) arrays along axis 0. Rows without a
+    # predecessor in their group keep their own value.
+    lagged = np.full_like(values, np.nan)
+    if lag_days < len(values):
+        lagged[lag_days:] = values[:len(values) - lag_days]
+    if starts is not None:
+        idx = np.arange(len(values))
+        lagged[idx - lag_days < starts] = np.nan
+    return np.where(np.isnan(lagged), values, lagged)
+
+
+def _window_start(n, window, starts):
+    start = np.maximum(np.arange(n) - window + 1, 0)
+    if starts is not None:
+        start = np.maximum(start, starts)
+    return start
+
+
+def _rolling_mean(values, window, starts=None):
+    # Windowed sums from cumulative sums; NaNs are skipped like pandas
+    # rolling(min_periods=1).
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), 0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, 0)])
+
+    end = np.arange(1, len(values) + 1)
+    start = _window_start(len(values), window, starts)
+
+    count = counts[end] - counts[start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (sums[end] - sums[start]) / count
+    return np.where(count > 0, mean, np.nan)
+
+
+def _rolling_max(values, window, starts=None):
+    pad = np.full((window - 1,) + values.shape[1:], np.nan)
+    padded = np.concatenate([pad, values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, 0)
+
+    if starts is not None:
+        # Mask window slots that fall before the row's group start.
+        slot = np.arange(len(values))[:, None] - window + 1 + np.arange(window)
+        outside = slot < starts[:, None]
+        if values.ndim > 1:
+            outside = outside[:, None, :]
+        windows = np.where(outside, np.nan, windows)
+
+    return np.fmax.reduce(windows, axis=-1)
+
+
+class FusedFeatures(BaseEstimator, TransformerMixin):
+    """
+    Single-pass equivalent of ``build_feature_pipeline``.
+
+    Imputes, derives and drops in one transform, writing every float
+    column into one preallocated block instead of copying the frame once
+    per step. Output columns match the chained pipeline; when
+    ``output_cols`` is set only those columns (and what they depend on)
+    are computed.
+
+    ``state`` (a ``FeatureStateStore``) supplies each location's recent
+    history so lag and rolling values of short requests see real past
+    days instead of falling back to the current row.
+    """
+
+    def __init__(self, location_col="location", lag_days: int = 1,
+                 drop_cols=("date",), output_cols=None, group_col=None,
+                 state=None):
+        self.location_col = location_col
+        self.lag_days = lag_days
+        self.drop_cols = drop_cols
+        self.output_cols = output_cols
+        self.group_col = group_col
+        self.state = state
+
+    @classmethod
+    def from_pipeline(cls, feature_pipeline, output_cols=None):
+        """Build a fitted instance from a fitted ``build_feature_pipeline``."""
+        steps = feature_pipeline.named_steps
+        imputer = steps["structural_imputer"]
+
+        return cls.from_medians(
+            imputer.loc_median_,
+            imputer.global_median_,
+            location_col=imputer.location_col,
+            lag_days=getattr(steps["lag"], "lag_days", 1),
+            drop_cols=tuple(steps["drop"].cols),
+            output_cols=output_cols,
+            group_col=getattr(steps["lag"], "group_col", None),
+        )
+
+    @classmethod
+    def from_medians(cls, loc_median, global_median, median_matrix=None,
+                     **params):
+        """
+        Fitted instance from precomputed (e.g. sketched) medians.
+        ``median_matrix`` (e.g. memory-mapped from an artifact) is used
+        as is instead of being rebuilt.
+        """
+        fused = cls(**params)
+        fused.loc_median_ = loc_median
+        fused.global_median_ = global_median
+        fused.median_matrix_ = (
+            _median_matrix(loc_median, global_median)
+            if median_matrix is None else median_matrix
+        )
+        return fused
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.loc_median_ = (
+            X.groupby(self.location_col)
+             .median(numeric_only=True)
+        )
+        self.global_median_ = X.median(numeric_only=True)
+        self.median_matrix_ = _median_matrix(
+            self.loc_median_, self.global_median_
+        )
+        return self
+
+    def _derived_columns(self):
+        steps = feature_step_outputs(self.lag_days)
+        return [
+            col for name, cols in steps.items() if name != "time"
+            for col in cols
+        ]
+
+    def _impute(self, X, cols):
+        idx = self.global_median_.index.get_indexer(cols)
+        return _fill_by_location(
+            X[cols].to_numpy(dtype=np.float64, copy=True),
+            X[self.location_col],
+            self.loc_median_.index,
+            self.median_matrix_[:, idx]
+        )
+
+    def _compute(self, X):
+        """
+        Fill the float block. Returns ``(block, block_cols, n_emitted,
+        output_cols, time)``; the first ``n_emitted`` block columns are
+        emitted, ``time`` holds the computed integer calendar columns.
+        """
+        derived = self._derived_columns()
+        new_cols = TIME_COLUMNS + derived
+        drop = set(self.drop_cols) - set(new_cols)
+
+        output_cols = [
+            c for c in X.columns if c not in drop
+        ] + [c for c in new_cols if c not in X.columns]
+        needed = set(output_cols)
+
+        if self.output_cols is not None:
+            output_cols = [c for c in output_cols if c in self.output_cols]
+            needed = resolve_feature_columns(output_cols, self.lag_days)
+
+        derived = [c for c in derived if c in needed]
+        impute_cols = [
+            c for c in self.global_median_.index
+            if c in needed and c in X.columns and c not in new_cols
+            and X[c].dtype.kind == "f"
+        ]
+
+        # Emitted columns first, helper columns (needed only as inputs)
+        # at the tail of the block.
+        block_cols = [
+            c for c in output_cols if c in impute_cols or c in derived
+        ]
+        block_cols += [
+            c for c in impute_cols + derived if c not in block_cols
+        ]
+        n_emitted = sum(c in output_cols for c in block_cols)
+        position = {c: i for i, c in enumerate(block_cols)}
+
+        block = np.empty(
+            (len(X), len(block_cols)), dtype=np.float64, order="F"
+        )
+        block[:, [position[c] for c in impute_cols]] = self._impute(
+            X, impute_cols
+        )
+
+        def col(name):
+            if name in position:
+                return block[:, position[name]]
+            return X[name].to_numpy(dtype=np.float64)
+
+        lag = self.lag_days
+        sequence = {
+            **{
+                f"{source}_lag{lag}": (_lag, lag, source)
+                for source in LAG_COLUMNS
+            },
+            "mean_temp_roll_7d": (_rolling_mean, 7, "mean_temperature_c"),
+            "max_rain_roll_3d": (
+                _rolling_max, 3, "highest_60_min_rainfall_mm"
+            ),
+            "mean_wind_roll_7d": (_rolling_mean, 7, "mean_wind_speed_kmh"),
+        }
+        sequence = {n: spec for n, spec in sequence.items() if n in derived}
+        group_col = self.group_col
+        if self.state is not None and group_col is None:
+            group_col = self.location_col
+        grouped = bool(sequence) and group_col is not None
+
+        dates = None
+        if grouped or needed & set(TIME_COLUMNS):
+            dates = pd.to_datetime(X["date"])
+
+        layout, history = None, None
+        if grouped:
+            keys = pd.DataFrame({
+                group_col: X[group_col].to_numpy(), "date": dates.to_numpy()
+            })
+            if self.state is not None:
+                # Buffered days before each location's first requested
+                # date go in front of its sequence, then get cut off.
+                history = self.state.history(keys[group_col], keys["date"])
+                history = history.rename(
+                    columns={self.state.location_col: group_col}
+                )
+                keys = pd.concat(
+                    [history[[group_col, "date"]], keys], ignore_index=True
+                )
+            layout = _group_layout(keys, group_col, keys["date"])
+
+        n_history = 0 if history is None else len(history)
+        if n_history:
+            sources = sorted({spec[2] for spec in sequence.values()})
+            history_values = dict(zip(
+                sources,
+                self._impute(
+                    history.rename(columns={group_col: self.location_col}),
+                    sources
+                ).T
+            ))
+
+        # One vectorized pass per (op, window) over all of its columns.
+        passes = dict.fromkeys(spec[:2] for spec in sequence.values())
+        for fn, arg in passes:
+            names = [
+                n for n, spec in sequence.items() if spec[:2] == (fn, arg)
+            ]
+            values = np.column_stack([col(sequence[n][2]) for n in names])
+            if layout is None:
+                out = fn(values, arg)
+            else:
+                if n_history:
+                    values = np.vstack([
+                        np.column_stack([
+                            history_values[sequence[n][2]] for n in names
+                        ]),
+                        values
+                    ])
+                out = _in_group_order(fn, values, layout, arg)[n_history:]
+            block[:, [position[n] for n in names]] = out
+
+        time = {}
+        if needed & set(TIME_COLUMNS):
+            time = {
+                "month": lambda: dates.dt.month.to_numpy(),
+                "day_of_week": lambda: dates.dt.dayofweek.to_numpy(),
+                "day_of_year": lambda: dates.dt.dayofyear.to_numpy(),
+                "week_of_year": lambda: (
+                    dates.dt.isocalendar().week.to_numpy().astype(int)
+                ),
+            }
+            time = {c: time[c]() for c in TIME_COLUMNS if c in needed}
+
+        compute = {
+            "temp_range_c": lambda: (
+                col("maximum_temperature_c") - col("minimum_temperature_c")
+            ),
+            "wind_gust_factor": lambda: _ratio_or_one(
+                col("max_wind_speed_kmh"), col("mean_wind_speed_kmh")
+            ),
+            "rain_intensity_ratio": lambda: _ratio_or_one(
+                col("highest_60_min_rainfall_mm"),
+                col("highest_30_min_rainfall_mm")
+            ),
+            "day_of_year_sin": lambda: np.sin(
+                2 * np.pi * time["day_of_year"] / 366
+            ),
+            "day_of_year_cos": lambda: np.cos(
+                2 * np.pi * time["day_of_year"] / 366
+            ),
+            "wind_x_rain": lambda: (
+                col("mean_wind_speed_kmh") * col("highest_60_min_rainfall_mm")
+            ),
+            "oni_x_temp": lambda: (
+                col("feature_oni") * col("mean_temperature_c")
+            ),
+            "dmi_x_rainfall": lambda: (
+                col("feature_dmi") * col("highest_60_min_rainfall_mm")
+            ),
+            "heat_index_proxy": lambda: (
+                col("feature_rh") * col("mean_temperature_c")
+            ),
+            "aqi_x_temp_range": lambda: (
+                col("feature_aqi") * col("temp_range_c")
+            ),
+        }
+        for name in derived:
+            if name not in sequence:
+                block[:, position[name]] = compute[name]()
+
+        return block, block_cols, n_emitted, output_cols, time
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        block, block_cols, n_emitted, output_cols, time = self._compute(X)
+        position = {c: i for i, c in enumerate(block_cols)}
+
+        df = pd.DataFrame(
+            block[:, :n_emitted], index=X.index,
+            columns=block_cols[:n_emitted], copy=False
+        )
+        for i, name in enumerate(output_cols):
+            if name in position:
+                continue
+            values = time[name] if name in time else X[name].to_numpy()
+            df.insert(i, name, values)
+
+        return df
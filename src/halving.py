@@ -0,0 +1,192 @@
+import logging
+import math
+import time
+import tomllib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import ParameterGrid
+
+from src.cv_cache import (
+    Fold,
+    FoldFeatureCache,
+    _fit_and_score,
+    _strip_prefix,
+    split_pipeline
+)
+from src.model import _take_rows
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("n_estimators", "data", "both")
+
+
+def load_search_space(path: Path, model_type: str) -> tuple[dict, dict]:
+    """
+    ``(param_grid, settings)`` for ``model_type`` from a search-space
+    TOML file: the grid with ``model__`` keys, and the ``[halving]``
+    settings plus the model's ``scoring``.
+    """
+    with open(path, "rb") as f:
+        spaces = tomllib.load(f)
+    if model_type not in spaces:
+        raise KeyError(f"No search space for {model_type!r} in {path}")
+
+    space = spaces[model_type]
+    param_grid = {
+        f"model__{key}": values if isinstance(values, list) else [values]
+        for key, values in space["params"].items()
+    }
+    settings = {**spaces.get("halving", {}), "scoring": space.get("scoring")}
+    return param_grid, settings
+
+
+def _round_params(model):
+    """``n_estimators`` parameters of the model step and their values."""
+    return {
+        key: value for key, value in model.get_params(deep=True).items()
+        if (key == "n_estimators" or key.endswith("__n_estimators"))
+        and isinstance(value, int)
+    }
+
+
+def _scale_rounds(params, rounds, resource):
+    """
+    ``params`` with every ``n_estimators`` value scaled to ``resource``:
+    the candidate's own value when the search space sets one, otherwise
+    the base model's.
+    """
+    values = {**rounds, **{
+        key: value for key, value in params.items()
+        if key == "n_estimators" or key.endswith("__n_estimators")
+    }}
+    return {**params, **{
+        key: max(1, int(round(value * resource)))
+        for key, value in values.items()
+    }}
+
+
+def _recent_rows(fold: Fold, fraction: float) -> Fold:
+    """The most recent ``fraction`` of the fold's training rows."""
+    if fraction >= 1:
+        return fold
+    n_rows = max(1, int(round(len(fold.train_idx) * fraction)))
+    rows = slice(len(fold.train_idx) - n_rows, None)
+    return Fold(
+        fold.train_idx[rows], fold.test_idx,
+        _take_rows(fold.X_train, rows), fold.X_test
+    )
+
+
+class HalvingSearch:
+    """
+    Successive-halving search over model hyperparameters (``model__*``
+    keys, as for ``CachedGridSearch``).
+
+    Every candidate is first scored with a ``min_resource`` share of the
+    boosting rounds and/or of the (most recent) training rows; only the
+    best ``1 / factor`` go on to the next rung, with ``factor`` times the
+    resource, until the survivors are scored at full size. Fold matrices
+    come from ``FoldFeatureCache``, so features are built once per fold
+    for all rungs.
+    """
+
+    def __init__(self, pipe, param_grid, cv, scoring=None, factor=3,
+                 min_resource=1 / 9, resource="both", n_candidates=None,
+                 random_state=42, n_jobs=1, cache_dir=None, budget=None):
+        self.pipe = pipe
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.factor = factor
+        self.min_resource = min_resource
+        self.resource = resource
+        self.n_candidates = n_candidates
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        self.budget = budget
+
+    def _candidates(self):
+        candidates = list(ParameterGrid(self.param_grid))
+        if self.n_candidates and self.n_candidates < len(candidates):
+            rng = np.random.default_rng(self.random_state)
+            keep = rng.choice(len(candidates), self.n_candidates, replace=False)
+            candidates = [candidates[i] for i in sorted(keep)]
+        return candidates
+
+    def _schedule(self):
+        resources, resource = [], self.min_resource
+        # Stop just short of 1 so e.g. 0.111 * 9 is not a rung of its own.
+        while resource < 0.99:
+            resources.append(resource)
+            resource *= self.factor
+        return resources + [1.0]
+
+    def _score(self, model, tasks, folds, y):
+        if self.budget is not None:
+            return self.budget.run(model, tasks, folds, y, self.scoring)
+        return np.asarray(Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_and_score)(model, params, folds[i], y, self.scoring)
+            for params, i in tasks
+        ))
+
+    def fit(self, X, y):
+        if self.resource not in RESOURCES:
+            raise ValueError(f"Unknown resource: {self.resource}")
+
+        start = time.perf_counter()
+        transformer, model = split_pipeline(self.pipe)
+        self.cache_ = FoldFeatureCache(transformer, self.cv, self.cache_dir)
+        folds = self.cache_.folds(X, y)
+        rounds = _round_params(model)
+
+        candidates = self._candidates()
+        alive = list(range(len(candidates)))
+        results = []
+        self.n_fits_ = 0
+
+        for rung, resource in enumerate(self._schedule()):
+            scale = self.resource in ("n_estimators", "both")
+            rung_folds = folds
+            if self.resource in ("data", "both"):
+                rung_folds = [_recent_rows(fold, resource) for fold in folds]
+
+            tasks = []
+            for c in alive:
+                params = _strip_prefix(candidates[c])
+                if scale:
+                    params = _scale_rounds(params, rounds, resource)
+                tasks += [(params, i) for i in range(len(folds))]
+            scores = self._score(model, tasks, rung_folds, y)
+            scores = scores.reshape(len(alive), len(folds))
+            self.n_fits_ += len(tasks)
+
+            for c, row in zip(alive, scores):
+                results.append({
+                    "rung": rung,
+                    "resource": resource,
+                    "params": candidates[c],
+                    **{f"split{i}_test_score": s for i, s in enumerate(row)},
+                    "mean_test_score": row.mean(),
+                    "std_test_score": row.std(),
+                })
+            logger.info(
+                "Rung %d: %d candidates at %.0f%% resource, best %.5f",
+                rung, len(alive), resource * 100, scores.mean(axis=1).max()
+            )
+
+            order = np.argsort(-scores.mean(axis=1), kind="stable")
+            if resource >= 1:
+                best = alive[order[0]]
+                self.best_score_ = scores[order[0]].mean()
+                break
+            n_keep = max(1, math.ceil(len(alive) / self.factor))
+            alive = [alive[i] for i in order[:n_keep]]
+
+        self.cv_results_ = pd.DataFrame(results)
+        self.best_params_ = candidates[best]
+        self.seconds_ = time.perf_counter() - start
+        return self
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.pipeline import Pipeline
+
+from src.artifact import _target_transform, fitted_two_stage
+from src.config import (
+    FEATURE_STATE_DAYS,
+    FULL_RETRAIN_DAYS,
+    MAX_ADDED_ROUNDS,
+    MAX_TOTAL_ADDED_ROUNDS
+)
+
+
+def _continue(estimator, X, y, rounds):
+    """Copy of a fitted XGBoost estimator with ``rounds`` more trees on (X, y)."""
+    booster = estimator.get_booster()
+    feature_types = booster.feature_types
+    dtrain = xgb.DMatrix(
+        X, label=y, missing=np.nan,
+        feature_types=feature_types,
+        enable_categorical=bool(feature_types) and "c" in feature_types
+    )
+    # Training parameters come from the booster's own configuration.
+    booster = xgb.train({}, dtrain, num_boost_round=rounds, xgb_model=booster)
+
+    updated = type(estimator)()
+    updated.load_model(bytearray(booster.save_raw("ubj")))
+    updated.get_booster().load_config(booster.save_config())
+    return updated
+
+
+def new_rows(X: pd.DataFrame, trained_through, date_col: str = "date",
+             location_col: str = "location",
+             context_days: int = FEATURE_STATE_DAYS):
+    """
+    ``(window, context)``: the rows of ``X`` after ``trained_through``,
+    and the last ``context_days`` rows before it per location, which
+    lag features of the window need.
+    """
+    dates = pd.to_datetime(X[date_col])
+    after = dates > pd.Timestamp(trained_through)
+    context = (
+        X.loc[~after]
+         .assign(_date=dates[~after])
+         .sort_values("_date", kind="stable")
+         .groupby(location_col, sort=False)
+         .tail(context_days)
+         .drop(columns="_date")
+    )
+    return X.loc[after], context
+
+
+def continue_boosting(model: Pipeline, X_new: pd.DataFrame, y_new,
+                      context: pd.DataFrame | None = None,
+                      max_rounds: int = MAX_ADDED_ROUNDS):
+    """
+    Continue both stages of a loaded artifact pipeline
+    (``NumericFeatureMatrix`` + two-stage model) on new rows only, adding
+    at most ``max_rounds`` trees each. Feature medians are left as they
+    are. Returns ``(updated pipeline, rounds added per stage)``.
+    """
+    matrix = model.named_steps["features"]
+    two_stage = model.named_steps["model"]
+
+    frame = X_new if context is None else pd.concat([context, X_new])
+    X = matrix.transform(frame)[len(frame) - len(X_new):]
+    y = np.asarray(y_new, dtype=np.float64)
+    rainy = y > two_stage.rain_threshold
+
+    added = {"classifier": max_rounds, "regressor": 0}
+    clf = _continue(two_stage.clf_, X, rainy.astype(int), max_rounds)
+
+    reg = None
+    target_transform = None
+    if two_stage.has_regressor_:
+        reg = two_stage.reg_
+        target_transform = _target_transform(reg)
+        if isinstance(reg, TransformedTargetRegressor):
+            reg, y = reg.regressor_, reg.func(y)
+        if rainy.any():
+            reg = _continue(reg, X[rainy], y[rainy], max_rounds)
+            added["regressor"] = max_rounds
+
+    updated = fitted_two_stage(
+        clf, reg,
+        rain_threshold=two_stage.rain_threshold,
+        gate_epsilon=two_stage.gate_epsilon,
+        target_transform=target_transform,
+        n_features=X.shape[1]
+    )
+    return Pipeline(steps=[("features", matrix), ("model", updated)]), added
+
+
+def full_retrain_reason(training: dict, new_through,
+                        full_retrain_days: int = FULL_RETRAIN_DAYS,
+                        max_total_rounds: int = MAX_TOTAL_ADDED_ROUNDS,
+                        max_rounds: int = MAX_ADDED_ROUNDS) -> str | None:
+    """Why the next update should be a full retrain, or None."""
+    if not training.get("trained_through") or not training.get("last_full_retrain"):
+        return "artifact has no training dates"
+
+    days = (
+        pd.Timestamp(new_through) - pd.Timestamp(training["last_full_retrain"])
+    ).days
+    if days >= full_retrain_days:
+        return f"{days} days since the last full retrain"
+
+    if training.get("added_rounds", 0) + max_rounds > max_total_rounds:
+        return f"over {max_total_rounds} rounds added since the last full retrain"
+    return None
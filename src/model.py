@@ -9,7 +9,8 @@ from sklearn.compose import TransformedTargetRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 from sklearn.base import BaseEstimator, RegressorMixin, clone
 
-from xgboost import XGBRegressor, XGBClassifier
+from xgboost import XGBRegressor, XGBClassifier, XGBModel
+from scipy import sparse
 from sklearn.model_selection import TimeSeriesSplit, cross_val_score
 
 import pandas as pd
@@ -22,7 +23,9 @@ from src.config import (
     MODEL_DIR,
     PROCESS_DIR,
     RAIN_EXTREME_COLUMNS,
-    METEOROGICAL_COLUMNS
+    METEOROGICAL_COLUMNS,
+    VALID_LOCATIONS,
+    PROFILING_ENABLED
 )
 
 from src.features import (
@@ -33,75 +36,275 @@ from src.features import (
     RollingStatsFeatures,
     CyclicalInteractionFeatures,
     DropFeatures,
-    DebugTransformer,
-    StructuralWeatherImputer
+    StructuralWeatherImputer,
+    FusedFeatures,
+    LocationCategoryEncoder,
+    feature_dependencies,
+    feature_step_outputs
 )
+from src.profiling import profile_pipeline, unwrap_step
 
 from sklearn.base import BaseEstimator, RegressorMixin, clone
 import numpy as np
 
+def _as_booster_input(X):
+    """
+    Float32 CSR / C-contiguous copy of a NumPy or SciPy matrix, the
+    layout XGBoost reads without converting again. DataFrames pass
+    through untouched (column names and categoricals matter there).
+    """
+    if sparse.issparse(X):
+        return X.tocsr().astype(np.float32, copy=False)
+    if isinstance(X, np.ndarray):
+        return np.ascontiguousarray(X, dtype=np.float32)
+    return X
+
+
+def _take_rows(X, rows):
+    return X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+
+
+def _iteration_range(estimator):
+    try:
+        return 0, estimator.best_iteration + 1
+    except AttributeError:
+        return 0, 0
+
+
+def _booster_predict(estimator, X, proba=False):
+    """
+    ``inplace_predict`` on the fitted booster of an XGBoost estimator
+    (or one inside a log-target ``TransformedTargetRegressor``), skipping
+    the sklearn wrapper and DMatrix construction. None when the
+    estimator is anything else, so callers fall back to the wrapper.
+    """
+    inverse = None
+    if isinstance(estimator, TransformedTargetRegressor):
+        inverse = estimator.inverse_func
+        estimator = getattr(estimator, "regressor_", None)
+
+    if not isinstance(estimator, XGBModel):
+        return None
+    if proba and estimator.objective != "binary:logistic":
+        return None
+
+    preds = estimator.get_booster().inplace_predict(
+        X,
+        iteration_range=_iteration_range(estimator),
+        missing=estimator.missing,
+        validate_features=False
+    )
+    return preds if inverse is None else inverse(preds)
+
+
+def _fit_with_early_stopping(estimator, X, y, X_val, y_val, rounds):
+    """
+    Fit an XGBoost stage, stopping once ``(X_val, y_val)`` has not
+    improved for ``rounds`` boosting rounds. Inside a
+    ``TransformedTargetRegressor`` the validation target is transformed
+    the same way as the training one.
+    """
+    if isinstance(unwrap_step(estimator), TransformedTargetRegressor):
+        estimator.set_params(regressor__early_stopping_rounds=rounds)
+        y_val = unwrap_step(estimator).func(y_val)
+    else:
+        estimator.set_params(early_stopping_rounds=rounds)
+    estimator.fit(X, y, eval_set=[(X_val, y_val)], verbose=False)
+
+
+def _best_iteration(estimator):
+    estimator = unwrap_step(estimator)
+    if isinstance(estimator, TransformedTargetRegressor):
+        estimator = estimator.regressor_
+    return getattr(estimator, "best_iteration", None)
+
+
 class TwoStageRainfallModel(BaseEstimator, RegressorMixin):
-    def __init__(self, classifier, regressor, rain_threshold=0.0):
+    """
+    ``P(rain) * E[rain | rain]``. With ``gate_epsilon`` set, rows whose
+    rain probability is below it predict 0 and only the rest are sent to
+    the regressor, as one compacted batch.
+
+    With ``shared_matrix`` the input is converted once to the float32
+    layout XGBoost reads, and both boosters predict on it in place
+    instead of each building its own DMatrix.
+
+    With ``early_stopping_rounds`` the last ``validation_fraction`` of
+    the training rows is held out (rows must be in time order, as for
+    ``TimeSeriesSplit``) and both stages stop boosting once it stops
+    improving; ``best_iterations_`` records where.
+    """
+
+    def __init__(self, classifier, regressor, rain_threshold=0.0,
+                 gate_epsilon=None, shared_matrix=True,
+                 early_stopping_rounds=None, validation_fraction=0.1):
         self.classifier = classifier
         self.regressor = regressor
         self.rain_threshold = rain_threshold
+        self.gate_epsilon = gate_epsilon
+        self.shared_matrix = shared_matrix
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+
+    def __setstate__(self, state):
+        # Models pickled before gating / the shared matrix / early
+        # stopping existed.
+        state.setdefault("gate_epsilon", None)
+        state.setdefault("shared_matrix", True)
+        state.setdefault("early_stopping_rounds", None)
+        state.setdefault("validation_fraction", 0.1)
+        super().__setstate__(state)
+
+    def _validation_start(self, n_rows):
+        """First row of the validation tail, or None without one."""
+        if not self.early_stopping_rounds:
+            return None
+        n_val = int(round(n_rows * self.validation_fraction))
+        if n_val < 1 or n_val >= n_rows:
+            return None
+        return n_rows - n_val
+
+    def _fit_stage(self, estimator, X, y, rows, start):
+        """Fit on ``rows`` (None: all), early stopping on those >= start."""
+        if start is None:
+            if rows is None:
+                estimator.fit(X, y)
+            else:
+                estimator.fit(_take_rows(X, rows), y[rows])
+            return
+
+        if rows is None:
+            rows = np.arange(X.shape[0])
+        fit_rows, val_rows = rows[rows < start], rows[rows >= start]
+        if len(val_rows) == 0:
+            estimator.fit(_take_rows(X, fit_rows), y[fit_rows])
+            return
+
+        _fit_with_early_stopping(
+            estimator,
+            _take_rows(X, fit_rows), y[fit_rows],
+            _take_rows(X, val_rows), y[val_rows],
+            self.early_stopping_rounds
+        )
 
     def fit(self, X, y):
         self.clf_ = clone(self.classifier)
         self.reg_ = clone(self.regressor)
 
+        if self.shared_matrix:
+            X = _as_booster_input(X)
+
+        y = np.asarray(y)
         rain_flag = (y > self.rain_threshold).astype(int)
+        start = self._validation_start(X.shape[0])
 
-        self.clf_.fit(X, rain_flag)
+        self._fit_stage(self.clf_, X, rain_flag, None, start)
+        self.best_iterations_ = {"classifier": _best_iteration(self.clf_)}
 
-        mask = (rain_flag == 1).to_numpy()
+        rows = np.flatnonzero(rain_flag == 1)
 
-        if mask.sum() == 0:
+        if len(rows) == 0 or (start is not None and rows[0] >= start):
             self.has_regressor_ = False
             return self
 
         self.has_regressor_ = True
 
-        self.reg_.fit(X[mask], y.to_numpy()[mask])
+        self._fit_stage(self.reg_, X, y, rows, start)
+        self.best_iterations_["regressor"] = _best_iteration(self.reg_)
 
         return self
 
+    def _stage_predict(self, estimator, X, proba=False):
+        preds = None
+        if self.shared_matrix:
+            preds = _booster_predict(estimator, X, proba=proba)
+        if preds is not None:
+            return preds
+        return estimator.predict_proba(X)[:, 1] if proba else estimator.predict(X)
+
+    def predict_rain_proba(self, X):
+        """P(rain) from the classifier stage alone."""
+        if self.shared_matrix:
+            X = _as_booster_input(X)
+        return self._stage_predict(self.clf_, X, proba=True)
 
     def predict(self, X):
-        p_rain = self.clf_.predict_proba(X)[:, 1]
+        if self.shared_matrix:
+            X = _as_booster_input(X)
+
+        p_rain = self._stage_predict(self.clf_, X, proba=True)
 
         if not self.has_regressor_:
-            return np.zeros(len(X))
+            return np.zeros(X.shape[0])
+
+        if not self.gate_epsilon:
+            rain_pred = self._stage_predict(self.reg_, X)
+            return p_rain * rain_pred
+
+        rows = np.flatnonzero(p_rain >= self.gate_epsilon)
+        preds = np.zeros_like(p_rain)
+        if len(rows):
+            preds[rows] = p_rain[rows] * self._stage_predict(
+                self.reg_, _take_rows(X, rows)
+            )
+        return preds
 
-        rain_pred = self.reg_.predict(X)
-        return p_rain * rain_pred
 
+def build_feature_pipeline(fused=False):
+    if fused:
+        return FusedFeatures(
+            lag_days=1, drop_cols=("date",), group_col="location"
+        )
 
-def build_feature_pipeline():
     return Pipeline(steps=[
         ("structural_imputer", StructuralWeatherImputer()),
         ("time", TimeFeatures()),
         ("temp", TemperatureFeatures()),
         ("wind_rain", WindRainFeatures()),
-        ("lag", LagFeatures(lag_days=1)),
-        ("rolling", RollingStatsFeatures()),
+        ("lag", LagFeatures(lag_days=1, group_col="location")),
+        ("rolling", RollingStatsFeatures(group_col="location")),
         ("cyclical", CyclicalInteractionFeatures()),
         ("drop", DropFeatures(['date']))
     ])
 
 
-def build_preprocessor():
+# Booster column types when location is a native categorical: the
+# category codes first, then the passthrough weather columns.
+NATIVE_FEATURE_TYPES = (
+    ["c"] + ["q"] * len(METEOROGICAL_COLUMNS + RAIN_EXTREME_COLUMNS)
+)
+
+
+def build_preprocessor(location_encoding="onehot"):
+    if location_encoding == "onehot":
+        location = OneHotEncoder(handle_unknown="ignore")
+        sparse_threshold = 0.3
+    elif location_encoding == "native":
+        location = LocationCategoryEncoder(categories=VALID_LOCATIONS)
+        sparse_threshold = 0.0
+    else:
+        raise ValueError(f"Unknown location_encoding: {location_encoding}")
+
     return ColumnTransformer(
         transformers=[
-            ("cat", OneHotEncoder(handle_unknown="ignore"), ['location']),
+            ("cat", location, ['location']),
             ("num", "passthrough",
              METEOROGICAL_COLUMNS + RAIN_EXTREME_COLUMNS),
         ],
-        remainder="drop"
+        remainder="drop",
+        sparse_threshold=sparse_threshold
     )
 
 
-def build_classifier(xgb_params=None):
+def _categorical_params():
+    return dict(
+        tree_method="hist",
+        enable_categorical=True,
+        feature_types=NATIVE_FEATURE_TYPES
+    )
+
+
+def build_classifier(xgb_params=None, categorical=False):
     default_params = dict(
         # objective="binary:logistic",
         # scale_pos_weight=1.0,
@@ -127,13 +330,17 @@ def build_classifier(xgb_params=None):
         n_jobs=-1
     )
 
+    if categorical:
+        default_params.update(_categorical_params())
+
     if xgb_params:
         default_params.update(xgb_params)
 
     return XGBClassifier(**default_params)
 
 
-def build_regressor(xgb_params=None, transform_target=False):
+def build_regressor(xgb_params=None, transform_target=False,
+                    categorical=False):
     default_params = dict(
         objective="reg:squarederror",
         n_estimators=1000,
@@ -148,6 +355,9 @@ def build_regressor(xgb_params=None, transform_target=False):
         n_jobs=-1
     )
 
+    if categorical:
+        default_params.update(_categorical_params())
+
     if xgb_params:
         default_params.update(xgb_params)
 
@@ -167,28 +377,44 @@ def build_model(
     xgb_params=None,
     transform_target=False,
     classifier_params=None,
-    rain_threshold=0.0
+    rain_threshold=0.0,
+    categorical=False,
+    gate_epsilon=None,
+    early_stopping_rounds=None,
+    validation_fraction=0.1
 ):
+    if early_stopping_rounds and model_type != "two_stage":
+        raise ValueError("Early stopping needs model_type='two_stage'")
+
     if model_type == "regressor":
         return build_regressor(
             xgb_params=xgb_params,
-            transform_target=transform_target
+            transform_target=transform_target,
+            categorical=categorical
         )
 
     if model_type == "classifier":
-        return build_classifier(xgb_params=classifier_params)
+        return build_classifier(
+            xgb_params=classifier_params, categorical=categorical
+        )
 
     if model_type == "two_stage":
-        clf = build_classifier(xgb_params=classifier_params)
+        clf = build_classifier(
+            xgb_params=classifier_params, categorical=categorical
+        )
         reg = build_regressor(
             xgb_params=xgb_params,
-            transform_target=transform_target
+            transform_target=transform_target,
+            categorical=categorical
         )
 
         return TwoStageRainfallModel(
             classifier=clf,
             regressor=reg,
-            rain_threshold=rain_threshold
+            rain_threshold=rain_threshold,
+            gate_epsilon=gate_epsilon,
+            early_stopping_rounds=early_stopping_rounds,
+            validation_fraction=validation_fraction
         )
 
     raise ValueError(f"Unknown model_type: {model_type}")
@@ -196,25 +422,170 @@ def build_model(
 def build_pipeline(
     model_type="two_stage",
     xgb_params=None,
-    transform_target=False
+    transform_target=False,
+    fused_features=False,
+    prune_features=False,
+    location_encoding="onehot",
+    profile=None,
+    gate_epsilon=None,
+    early_stopping_rounds=None,
+    validation_fraction=0.1
 ):
-    return Pipeline(steps=[
-        ("features", build_feature_pipeline()),
-        ("preprocess", build_preprocessor()),
+    pipe = Pipeline(steps=[
+        ("features", build_feature_pipeline(fused=fused_features)),
+        ("preprocess", build_preprocessor(
+            location_encoding=location_encoding
+        )),
         ("model", build_model(
             model_type=model_type,
             transform_target=transform_target,
-            rain_threshold=0.1
+            rain_threshold=0.1,
+            categorical=location_encoding == "native",
+            gate_epsilon=gate_epsilon,
+            early_stopping_rounds=early_stopping_rounds,
+            validation_fraction=validation_fraction
         ))
     ])
 
+    if prune_features:
+        prune_feature_pipeline(pipe)
+
+    if profile is None:
+        profile = PROFILING_ENABLED
+    if profile:
+        profile_pipeline(pipe)
+
+    return pipe
+
+
+def required_feature_columns(model):
+    """
+    Columns the stages after ``features`` actually read, or None when
+    every column may be used (remainder kept, non-string selectors, or
+    nothing to inspect).
+    """
+    steps = dict(model.steps)
+    preprocessor = steps.get("preprocess")
+
+    if preprocessor is None:
+        names = getattr(steps.get("model"), "feature_names_in_", None)
+        return None if names is None else list(names)
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        return None
+    if preprocessor.remainder != "drop":
+        return None
+
+    transformers = getattr(
+        preprocessor, "transformers_", preprocessor.transformers
+    )
+
+    required = []
+    for name, transformer, columns in transformers:
+        if name == "remainder" or transformer == "drop":
+            continue
+        if isinstance(columns, str):
+            columns = [columns]
+        if not all(isinstance(c, str) for c in columns):
+            return None
+        required += [c for c in columns if c not in required]
+
+    return required
+
+
+def prune_feature_pipeline(model):
+    """
+    Skip feature work whose output the preprocessor/model never reads.
+
+    ``FusedFeatures`` is restricted column by column; in the chained
+    pipeline whole steps are set to ``"passthrough"`` when none of their
+    outputs is needed, directly or as input of another needed step.
+    Works on fitted and unfitted pipelines.
+    """
+    if "features" not in dict(model.steps):
+        return model
+
+    required = required_feature_columns(model)
+    if required is None:
+        return model
+
+    features = model.named_steps["features"]
+    if isinstance(features, FusedFeatures):
+        features.set_params(output_cols=list(required))
+        return model
+
+    if not isinstance(features, Pipeline):
+        return model
+
+    # Already pruned: a "passthrough" lag step has no lag_days.
+    lag_days = getattr(features.named_steps["lag"], "lag_days", 1)
+    deps = feature_dependencies(lag_days)
+    step_outputs = feature_step_outputs(lag_days)
+
+    needed = set(required)
+    kept = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, outputs in step_outputs.items():
+            if name in kept or not needed & set(outputs):
+                continue
+            kept.add(name)
+            for col in outputs:
+                needed.update(deps[col])
+            changed = True
+
+    features.steps = [
+        (name, "passthrough")
+        if name in step_outputs and name not in kept else (name, step)
+        for name, step in features.steps
+    ]
+    return model
+
+
+def fuse_feature_pipeline(model):
+    """
+    Swap the chained ``features`` step of a fitted (e.g. unpickled)
+    pipeline for an equivalent fitted ``FusedFeatures``.
+    """
+    features = model.named_steps["features"]
+    if isinstance(features, FusedFeatures):
+        return model
+
+    idx = [name for name, _ in model.steps].index("features")
+    model.steps[idx] = ("features", FusedFeatures.from_pipeline(features))
+    return model
+
+
+def attach_feature_state(model, state):
+    """
+    Let the feature step read per-location history from a
+    ``FeatureStateStore``; chained features are fused first.
+    """
+    features = model.named_steps["features"]
+    if hasattr(features, "order"):
+        # Float32 pipeline (NumericFeatureMatrix) around a fused step.
+        features.set_params(features__state=state)
+        return model
+
+    model = fuse_feature_pipeline(model)
+    model.named_steps["features"].set_params(state=state)
+    return model
+
 
 def inference_data(
     model,
     data: pd.DataFrame,
     clip_negative: bool = True,
-    return_dataframe: bool = True
+    return_dataframe: bool = True,
+    backend: str = "booster"
 ):
+    if backend == "numpy":
+        from src.tree_predictor import compiled_pipeline
+        model = compiled_pipeline(model)
+    elif backend != "booster":
+        raise ValueError(f"Unknown backend: {backend}")
+
     preds = model.predict(data)
 
     if clip_negative:
@@ -255,12 +626,15 @@ if __name__ == '__main__':
     # print(mean_squared_error(pipe.predict(X), y))
     # print(mean_absolute_error(pipe.predict(X), y))
 
-    pipe.fit(X, y)
-    from sklearn.metrics import accuracy_score, classification_report
+    # Fit on the first 80% of days, sweep thresholds on the rest.
+    split = int(len(X) * 0.8)
+    X_train, X_val = X.iloc[:split], X.iloc[split:]
+    y_train, y_val = y.iloc[:split], y.iloc[split:]
+
+    pipe.fit(X_train, y_train)
+    from src.thresholds import threshold_sweep, best_threshold
 
-    proba = pipe.predict_proba(X)[:, 1]
+    proba = pipe.predict_proba(X_val)[:, 1]
 
-    for t in [0.35, 0.45, 0.55, 0.65]:
-        y_pred = (proba >= t).astype(int)
-        print(f"\nThreshold = {t}")
-        print(classification_report(y_val, y_pred))
\ No newline at end of file
+    sweep = threshold_sweep(y_val, proba, groups=X_val["location"])
+    print(best_threshold(sweep).to_string(index=False))
@@ -0,0 +1,158 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from src.config import FEATURE_ORDER_PATH
+from src.features import LocationCategoryEncoder
+from src.model import fuse_feature_pipeline, prune_feature_pipeline
+
+
+def feature_order_spec(model) -> dict:
+    """
+    Booster input layout of a fitted pipeline: the preprocessor's output
+    columns in order, described block by block.
+    """
+    preprocessor = model.named_steps["preprocess"]
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError("Numeric mode needs a fitted ColumnTransformer")
+
+    # Fitted transformers_ wrap "passthrough", so the declared spec
+    # decides the kind and the fitted one supplies categories.
+    declared = {name: t for name, t, _ in preprocessor.transformers}
+
+    blocks = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder" or transformer == "drop":
+            continue
+        if isinstance(columns, str):
+            columns = [columns]
+
+        if isinstance(transformer, OneHotEncoder) and len(columns) == 1:
+            blocks.append({
+                "type": "onehot",
+                "column": columns[0],
+                "categories": transformer.categories_[0].tolist(),
+            })
+        elif isinstance(transformer, LocationCategoryEncoder):
+            blocks.append({
+                "type": "codes",
+                "column": columns[0],
+                "categories": list(transformer.categories_),
+            })
+        elif declared.get(name) == "passthrough":
+            blocks.append({"type": "numeric", "columns": list(columns)})
+        else:
+            raise ValueError(
+                f"Numeric mode cannot encode transformer {name!r}"
+            )
+
+    return {
+        "columns": preprocessor.get_feature_names_out().tolist(),
+        # A sparse ColumnTransformer output drops zeros, which XGBoost
+        # then treats as missing; the dense path has to do the same.
+        "zero_as_missing": bool(preprocessor.sparse_output_),
+        "blocks": blocks,
+    }
+
+
+def save_feature_order(model, path: Path = FEATURE_ORDER_PATH) -> dict:
+    spec = feature_order_spec(model)
+    Path(path).write_text(json.dumps(spec, indent=2))
+    return spec
+
+
+def load_feature_order(path: Path = FEATURE_ORDER_PATH) -> dict | None:
+    path = Path(path)
+    if not path.exists() or not path.read_text().strip():
+        return None
+    return json.loads(path.read_text())
+
+
+class NumericFeatureMatrix(BaseEstimator, TransformerMixin):
+    """
+    Replaces the ``features`` + ``preprocess`` steps of a fitted
+    pipeline at inference: runs a fitted ``FusedFeatures`` and writes
+    the booster input straight into one C-contiguous float32 matrix in
+    ``order`` (see ``feature_order_spec``).
+    """
+
+    def __init__(self, features, order):
+        self.features = features
+        self.order = order
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        block, block_cols, _, _, time = self.features._compute(X)
+        position = {c: i for i, c in enumerate(block_cols)}
+        zero_as_missing = self.order["zero_as_missing"]
+
+        n = len(X)
+        width = len(self.order["columns"])
+        out = np.full(
+            (n, width), np.nan if zero_as_missing else 0.0, np.float32
+        )
+
+        start = 0
+        for spec in self.order["blocks"]:
+            if spec["type"] == "onehot":
+                categories = pd.Index(spec["categories"])
+                codes = categories.get_indexer(X[spec["column"]])
+                rows = np.flatnonzero(codes >= 0)
+                out[rows, start + codes[rows]] = 1.0
+                start += len(categories)
+                continue
+
+            if spec["type"] == "codes":
+                encoder = LocationCategoryEncoder(spec["categories"])
+                out[:, start] = encoder.fit(None).transform(
+                    X[[spec["column"]]]
+                )[:, 0]
+                start += 1
+                continue
+
+            for j, name in enumerate(spec["columns"]):
+                if name in position:
+                    values = block[:, position[name]]
+                elif name in time:
+                    values = time[name]
+                else:
+                    values = X[name].to_numpy(dtype=np.float64)
+
+                if zero_as_missing:
+                    values = np.where(values == 0, np.nan, values)
+                out[:, start + j] = values
+            start += len(spec["columns"])
+
+        return out
+
+
+def build_numeric_pipeline(model, order: dict | None = None):
+    """
+    Inference-only pipeline handing a float32 matrix to the fitted model
+    step. ``order`` (e.g. from ``models/feature_order.json``) must match
+    the model's own preprocessor layout.
+    """
+    expected = feature_order_spec(model)
+    if order is not None and order != expected:
+        raise ValueError(
+            "feature_order.json does not match the model's preprocessor"
+        )
+
+    model = prune_feature_pipeline(fuse_feature_pipeline(model))
+    return Pipeline(steps=[
+        ("features", NumericFeatureMatrix(
+            model.named_steps["features"], expected
+        )),
+        ("model", model.named_steps["model"]),
+    ])
@@ -0,0 +1,249 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+
+from src.artifact import fitted_two_stage
+from src.config import FEATURE_STATE_DAYS, SKETCH_CHUNKSIZE
+from src.features import FusedFeatures
+from src.model import (
+    NATIVE_FEATURE_TYPES,
+    build_classifier,
+    build_preprocessor,
+    build_regressor
+)
+from src.numeric import NumericFeatureMatrix, feature_order_spec
+from src.sketch import fit_imputer_out_of_core, iter_chunks
+
+TARGET_COL = "daily_rainfall_total_mm"
+
+
+def write_partitions(sources, root: Path, chunksize: int = SKETCH_CHUNKSIZE,
+                     location_col: str = "location",
+                     date_col: str = "date") -> list[Path]:
+    """
+    Split CSV/Parquet sources into ``root/<location>/<year>.csv`` files,
+    streaming ``chunksize`` rows at a time. Each partition ends up
+    sorted by date.
+    """
+    root = Path(root)
+    written = set()
+    for chunk in iter_chunks(sources, chunksize):
+        years = pd.to_datetime(chunk[date_col]).dt.year
+        for (location, year), part in chunk.groupby(
+            [chunk[location_col], years], sort=False
+        ):
+            path = root / str(location) / f"{year}.csv"
+            if path not in written and path.exists():
+                path.unlink()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            part.to_csv(path, mode="a", header=path not in written, index=False)
+            written.add(path)
+
+    # One location-year is small enough to sort in memory.
+    for path in written:
+        pd.read_csv(path).sort_values(date_col, kind="stable").to_csv(
+            path, index=False
+        )
+    return sorted(written)
+
+
+def list_partitions(root: Path) -> list[Path]:
+    """Partition files under ``root``, by location and then year."""
+    root = Path(root)
+    return sorted(root.glob("*/*.csv")) + sorted(root.glob("*/*.parquet"))
+
+
+def _read_partition(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def feature_order_for(features, location_encoding: str = "onehot") -> dict:
+    """
+    Booster input layout of ``build_preprocessor`` over the locations
+    ``features`` was fitted on, without a pass over the training data.
+    """
+    preprocessor = build_preprocessor(location_encoding=location_encoding)
+    columns = [
+        col for _, _, cols in preprocessor.transformers for col in cols
+        if col != "location"
+    ]
+    sample = pd.DataFrame({
+        "location": features.loc_median_.index.astype(str),
+        **{col: np.nan for col in columns},
+    })
+    # Same density as real rows (one location + the numeric columns),
+    # so the sparse/dense decision matches an in-memory fit.
+    preprocessor.fit(sample)
+    return feature_order_spec(Pipeline(steps=[("preprocess", preprocessor)]))
+
+
+class PartitionIter(xgb.DataIter):
+    """
+    Feeds XGBoost batches of about ``batch_rows`` rows, built from
+    consecutive partitions (XGBoost walks every batch once per boosting
+    round, so many tiny batches are slow). Each partition is transformed
+    together with the last ``context_days`` rows of the previous
+    partition of the same location, so lag features at a year boundary
+    see the real previous days.
+
+    ``stage="classifier"`` labels every row with rain / no rain;
+    ``stage="regressor"`` keeps the rainy rows with their amount (through
+    ``target_func`` when the target is transformed).
+    """
+
+    def __init__(self, partitions, matrix, stage="classifier",
+                 rain_threshold=0.1, target_func=None, feature_types=None,
+                 context_days=FEATURE_STATE_DAYS, target_col=TARGET_COL,
+                 batch_rows=SKETCH_CHUNKSIZE, cache_prefix=None):
+        self.partitions = [Path(p) for p in partitions]
+        self.matrix = matrix
+        self.stage = stage
+        self.rain_threshold = rain_threshold
+        self.target_func = target_func
+        self.feature_types = feature_types
+        self.context_days = context_days
+        self.target_col = target_col
+        self.batch_rows = batch_rows
+        self.reset()
+        # on_host=False keeps the cached pages on disk under cache_prefix.
+        super().__init__(cache_prefix=cache_prefix, on_host=False)
+
+    def reset(self):
+        self._next = 0
+        self._context = (None, None)
+
+    def _batch(self, path):
+        part = _read_partition(path)
+        location, context = self._context
+        if location == path.parent and context is not None:
+            frame = pd.concat([context, part], ignore_index=True)
+        else:
+            frame = part
+        self._context = (path.parent, part.tail(self.context_days))
+
+        X = self.matrix.transform(frame.drop(columns=[self.target_col]))
+        X = X[len(frame) - len(part):]
+        y = part[self.target_col].fillna(0).to_numpy(dtype=np.float64)
+
+        if self.stage == "classifier":
+            return X, (y > self.rain_threshold).astype(np.float32)
+
+        rainy = y > self.rain_threshold
+        y = y[rainy]
+        if self.target_func is not None:
+            y = self.target_func(y)
+        return X[rainy], y
+
+    def next(self, input_data):
+        matrices, labels, n_rows = [], [], 0
+        while self._next < len(self.partitions) and n_rows < self.batch_rows:
+            X, label = self._batch(self.partitions[self._next])
+            self._next += 1
+            matrices.append(X)
+            labels.append(label)
+            n_rows += len(label)
+
+        if n_rows == 0:
+            return False
+        input_data(data=np.concatenate(matrices), label=np.concatenate(labels),
+                   feature_types=self.feature_types)
+        return True
+
+
+def _booster_params(estimator) -> dict:
+    params = {
+        key: value for key, value in estimator.get_xgb_params().items()
+        if value is not None
+    }
+    for key in ("enable_categorical", "feature_types", "n_estimators"):
+        params.pop(key, None)
+    # External memory is only supported by the histogram method.
+    params["tree_method"] = "hist"
+    return params
+
+
+def train_out_of_core(
+    partitions,
+    cache_dir: Path,
+    rain_threshold=0.1,
+    transform_target=False,
+    classifier_params=None,
+    xgb_params=None,
+    location_encoding="onehot",
+    chunksize: int = SKETCH_CHUNKSIZE,
+    n_jobs: int = 1
+) -> Pipeline:
+    """
+    Two-stage model trained from partition files without loading them
+    together: medians are sketched chunk by chunk, and each booster is
+    trained on an ``ExtMemQuantileDMatrix`` fed by ``PartitionIter``.
+    Memory is bounded by ``chunksize`` rows, not by the dataset.
+
+    Returns the same inference pipeline as ``load_artifact``
+    (``NumericFeatureMatrix`` + fitted ``TwoStageRainfallModel``).
+    """
+    partitions = [Path(p) for p in partitions]
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    features = fit_imputer_out_of_core(
+        partitions,
+        imputer_cls=FusedFeatures,
+        n_jobs=n_jobs,
+        chunksize=chunksize,
+        exclude=[TARGET_COL],
+        lag_days=1,
+        drop_cols=("date",),
+        group_col="location"
+    )
+    order = feature_order_for(features, location_encoding)
+    matrix = NumericFeatureMatrix(features, order)
+
+    categorical = location_encoding == "native"
+    feature_types = NATIVE_FEATURE_TYPES if categorical else None
+    stages = {
+        "classifier": build_classifier(
+            xgb_params=classifier_params, categorical=categorical
+        ),
+        "regressor": build_regressor(
+            xgb_params=xgb_params, categorical=categorical
+        ),
+    }
+
+    trained = {}
+    for stage, estimator in stages.items():
+        batches = PartitionIter(
+            partitions, matrix,
+            stage=stage,
+            rain_threshold=rain_threshold,
+            target_func=np.log1p if transform_target else None,
+            feature_types=feature_types,
+            batch_rows=chunksize,
+            cache_prefix=str(cache_dir / stage)
+        )
+        dtrain = xgb.ExtMemQuantileDMatrix(
+            batches, missing=np.nan, enable_categorical=categorical
+        )
+        if dtrain.num_row() == 0:
+            trained[stage] = None
+            continue
+
+        booster = xgb.train(
+            _booster_params(estimator), dtrain,
+            num_boost_round=estimator.n_estimators
+        )
+        # Wrap in the sklearn estimator through the native format, as
+        # load_artifact does.
+        estimator.load_model(bytearray(booster.save_raw("ubj")))
+        trained[stage] = estimator
+
+    model = fitted_two_stage(
+        trained["classifier"], trained["regressor"],
+        rain_threshold=rain_threshold,
+        target_transform="log1p" if transform_target else None,
+        n_features=len(order["columns"])
+    )
+    return Pipeline(steps=[("features", matrix), ("model", model)])
@@ -0,0 +1,292 @@
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.pipeline import Pipeline
+from sklearn.utils.metaestimators import available_if
+
+def _describe(output):
+    """``(shape, dtype)`` of a step output, for the report."""
+    if not hasattr(output, "shape"):
+        return None, None
+    shape = output.shape
+    if isinstance(output, pd.DataFrame):
+        dtype = ",".join(sorted({str(t) for t in output.dtypes}))
+    else:
+        dtype = str(getattr(output, "dtype", type(output).__name__))
+    return shape, dtype
+
+
+class StepProfiler:
+    """
+    Collects one record per profiled call: wall time, rows/sec, peak
+    traced allocation above the memory in use at entry, and the output
+    shape/dtype. Nested calls (a model step and the classifier/regressor
+    inside it) each get their own record; the outer peak includes the
+    inner ones.
+
+    Safe to share across request threads: each thread keeps its own
+    stack of open calls, totals per (step, method) are updated under a
+    lock, and only the last ``max_records`` raw records are kept.
+    ``tracemalloc`` is started once and left running. Its traced memory
+    and peak are process-wide and every call resets the peak, so when
+    calls overlap across threads the memory figures are approximate:
+    they include other threads' allocations and may miss a peak another
+    thread reset. Profile single-threaded for exact per-step memory.
+    """
+
+    def __init__(self, trace_memory: bool = True, max_records: int = 10_000):
+        self.trace_memory = trace_memory
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    @property
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def reset(self):
+        with self._lock:
+            self.records = deque(maxlen=self.max_records)
+            self._totals = {}
+
+    def _start_tracing(self):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+            key = (record["step"], record["method"])
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = {
+                    "calls": 0, "rows": 0, "total_seconds": 0.0,
+                    "max_peak_mem_delta_mb": np.nan,
+                }
+            totals["calls"] += 1
+            totals["rows"] += record["rows"]
+            totals["total_seconds"] += record["seconds"]
+            totals["max_peak_mem_delta_mb"] = np.fmax(
+                totals["max_peak_mem_delta_mb"], record["peak_mem_delta_mb"]
+            )
+            totals["output_shape"] = record["output_shape"]
+            totals["output_dtype"] = record["output_dtype"]
+
+    @contextmanager
+    def _measure(self, step, method, rows):
+        trace = self.trace_memory
+        if trace and not tracemalloc.is_tracing():
+            self._start_tracing()
+
+        stack = self._stack
+        frame = {"child_peak": 0, "output": None}
+        if trace:
+            frame["start"] = tracemalloc.get_traced_memory()[0]
+            if stack:
+                # Fold the parent's peak so far before resetting it.
+                parent = stack[-1]
+                parent["child_peak"] = max(
+                    parent["child_peak"], tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        stack.append(frame)
+
+        start = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+
+            peak_delta = np.nan
+            if trace:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+                peak_delta = peak - frame["start"]
+                if stack:
+                    parent = stack[-1]
+                    parent["child_peak"] = max(parent["child_peak"], peak)
+
+            shape, dtype = _describe(frame["output"])
+            self._add({
+                "step": step,
+                "method": method,
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_sec": rows / seconds if seconds > 0 else np.nan,
+                "peak_mem_delta_mb": peak_delta / 2**20,
+                "output_shape": shape,
+                "output_dtype": dtype,
+            })
+
+    def report(self) -> pd.DataFrame:
+        """Per (step, method) totals, slowest first."""
+        with self._lock:
+            totals = [
+                {"step": step, "method": method, **values}
+                for (step, method), values in self._totals.items()
+            ]
+        if not totals:
+            return pd.DataFrame()
+
+        report = pd.DataFrame(totals)[[
+            "step", "method", "calls", "rows", "total_seconds",
+            "max_peak_mem_delta_mb", "output_shape", "output_dtype",
+        ]]
+        report.insert(
+            5, "rows_per_sec", report["rows"] / report["total_seconds"]
+        )
+        return report.sort_values(
+            "total_seconds", ascending=False
+        ).reset_index(drop=True)
+
+
+# Steps refer to the profiler by module global rather than holding it as
+# a parameter, so ``clone`` (e.g. in ``TwoStageRainfallModel.fit``) keeps
+# writing to the same records.
+PROFILER = StepProfiler()
+
+
+def _inner_has(method):
+    return lambda self: hasattr(self.estimator, method)
+
+
+class ProfiledStep(BaseEstimator):
+    """Delegating wrapper that records every call in ``PROFILER``."""
+
+    def __init__(self, estimator, name):
+        self.estimator = estimator
+        self.name = name
+
+    def __getattr__(self, attr):
+        # Fitted attributes (feature_names_in_, lag_days, ...) of the
+        # wrapped estimator; guarded so unpickling does not recurse.
+        if attr.startswith("__") or "estimator" not in self.__dict__:
+            raise AttributeError(attr)
+        return getattr(self.__dict__["estimator"], attr)
+
+    # Parameters are the wrapped estimator's, so ``set_params`` keys such
+    # as ``model__max_depth`` stay valid with profiling on.
+    def get_params(self, deep=True):
+        return self.estimator.get_params(deep=deep)
+
+    def set_params(self, **params):
+        self.estimator.set_params(**params)
+        return self
+
+    def __sklearn_clone__(self):
+        return ProfiledStep(clone(self.estimator), self.name)
+
+    def __sklearn_is_fitted__(self):
+        return getattr(self, "fitted_", False)
+
+    def _call(self, method, X, *args, **kwargs):
+        rows = X.shape[0] if hasattr(X, "shape") else len(X)
+        with PROFILER._measure(self.name, method, rows) as frame:
+            frame["output"] = getattr(self.estimator, method)(
+                X, *args, **kwargs
+            )
+        return frame["output"]
+
+    def fit(self, X, y=None, **fit_params):
+        self._call("fit", X, y, **fit_params)
+        self.fitted_ = True
+        return self
+
+    @available_if(_inner_has("transform"))
+    def fit_transform(self, X, y=None, **fit_params):
+        if hasattr(self.estimator, "fit_transform"):
+            output = self._call("fit_transform", X, y, **fit_params)
+        else:
+            self._call("fit", X, y, **fit_params)
+            output = self._call("transform", X)
+        self.fitted_ = True
+        return output
+
+    @available_if(_inner_has("transform"))
+    def transform(self, X):
+        return self._call("transform", X)
+
+    @available_if(_inner_has("predict"))
+    def predict(self, X):
+        return self._call("predict", X)
+
+    @available_if(_inner_has("predict_proba"))
+    def predict_proba(self, X):
+        return self._call("predict_proba", X)
+
+
+def _wrap(estimator, name):
+    if isinstance(estimator, (ProfiledStep, str)) or estimator is None:
+        return estimator
+    return ProfiledStep(estimator, name)
+
+
+def profile_pipeline(pipe: Pipeline, prefix: str = "") -> Pipeline:
+    """
+    Wrap every step of ``pipe`` in ``ProfiledStep``: nested pipelines
+    step by step, and the classifier/regressor of a two-stage model.
+    Works on fitted and unfitted pipelines; call before pruning or
+    fusing, which inspect the unwrapped steps.
+    """
+    from src.model import TwoStageRainfallModel
+
+    for i, (name, step) in enumerate(pipe.steps):
+        full_name = f"{prefix}{name}"
+
+        if isinstance(step, Pipeline):
+            profile_pipeline(step, prefix=f"{full_name}.")
+
+        if isinstance(step, TwoStageRainfallModel):
+            step.classifier = _wrap(step.classifier, f"{full_name}.clf")
+            step.regressor = _wrap(step.regressor, f"{full_name}.reg")
+            if hasattr(step, "clf_"):
+                step.clf_ = _wrap(step.clf_, f"{full_name}.clf")
+                step.reg_ = _wrap(step.reg_, f"{full_name}.reg")
+                step.clf_.fitted_ = step.reg_.fitted_ = True
+
+        wrapped = _wrap(step, full_name)
+        if wrapped is not step and hasattr(step, "__sklearn_is_fitted__"):
+            wrapped.fitted_ = bool(step.__sklearn_is_fitted__())
+        elif wrapped is not step:
+            wrapped.fitted_ = any(
+                k.endswith("_") and not k.startswith("__")
+                for k in vars(step)
+            )
+        pipe.steps[i] = (name, wrapped)
+
+    return pipe
+
+
+def unwrap_step(estimator):
+    """The estimator inside a ``ProfiledStep``, or ``estimator`` itself."""
+    return estimator.estimator if isinstance(estimator, ProfiledStep) else estimator
+
+
+def strip_profiling(pipe: Pipeline) -> Pipeline:
+    """Undo ``profile_pipeline``, e.g. before saving a trained model."""
+    from src.model import TwoStageRainfallModel
+
+    for i, (name, step) in enumerate(pipe.steps):
+        step = unwrap_step(step)
+        if isinstance(step, Pipeline):
+            strip_profiling(step)
+        if isinstance(step, TwoStageRainfallModel):
+            step.classifier = unwrap_step(step.classifier)
+            step.regressor = unwrap_step(step.regressor)
+            if hasattr(step, "clf_"):
+                step.clf_ = unwrap_step(step.clf_)
+                step.reg_ = unwrap_step(step.reg_)
+        pipe.steps[i] = (name, step)
+
+    return pipe
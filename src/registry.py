@@ -0,0 +1,182 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Named model versions, loaded on first use with at most
+    ``max_resident`` kept in memory (least recently used evicted).
+
+    ``loader(path)`` turns a registered path into whatever the caller
+    serves (a pipeline, or a pipeline plus its feature store). A
+    ``shadow`` version, when set, also scores ``shadow_fraction`` of the
+    requests on a background thread; results are kept in ``shadow_log``
+    and never affect the response. At most ``shadow_max_pending`` shadow
+    runs are queued or running at once; further samples are dropped and
+    counted rather than queued.
+    """
+
+    def __init__(self, loader, versions: dict[str, Path], default: str,
+                 max_resident: int = 2, shadow: str | None = None,
+                 shadow_fraction: float = 0.0, shadow_workers: int = 1,
+                 shadow_log_size: int = 1000, shadow_max_pending: int = 8):
+        if default not in versions:
+            raise KeyError(f"Default model version {default!r} not registered")
+
+        self.loader = loader
+        self.versions = dict(versions)
+        self.default = default
+        self.max_resident = max_resident
+        self.shadow_version = shadow or None
+        self.shadow_fraction = shadow_fraction
+
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        # Bumped by register(), so a load that started before it does
+        # not store the superseded model.
+        self._generations = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=shadow_workers, thread_name_prefix="shadow"
+        )
+        self.shadow_log = deque(maxlen=shadow_log_size)
+        self.shadow_max_pending = shadow_max_pending
+        self._shadow_slots = threading.BoundedSemaphore(shadow_max_pending)
+        self.shadow_dropped = 0
+
+    def register(self, name: str, path: Path):
+        with self._lock:
+            self.versions[name] = Path(path)
+            self._generations[name] = self._generations.get(name, 0) + 1
+            # A re-registered version is reloaded on next use.
+            self._resident.pop(name, None)
+
+    def resolve(self, version: str | None) -> str:
+        version = version or self.default
+        if version not in self.versions:
+            raise KeyError(f"Unknown model version {version!r}")
+        return version
+
+    def get(self, version: str | None = None):
+        version = self.resolve(version)
+
+        with self._lock:
+            if version in self._resident:
+                self._resident.move_to_end(version)
+                return self._resident[version]
+            # One loader per version; concurrent callers wait for it.
+            event = self._loading.get(version)
+            owner = event is None
+            if owner:
+                event = self._loading[version] = threading.Event()
+            path = self.versions[version]
+            generation = self._generations.get(version, 0)
+
+        if not owner:
+            event.wait()
+            return self.get(version)
+
+        try:
+            start = time.perf_counter()
+            served = self.loader(path)
+            logger.info(
+                "Loaded model %s in %.2fs", version,
+                time.perf_counter() - start
+            )
+            with self._lock:
+                if self._generations.get(version, 0) != generation:
+                    # Re-registered while loading: serve this caller,
+                    # but let the next get() load the new path.
+                    return served
+                self._resident[version] = served
+                while len(self._resident) > self.max_resident:
+                    evicted, _ = self._resident.popitem(last=False)
+                    logger.info("Evicted model %s", evicted)
+        finally:
+            with self._lock:
+                self._loading.pop(version).set()
+
+        return served
+
+    # ------------------------------------------------------------ shadow
+
+    def shadow(self, predict, primary, version: str | None = None):
+        """
+        Run ``predict(served_shadow_model)`` off the request path for a
+        ``shadow_fraction`` sample of requests and log it against the
+        ``primary`` prediction. No-op without a shadow version, and
+        dropped when ``shadow_max_pending`` runs are already in flight.
+        """
+        shadow = self.shadow_version
+        if (
+            shadow is None
+            or shadow == self.resolve(version)
+            or random.random() >= self.shadow_fraction
+        ):
+            return None
+
+        if not self._shadow_slots.acquire(blocking=False):
+            with self._lock:
+                self.shadow_dropped += 1
+            return None
+        try:
+            return self._executor.submit(self._run_shadow, shadow, predict,
+                                         primary, self.resolve(version))
+        except RuntimeError:
+            # Executor shut down.
+            self._shadow_slots.release()
+            return None
+
+    def _run_shadow(self, shadow, predict, primary, version):
+        start = time.perf_counter()
+        try:
+            value = predict(self.get(shadow))
+        except Exception:
+            logger.exception("Shadow prediction with %s failed", shadow)
+            return None
+        finally:
+            self._shadow_slots.release()
+
+        record = {
+            "version": version,
+            "shadow_version": shadow,
+            "primary": float(primary),
+            "shadow": float(value),
+            "abs_diff": abs(float(value) - float(primary)),
+            "seconds": time.perf_counter() - start,
+        }
+        self.shadow_log.append(record)
+        return record
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = list(self._resident)
+            dropped = self.shadow_dropped
+        diffs = np.array([r["abs_diff"] for r in list(self.shadow_log)])
+        return {
+            "default": self.default,
+            "versions": sorted(self.versions),
+            "resident": resident,
+            "max_resident": self.max_resident,
+            "shadow": {
+                "version": self.shadow_version,
+                "fraction": self.shadow_fraction,
+                "samples": int(len(diffs)),
+                "max_pending": self.shadow_max_pending,
+                "dropped": dropped,
+                "mean_abs_diff": float(diffs.mean()) if len(diffs) else None,
+                "max_abs_diff": float(diffs.max()) if len(diffs) else None,
+            },
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -16,16 +16,19 @@ class RandomRequest(BaseModel):
     highest_30_min_rainfall_mm: float
     highest_60_min_rainfall_mm: float
     highest_120_min_rainfall_mm: float
+    model_version: Optional[str] = None
 
 
 class ForecastRequest(BaseModel):
     location: str
     date: str
+    model_version: Optional[str] = None
 
 
 class EvaluationRequest(BaseModel):
     location: str
     date: str
+    model_version: Optional[str] = None
 
 
 class PredictionResponse(BaseModel):
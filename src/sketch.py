@@ -0,0 +1,238 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.config import SKETCH_RELATIVE_ACCURACY, SKETCH_CHUNKSIZE
+from src.features import StructuralWeatherImputer
+
+# Keeps bucket ids positive for positive values and negative for
+# negative ones, for any realistic relative accuracy.
+_BUCKET_BIAS = 1 << 30
+
+
+class MedianSketch:
+    """
+    Mergeable per-(location, column) quantile sketch for fitting the
+    median imputers without holding the training frame in memory.
+
+    Values are counted in logarithmic buckets (DDSketch-style), so a
+    quantile comes back within ``relative_accuracy`` of the true value
+    at that rank. Sketches of different chunks, files or processes
+    combine exactly with ``merge``.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+                 location_col: str = "location", exclude=()):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+
+        self.relative_accuracy = relative_accuracy
+        self.location_col = location_col
+        self.exclude = tuple(exclude)
+
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.counts_ = pd.Series(
+            dtype=np.int64,
+            index=pd.MultiIndex.from_arrays(
+                [[], [], []], names=["column", location_col, "bucket"]
+            )
+        )
+        self.columns_ = []
+        self.locations_ = []
+        self.n_rows_ = 0
+
+    def _buckets(self, values):
+        # Bucket k covers (gamma**(k-1), gamma**k]. Ids are signed and
+        # biased so that id order is value order, with 0 for exact zero.
+        magnitude = np.abs(values)
+        with np.errstate(divide="ignore"):
+            k = np.ceil(np.log(magnitude) / np.log(self.gamma))
+        k = np.clip(np.nan_to_num(k), -_BUCKET_BIAS + 1, _BUCKET_BIAS - 1)
+        ids = np.sign(values) * (k + _BUCKET_BIAS)
+        return np.where(magnitude > 0, ids, 0).astype(np.int64)
+
+    def _representative(self, ids):
+        # Within relative_accuracy of every value in the bucket.
+        k = np.abs(ids) - _BUCKET_BIAS
+        rep = 2 * self.gamma ** k / (self.gamma + 1)
+        return np.where(ids != 0, np.sign(ids) * rep, 0.0)
+
+    def _add_counts(self, counts):
+        self.counts_ = (
+            pd.concat([self.counts_, counts])
+              .groupby(level=[0, 1, 2], dropna=False)
+              .sum()
+        )
+
+    def update(self, chunk: pd.DataFrame):
+        numeric = chunk.select_dtypes("number").drop(
+            columns=[self.location_col, *self.exclude], errors="ignore"
+        )
+        codes, uniques = pd.factorize(
+            chunk[self.location_col], use_na_sentinel=False
+        )
+
+        parts = {}
+        for col in numeric.columns:
+            values = numeric[col].to_numpy(np.float64)
+            valid = ~np.isnan(values)
+
+            # (location, bucket) packed in one int64 for a single unique.
+            keys = (codes[valid].astype(np.int64) << 32) | (
+                self._buckets(values[valid]) + (1 << 31)
+            )
+            keys, n = np.unique(keys, return_counts=True)
+            parts[col] = pd.Series(n, index=pd.MultiIndex.from_arrays(
+                [uniques[keys >> 32], (keys & 0xFFFFFFFF) - (1 << 31)]
+            ))
+
+        self.columns_ += [c for c in numeric.columns if c not in self.columns_]
+        self.locations_ += [
+            loc for loc in uniques
+            if not pd.isna(loc) and loc not in self.locations_
+        ]
+        self.n_rows_ += len(chunk)
+
+        if parts:
+            counts = pd.concat(parts, names=["column"])
+            counts.index.names = ["column", self.location_col, "bucket"]
+            self._add_counts(counts)
+        return self
+
+    def merge(self, other: "MedianSketch"):
+        if (other.relative_accuracy != self.relative_accuracy
+                or other.location_col != self.location_col):
+            raise ValueError("Cannot merge sketches with different settings")
+
+        self._add_counts(other.counts_)
+        self.columns_ += [c for c in other.columns_ if c not in self.columns_]
+        self.locations_ += [
+            loc for loc in other.locations_ if loc not in self.locations_
+        ]
+        self.n_rows_ += other.n_rows_
+        return self
+
+    @staticmethod
+    def _rank_value(counts, keys, rank):
+        # Representative of the bucket holding the given 0-based rank.
+        df = counts.rename("n").reset_index()
+        group = df.groupby(keys, sort=False)["n"]
+        target = rank(group.transform("sum"))
+        hit = df[group.cumsum() > target]
+        return hit.groupby(keys, sort=False)["bucket"].first()
+
+    def _median(self, counts, keys):
+        # Average of the lower and upper middle ranks, like pandas.
+        lower = self._rank_value(counts, keys, lambda n: (n - 1) // 2)
+        upper = self._rank_value(counts, keys, lambda n: n // 2)
+        upper = upper.reindex(lower.index)
+        return pd.Series(
+            (self._representative(lower.to_numpy())
+             + self._representative(upper.to_numpy())) / 2,
+            index=lower.index
+        )
+
+    def medians(self):
+        """``(loc_median, global_median)`` shaped like the imputers' fit."""
+        counts = self.counts_.sort_index(level=["column", "bucket"])
+
+        loc = self._median(
+            counts[counts.index.get_level_values(1).notna()],
+            ["column", self.location_col]
+        )
+        glob = self._median(
+            counts.groupby(level=["column", "bucket"]).sum(), ["column"]
+        )
+
+        loc_median = (
+            loc.unstack("column")
+               .reindex(index=sorted(self.locations_), columns=self.columns_)
+        )
+        loc_median.index.name = self.location_col
+        loc_median.columns.name = None
+
+        global_median = glob.reindex(self.columns_)
+        global_median.index.name = None
+        return loc_median, global_median.rename(None)
+
+
+def iter_chunks(sources, chunksize: int = SKETCH_CHUNKSIZE):
+    """
+    Yield DataFrame chunks from frames, CSV/Parquet files, or
+    directories of partition files.
+    """
+    for source in sources:
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), chunksize):
+                yield source.iloc[start:start + chunksize]
+            continue
+
+        path = Path(source)
+        if path.is_dir():
+            yield from iter_chunks(
+                sorted(path.rglob("*.csv")) + sorted(path.rglob("*.parquet")),
+                chunksize
+            )
+        elif path.suffix == ".parquet":
+            yield from iter_chunks([pd.read_parquet(path)], chunksize)
+        else:
+            yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def sketch_chunks(chunks, **sketch_params) -> MedianSketch:
+    sketch = MedianSketch(**sketch_params)
+    for chunk in chunks:
+        sketch.update(chunk)
+    return sketch
+
+
+def _sketch_source(source, chunksize, sketch_params):
+    return sketch_chunks(iter_chunks([source], chunksize), **sketch_params)
+
+
+def sketch_partitions(
+    sources,
+    n_jobs: int = 1,
+    chunksize: int = SKETCH_CHUNKSIZE,
+    **sketch_params
+) -> MedianSketch:
+    """Sketch each source in its own worker process and merge the results."""
+    sketches = Parallel(n_jobs=n_jobs)(
+        delayed(_sketch_source)(source, chunksize, sketch_params)
+        for source in sources
+    )
+
+    merged = MedianSketch(**sketch_params)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def fit_imputer_out_of_core(
+    sources,
+    imputer_cls=StructuralWeatherImputer,
+    n_jobs: int = 1,
+    chunksize: int = SKETCH_CHUNKSIZE,
+    relative_accuracy: float = SKETCH_RELATIVE_ACCURACY,
+    location_col: str = "location",
+    exclude=(),
+    **imputer_params
+):
+    """
+    Fitted ``StructuralWeatherImputer`` (or ``FusedFeatures``) whose
+    medians come from chunked, optionally parallel, sketching.
+    """
+    sketch = sketch_partitions(
+        sources,
+        n_jobs=n_jobs,
+        chunksize=chunksize,
+        relative_accuracy=relative_accuracy,
+        location_col=location_col,
+        exclude=exclude,
+    )
+    loc_median, global_median = sketch.medians()
+    return imputer_cls.from_medians(
+        loc_median, global_median, location_col=location_col, **imputer_params
+    )
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+OVERALL = "__overall__"
+
+
+def _safe_divide(num, den):
+    return np.divide(num, den, out=np.full(num.shape, np.nan),
+                     where=den > 0)
+
+
+def _candidate_thresholds(proba, thresholds):
+    if thresholds is None:
+        # Every distinct probability: one sort of the scores.
+        return np.unique(proba)
+    if np.isscalar(thresholds):
+        return np.linspace(0.0, 1.0, int(thresholds))
+    return np.unique(np.asarray(thresholds, dtype=np.float64))
+
+
+def threshold_sweep(y_true, proba, thresholds=101, groups=None,
+                    group_name: str = "location") -> pd.DataFrame:
+    """
+    Confusion counts, precision, recall and F1 of ``proba >= t`` for
+    every candidate ``t`` in one pass: each score is placed among the
+    sorted thresholds once, counted per bin, and the counts above every
+    threshold come from a reverse cumulative sum.
+
+    ``thresholds`` is a number of evenly spaced cuts in [0, 1], explicit
+    values, or None for every distinct score. With ``groups`` (e.g. the
+    location of each row) the sweep is done per group, plus the overall
+    rows under ``OVERALL``.
+    """
+    y = np.asarray(y_true).astype(bool)
+    proba = np.asarray(proba, dtype=np.float64)
+    cuts = _candidate_thresholds(proba, thresholds)
+    n_cuts = len(cuts)
+
+    if groups is None:
+        codes, names = np.zeros(len(y), dtype=np.int64), pd.Index([OVERALL])
+        n_groups = 1
+    else:
+        codes, names = pd.factorize(
+            np.asarray(groups), sort=True, use_na_sentinel=False
+        )
+        n_groups = len(names)
+        names = pd.Index(names).append(pd.Index([OVERALL]))
+
+    # bins[i]: how many cuts are <= proba[i]; row i is predicted
+    # positive at cut j exactly when bins[i] > j.
+    bins = np.searchsorted(cuts, proba, side="right")
+    key = codes * (n_cuts + 1) + bins
+    size = n_groups * (n_cuts + 1)
+    total = np.bincount(key, minlength=size).reshape(-1, n_cuts + 1)
+    positive = np.bincount(key, weights=y, minlength=size).reshape(-1, n_cuts + 1)
+
+    if groups is not None:
+        total = np.vstack([total, total.sum(axis=0)])
+        positive = np.vstack([positive, positive.sum(axis=0)])
+
+    predicted = np.cumsum(total[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    tp = np.cumsum(positive[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    n_rows = total.sum(axis=1, keepdims=True)
+    n_positive = positive.sum(axis=1, keepdims=True)
+
+    fp = predicted - tp
+    fn = n_positive - tp
+    tn = n_rows - n_positive - fp
+
+    sweep = pd.DataFrame({
+        group_name: np.repeat(names.to_numpy(), n_cuts),
+        "threshold": np.tile(cuts, len(names)),
+        "tp": tp.ravel().astype(np.int64),
+        "fp": fp.ravel().astype(np.int64),
+        "fn": fn.ravel().astype(np.int64),
+        "tn": tn.ravel().astype(np.int64),
+        "precision": _safe_divide(tp, predicted).ravel(),
+        "recall": _safe_divide(tp, np.broadcast_to(n_positive, tp.shape)).ravel(),
+        "f1": _safe_divide(2 * tp, 2 * tp + fp + fn).ravel(),
+        "positive_rate": _safe_divide(
+            predicted, np.broadcast_to(n_rows, predicted.shape)
+        ).ravel(),
+    })
+    return sweep
+
+
+def best_threshold(sweep: pd.DataFrame, metric: str = "f1",
+                   group_name: str = "location") -> pd.DataFrame:
+    """Row with the highest ``metric`` per group (ties: lowest threshold)."""
+    ranked = sweep.sort_values(
+        [group_name, metric, "threshold"], ascending=[True, False, True],
+        na_position="last"
+    )
+    return ranked.groupby(group_name, sort=False).head(1).reset_index(drop=True)
+
+
+def gating_threshold(sweep: pd.DataFrame, min_recall: float = 0.99,
+                     group_name: str = "location") -> pd.DataFrame:
+    """
+    Highest threshold per group that still keeps ``min_recall`` of the
+    rainy rows: the largest ``gate_epsilon`` that skips the regressor on
+    as many dry rows as possible.
+    """
+    eligible = sweep[sweep["recall"] >= min_recall]
+    ranked = eligible.sort_values(
+        [group_name, "threshold"], ascending=[True, False]
+    )
+    return ranked.groupby(group_name, sort=False).head(1).reset_index(drop=True)
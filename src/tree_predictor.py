@@ -0,0 +1,390 @@
+import json
+import weakref
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.pipeline import Pipeline
+
+# Objectives whose output is the margin itself or its sigmoid.
+LINKS = {
+    "reg:squarederror": "identity",
+    "binary:logistic": "logistic",
+}
+
+
+def _dense_with_missing(X):
+    """
+    Float32 dense copy of the booster input. Entries absent from a
+    sparse matrix are missing for XGBoost, so they become NaN.
+    """
+    if sparse.issparse(X):
+        X = X.tocoo()
+        dense = np.full(X.shape, np.nan, dtype=np.float32)
+        dense[X.row, X.col] = X.data
+        return dense
+    return np.asarray(X, dtype=np.float32)
+
+
+class TreeTable:
+    """
+    Array-backed copy of an XGBoost tree ensemble: one row per tree,
+    padded to the largest tree, with feature index, threshold, children,
+    default direction and leaf value per node.
+
+    Leaves point to themselves, so ``predict_margin`` walks every row
+    through every tree in ``max_depth`` vectorized steps.
+    """
+
+    ARRAYS = [
+        "feature", "threshold", "left", "right", "default_left",
+        "is_categorical", "category_bits", "leaf_value",
+    ]
+
+    def __init__(self, feature, threshold, left, right, default_left,
+                 is_categorical, category_bits, leaf_value, base_margin,
+                 link, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.is_categorical = is_categorical
+        self.category_bits = category_bits
+        self.leaf_value = leaf_value
+        self.base_margin = float(base_margin)
+        self.link = link
+        self.max_depth = int(max_depth)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(trees={self.feature.shape[0]}, "
+            f"nodes={self.feature.shape[1]}, max_depth={self.max_depth}, "
+            f"link={self.link!r})"
+        )
+
+    @classmethod
+    def from_booster(cls, booster, iteration_range=(0, 0)):
+        model = json.loads(booster.save_raw("json"))["learner"]
+        objective = model["objective"]["name"]
+        if objective not in LINKS:
+            raise ValueError(f"Unsupported objective: {objective}")
+        link = LINKS[objective]
+
+        base_score = float(
+            model["learner_model_param"]["base_score"].strip("[]")
+        )
+        base_margin = (
+            np.log(base_score / (1 - base_score))
+            if link == "logistic" else base_score
+        )
+
+        gbtree = model["gradient_booster"]["model"]
+        trees = gbtree["trees"]
+        start, stop = iteration_range
+        if stop:
+            indptr = gbtree["iteration_indptr"]
+            trees = trees[indptr[start]:indptr[stop]]
+
+        n_nodes = max(int(t["tree_param"]["num_nodes"]) for t in trees)
+        n_cats = max(
+            [max(t["categories"]) + 1 for t in trees if t["categories"]]
+            or [1]
+        )
+        shape = (len(trees), n_nodes)
+
+        self = dict(
+            feature=np.zeros(shape, dtype=np.int32),
+            threshold=np.zeros(shape, dtype=np.float32),
+            left=np.tile(np.arange(n_nodes, dtype=np.int32), (len(trees), 1)),
+            right=np.tile(np.arange(n_nodes, dtype=np.int32), (len(trees), 1)),
+            default_left=np.zeros(shape, dtype=bool),
+            is_categorical=np.zeros(shape, dtype=bool),
+            category_bits=np.zeros(shape + (n_cats,), dtype=bool),
+            leaf_value=np.zeros(shape, dtype=np.float32),
+        )
+
+        max_depth = 0
+        for i, tree in enumerate(trees):
+            left = np.asarray(tree["left_children"])
+            n = len(left)
+            split = left != -1
+            nodes = np.flatnonzero(split)
+
+            self["feature"][i, :n] = tree["split_indices"]
+            self["threshold"][i, :n] = tree["split_conditions"]
+            self["left"][i, nodes] = left[split]
+            self["right"][i, nodes] = np.asarray(tree["right_children"])[split]
+            self["default_left"][i, :n] = np.asarray(tree["default_left"], bool)
+            self["is_categorical"][i, :n] = np.asarray(tree["split_type"]) == 1
+            self["leaf_value"][i, :n] = np.where(
+                split, 0.0, tree["split_conditions"]
+            )
+
+            # Categories stored on a node are the ones sent right.
+            for node, begin, size in zip(tree["categories_nodes"],
+                                         tree["categories_segments"],
+                                         tree["categories_sizes"]):
+                cats = tree["categories"][begin:begin + size]
+                self["category_bits"][i, node, cats] = True
+
+            parents = np.asarray(tree["parents"])
+            depth = np.zeros(n, dtype=np.int64)
+            for node in range(1, n):
+                depth[node] = depth[parents[node]] + 1
+            max_depth = max(max_depth, int(depth.max()))
+
+        return cls(**self, base_margin=base_margin, link=link,
+                   max_depth=max_depth)
+
+    def predict_margin(self, X, chunksize: int = 4096):
+        X = np.ascontiguousarray(_dense_with_missing(X))
+        if X.shape[0] > chunksize:
+            return np.concatenate([
+                self.predict_margin(X[i:i + chunksize], chunksize)
+                for i in range(0, X.shape[0], chunksize)
+            ])
+
+        # Flat (tree, node) ids: 1-D gathers are much cheaper than 2-D.
+        n_trees, n_nodes = self.feature.shape
+        offset = np.arange(n_trees) * n_nodes
+        feature = self.feature.ravel()
+        threshold = self.threshold.ravel()
+        left = (self.left + offset[:, None]).ravel()
+        right = (self.right + offset[:, None]).ravel()
+        default_left = self.default_left.ravel()
+        is_categorical = self.is_categorical.ravel()
+        has_categorical = is_categorical.any()
+
+        node = np.broadcast_to(offset, (X.shape[0], n_trees))
+        rows = np.arange(X.shape[0])[:, None] * X.shape[1]
+        X_flat = X.ravel()
+
+        for _ in range(self.max_depth):
+            values = X_flat[rows + feature[node]]
+            missing = np.isnan(values)
+
+            go_left = values < threshold[node]
+            if has_categorical:
+                go_left = np.where(
+                    is_categorical[node],
+                    ~self._in_category(values, missing, node),
+                    go_left
+                )
+
+            go_left = np.where(missing, default_left[node], go_left)
+            node = np.where(go_left, left[node], right[node])
+
+        return (
+            self.leaf_value.ravel()[node].sum(axis=1, dtype=np.float64)
+            + self.base_margin
+        )
+
+    def _in_category(self, values, missing, node):
+        bits = self.category_bits.reshape(-1, self.category_bits.shape[2])
+        codes = np.where(missing, -1, values).astype(np.int64)
+        valid = (codes >= 0) & (codes < bits.shape[1])
+        in_set = np.zeros_like(valid)
+        in_set[valid] = bits[node[valid], codes[valid]]
+        return in_set
+
+    def predict(self, X):
+        margin = self.predict_margin(X)
+        if self.link == "logistic":
+            return 1.0 / (1.0 + np.exp(-margin))
+        return margin
+
+    def save(self, path: Path):
+        np.savez(
+            path,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+            meta=np.array(json.dumps({
+                "base_margin": self.base_margin,
+                "link": self.link,
+                "max_depth": self.max_depth,
+            }))
+        )
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(**{name: data[name] for name in cls.ARRAYS}, **meta)
+
+
+def _booster_stage(estimator):
+    """
+    ``(XGBoost estimator, inverse_func)`` of a fitted stage, looking
+    through profiling wrappers and a log-target
+    ``TransformedTargetRegressor``.
+    """
+    from src.profiling import unwrap_step
+
+    estimator = unwrap_step(estimator)
+    inverse = None
+    if isinstance(estimator, TransformedTargetRegressor):
+        inverse = estimator.inverse_func
+        estimator = unwrap_step(estimator.regressor_)
+    return estimator, inverse
+
+
+def _table(estimator):
+    """``(TreeTable, inverse_func)`` of a fitted XGBoost stage."""
+    from src.model import _iteration_range
+
+    estimator, inverse = _booster_stage(estimator)
+    table = TreeTable.from_booster(
+        estimator.get_booster(), _iteration_range(estimator)
+    )
+    return table, inverse
+
+
+def _stage_tables(model):
+    """``(classifier table, regressor table, inverse_func)`` of a two-stage model."""
+    classifier, _ = _table(model.clf_)
+    regressor, inverse = (
+        _table(model.reg_) if model.has_regressor_ else (None, None)
+    )
+    return classifier, regressor, inverse
+
+
+def _stage_signature(model):
+    """
+    The boosters and iteration ranges the tables are built from; a refit
+    or continued model has new booster objects.
+    """
+    from src.model import _iteration_range
+
+    signature = []
+    for estimator in (model.clf_, model.reg_ if model.has_regressor_ else None):
+        if estimator is not None:
+            estimator, _ = _booster_stage(estimator)
+        if not hasattr(estimator, "get_booster"):
+            signature.append(None)
+            continue
+        signature.append(
+            (estimator.get_booster(), _iteration_range(estimator))
+        )
+    return signature
+
+
+def _same_signature(a, b):
+    return len(a) == len(b) and all(
+        x is y if x is None or y is None
+        else x[0] is y[0] and x[1] == y[1]
+        for x, y in zip(a, b)
+    )
+
+
+class CompiledTwoStage:
+    """
+    NumPy stand-in for a fitted ``TwoStageRainfallModel``: same input,
+    same gating, predictions equal to float tolerance. Inference only,
+    so not an sklearn estimator: refit the source model and compile it
+    again.
+    """
+
+    def __init__(self, classifier: TreeTable, regressor: TreeTable | None,
+                 inverse_func=None, gate_epsilon=None):
+        self.classifier = classifier
+        self.regressor = regressor
+        self.inverse_func = inverse_func
+        self.gate_epsilon = gate_epsilon
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(classifier={self.classifier!r}, "
+            f"regressor={self.regressor!r}, gate_epsilon={self.gate_epsilon})"
+        )
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(*_stage_tables(model), gate_epsilon=model.gate_epsilon)
+
+    def _regress(self, X):
+        preds = self.regressor.predict(X)
+        return preds if self.inverse_func is None else self.inverse_func(preds)
+
+    def predict(self, X):
+        X = _dense_with_missing(X)
+        p_rain = self.classifier.predict(X)
+
+        if self.regressor is None:
+            return np.zeros(X.shape[0])
+
+        if not self.gate_epsilon:
+            return p_rain * self._regress(X)
+
+        rows = np.flatnonzero(p_rain >= self.gate_epsilon)
+        preds = np.zeros_like(p_rain)
+        if len(rows):
+            preds[rows] = p_rain[rows] * self._regress(X[rows])
+        return preds
+
+
+class CompiledPipeline:
+    """
+    The transform steps of a fitted pipeline followed by a
+    ``CompiledTwoStage``; ``predict`` only.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    @property
+    def named_steps(self) -> dict:
+        return dict(self.steps)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(steps={[n for n, _ in self.steps]})"
+
+    def predict(self, X):
+        for _, step in self.steps[:-1]:
+            X = step.transform(X)
+        return self.steps[-1][1].predict(X)
+
+
+def _two_stage(model: Pipeline):
+    """The fitted two-stage final step of ``model``, or None."""
+    from src.model import TwoStageRainfallModel
+    from src.profiling import unwrap_step
+
+    final = unwrap_step(model.steps[-1][1])
+    return final if isinstance(final, TwoStageRainfallModel) else None
+
+
+def compile_pipeline(model: Pipeline) -> CompiledPipeline | Pipeline:
+    """
+    Copy of ``model`` whose final two-stage step runs in NumPy; any
+    other final step has no NumPy path and ``model`` is returned as is.
+    """
+    final = _two_stage(model)
+    if final is None:
+        return model
+    name = model.steps[-1][0]
+    return CompiledPipeline(
+        model.steps[:-1] + [(name, CompiledTwoStage.from_model(final))]
+    )
+
+
+_COMPILED = weakref.WeakKeyDictionary()
+
+
+def compiled_pipeline(model: Pipeline) -> CompiledPipeline | Pipeline:
+    """
+    ``compile_pipeline`` with the tree tables cached per fitted
+    two-stage step, so slices such as ``model[1:]`` reuse them too. The
+    tables are rebuilt when the step's boosters change (refit in place),
+    and ``gate_epsilon`` is read from the step on every call.
+    """
+    final = _two_stage(model)
+    if final is None:
+        return model
+    name = model.steps[-1][0]
+    signature = _stage_signature(final)
+    cached = _COMPILED.get(final)
+    if cached is None or not _same_signature(cached[0], signature):
+        cached = _COMPILED[final] = (signature, _stage_tables(final))
+    compiled = CompiledTwoStage(*cached[1], gate_epsilon=final.gate_epsilon)
+    return CompiledPipeline(model.steps[:-1] + [(name, compiled)])
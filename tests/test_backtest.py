@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from src.backtest import BacktestFeatureCache, CalendarSplit, error_tables
+from src.benchmark import synthetic_weather_frame
+from src.features import FusedFeatures
+
+TARGET = "daily_rainfall_total_mm"
+
+
+@pytest.fixture
+def data():
+    frame = synthetic_weather_frame(44 * 90, seed=5, with_target=True)
+    return frame.drop(columns=[TARGET]), frame[TARGET]
+
+
+def _cache():
+    return BacktestFeatureCache(
+        FusedFeatures(group_col="location"),
+        CalendarSplit(n_splits=1, period="month")
+    )
+
+
+def test_context_features_match_one_chained_transform(data):
+    X, y = data
+    fold, = _cache().folds(X, y)
+
+    # The fold's transformer applied once over train and test together.
+    transformer = FusedFeatures(group_col="location").fit(
+        X.iloc[fold.train_idx], y.iloc[fold.train_idx]
+    )
+    chained = transformer.transform(
+        X.iloc[np.concatenate([fold.train_idx, fold.test_idx])]
+    ).iloc[len(fold.train_idx):]
+
+    pd.testing.assert_frame_equal(
+        fold.X_test.reset_index(drop=True), chained.reset_index(drop=True)
+    )
+
+
+def test_context_is_taken_by_date(data):
+    X, y = data
+    fold, = _cache().folds(X, y)
+
+    # Same rows, training period shuffled.
+    train = np.random.default_rng(0).permutation(fold.train_idx)
+    order = np.concatenate([train, fold.test_idx])
+    shuffled, = _cache().folds(
+        X.iloc[order].reset_index(drop=True),
+        y.iloc[order].reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(
+        shuffled.X_test.reset_index(drop=True),
+        fold.X_test.reset_index(drop=True)
+    )
+
+
+def test_error_tables():
+    predictions = pd.DataFrame({
+        "fold": [0, 0, 1, 1],
+        "location": ["A", "B", "A", "A"],
+        "month": [1, 1, 2, 2],
+        "y_true": [1.0, 2.0, 0.0, 4.0],
+        "y_pred": [2.0, 2.0, 1.0, 1.0],
+    })
+    tables = error_tables(predictions)
+
+    overall = tables["overall"].iloc[0]
+    assert overall["n"] == 4
+    assert overall["mae"] == pytest.approx(5 / 4)
+    assert overall["rmse"] == pytest.approx(np.sqrt(11 / 4))
+    assert overall["bias"] == pytest.approx(-1 / 4)
+
+    location = tables["location"].set_index("location")
+    assert location.loc["A", "n"] == 3
+    assert location.loc["A", "bias"] == pytest.approx(-1 / 3)
+    assert location.loc["B", "mae"] == 0
+
+    assert tables["location_month"]["n"].sum() == 4
+    assert list(tables["fold"]["fold"]) == [0, 1]
+
+
+def test_error_tables_match_per_group_metrics():
+    rng = np.random.default_rng(0)
+    n = 2000
+    predictions = pd.DataFrame({
+        "fold": rng.integers(0, 3, n),
+        "location": np.array(["A", "B", "C"])[rng.integers(0, 3, n)],
+        "month": rng.integers(1, 13, n),
+        "y_true": rng.exponential(5.0, n),
+        "y_pred": rng.exponential(5.0, n),
+    })
+    got = error_tables(predictions)["location_month"]
+
+    for row, (_, part) in zip(
+        got.itertuples(), predictions.groupby(["location", "month"])
+    ):
+        assert row.n == len(part)
+        assert row.mae == pytest.approx(
+            mean_absolute_error(part["y_true"], part["y_pred"])
+        )
+        assert row.rmse == pytest.approx(
+            np.sqrt(mean_squared_error(part["y_true"], part["y_pred"]))
+        )
+        assert row.bias == pytest.approx(
+            np.mean(part["y_pred"] - part["y_true"])
+        )
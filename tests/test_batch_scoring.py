@@ -0,0 +1,22 @@
+import joblib
+
+from src.batch_scoring import read_submission, score_batch
+from src.benchmark import synthetic_weather_frame, train_small_pipeline
+
+
+def test_rescoring_replaces_earlier_parts(tmp_path):
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(train_small_pipeline(n_rows=2000, n_estimators=10), model_path)
+
+    source = tmp_path / "test.csv"
+    synthetic_weather_frame(44 * 30, seed=4).to_csv(source, index=False)
+    output_dir = tmp_path / "scored"
+
+    score_batch([source], model_path, output_dir, chunksize=200)
+    first = read_submission(output_dir)
+
+    # Fewer, larger chunks: the parts of the first run must not survive.
+    score_batch([source], model_path, output_dir, chunksize=1000)
+    assert len(list(output_dir.glob("tahun=*/part-*.csv"))) == 2
+    assert read_submission(output_dir).equals(first)
+    assert not (tmp_path / ".scored.partial").exists()
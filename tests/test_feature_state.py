@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.benchmark import synthetic_weather_frame
+from src.feature_state import FeatureStateStore
+from src.features import LAG_COLUMNS, FusedFeatures
+
+SEQUENCE_COLUMNS = [
+    "mean_temperature_c_lag1",
+    "highest_60_min_rainfall_mm_lag1",
+    "mean_wind_speed_kmh_lag1",
+    "mean_temp_roll_7d",
+    "max_rain_roll_3d",
+    "mean_wind_roll_7d",
+]
+
+
+def _rows(location, dates, value):
+    return pd.DataFrame({
+        "location": location,
+        "date": dates,
+        **{col: value for col in LAG_COLUMNS},
+    })
+
+
+@pytest.fixture
+def store():
+    dates = pd.date_range("2020-01-01", periods=5).strftime("%Y-%m-%d")
+    return FeatureStateStore(history_days=3).update(
+        _rows("A", dates, np.arange(5.0))
+    )
+
+
+def test_update_keeps_last_days_and_ignores_older_rows(store):
+    history = store.history(["A"], ["2020-01-06"])
+    assert history["date"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2020-01-03", "2020-01-04", "2020-01-05"
+    ]
+    assert history["mean_temperature_c"].tolist() == [2.0, 3.0, 4.0]
+
+    store.update(_rows("A", ["2020-01-02"], 99.0))
+    store.update(_rows("A", ["2020-01-05"], 7.0))
+    history = store.history(["A"], ["2020-01-06"])
+    assert history["mean_temperature_c"].tolist() == [2.0, 3.0, 7.0]
+
+
+def test_history_only_uses_days_before_the_request(store):
+    # Strictly before the earliest requested date, per location.
+    history = store.history(["A", "A"], ["2020-01-05", "2020-01-07"])
+    assert history["mean_temperature_c"].tolist() == [2.0, 3.0]
+
+    assert store.history(["A"], ["2020-01-01"]).empty
+    assert store.history(["B"], ["2020-01-06"]).empty
+
+
+def test_history_skips_missing_days(store):
+    # 2020-01-06 missing, request on 2020-01-08: the last rows that
+    # exist, as training lags see them, with no NaN padding.
+    history = store.history(["A"], ["2020-01-08"])
+    assert history["date"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2020-01-03", "2020-01-04", "2020-01-05"
+    ]
+    assert not history[LAG_COLUMNS].isna().any().any()
+
+
+def test_revision_changes_only_with_the_buffer(store):
+    before = store.revision(["A", "B"])
+    store.update(_rows("A", ["2020-01-05"], 4.0))
+    store.update(_rows("A", ["2020-01-01"], 0.0))
+    assert store.revision(["A", "B"]) == before
+
+    store.update(_rows("A", ["2020-01-06"], 5.0))
+    assert store.revision(["A"])[0] == before[0] + 1
+    assert store.revision(["B"]) == before[1:]
+
+
+def test_snapshot_restore_round_trip(store, tmp_path):
+    path = tmp_path / "state.npz"
+    store.snapshot(path)
+    restored = FeatureStateStore.restore(path)
+
+    assert len(restored) == len(store)
+    pd.testing.assert_frame_equal(
+        restored.history(["A"], ["2020-01-06"]),
+        store.history(["A"], ["2020-01-06"])
+    )
+
+
+def test_single_row_matches_training_features_with_gaps():
+    frame = synthetic_weather_frame(44 * 40, seed=1)
+    # The scored station has missing days inside its history window.
+    location = frame["location"].iloc[-1]
+    missing = (frame["location"] == location) & frame["date"].isin(
+        ["2009-02-05", "2009-02-07"]
+    )
+    frame = frame.loc[~missing].reset_index(drop=True)
+
+    features = FusedFeatures(group_col="location").fit(frame)
+    expected = features.transform(frame).iloc[[-1]]
+
+    state = FeatureStateStore().seed(frame.iloc[:-1])
+    online = FusedFeatures.from_medians(
+        features.loc_median_, features.global_median_, state=state
+    )
+    got = online.transform(frame.iloc[[-1]])
+
+    np.testing.assert_allclose(
+        got[SEQUENCE_COLUMNS].to_numpy(float),
+        expected[SEQUENCE_COLUMNS].to_numpy(float)
+    )
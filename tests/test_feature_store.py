@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from src.benchmark import synthetic_weather_frame
+from src.feature_store import FeatureStore
+from src.features import FusedFeatures
+
+
+@pytest.fixture
+def frame():
+    return synthetic_weather_frame(44 * 20, seed=2)
+
+
+@pytest.fixture
+def features(frame):
+    return FusedFeatures(group_col="location").fit(frame)
+
+
+def test_materialize_rejects_duplicate_keys(tmp_path, frame, features):
+    duplicated = pd.concat([frame, frame.iloc[[5]]], ignore_index=True)
+    with pytest.raises(ValueError, match="duplicate"):
+        FeatureStore(tmp_path, features).materialize(duplicated)
+
+
+def test_append_rejects_duplicate_keys_within_new_rows(tmp_path, frame,
+                                                       features):
+    store = FeatureStore(tmp_path, features).materialize(frame.iloc[:440])
+    new = frame.iloc[440:]
+    with pytest.raises(ValueError, match="duplicate"):
+        store.append(pd.concat([new, new.iloc[[0]]]), context=frame.iloc[:440])
+    assert len(store) == 440
+
+
+def test_get_returns_materialized_rows_in_request_order(tmp_path, frame,
+                                                        features):
+    store = FeatureStore(tmp_path, features).materialize(frame)
+    expected = features.transform(frame)
+
+    rows = [30, 2, 500, 2]
+    got = store.get(frame["location"].iloc[rows], frame["date"].iloc[rows])
+    pd.testing.assert_frame_equal(
+        got, expected.iloc[rows].reset_index(drop=True), check_dtype=False
+    )
+    assert store.contains(frame["location"].iloc[0], frame["date"].iloc[0])
+
+    with pytest.raises(KeyError):
+        store.get(["Nowhere"], ["2009-01-01"])
+
+
+def test_append_with_context_matches_one_transform(tmp_path, frame,
+                                                   features):
+    store = FeatureStore(tmp_path, features).materialize(frame.iloc[:440])
+    assert store.append(frame.iloc[440:], context=frame.iloc[:440]) == 440
+    assert store.append(frame.iloc[400:], context=frame) == 0
+
+    pd.testing.assert_frame_equal(
+        store.get_frame(frame),
+        features.transform(frame).reset_index(drop=True),
+        check_dtype=False
+    )
+
+    # Reopened from disk, parts memory-mapped.
+    reopened = FeatureStore(tmp_path, features)
+    assert len(reopened) == len(frame) and len(reopened._parts) == 2
+
+
+def test_refitted_features_get_their_own_version(tmp_path, frame, features):
+    FeatureStore(tmp_path, features).materialize(frame)
+    refit = FusedFeatures(group_col="location").fit(frame.iloc[:300])
+    assert not FeatureStore(tmp_path, refit).exists
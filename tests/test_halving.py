@@ -0,0 +1,29 @@
+from src.halving import _scale_rounds
+
+ROUNDS = {
+    "model__classifier__n_estimators": 300,
+    "model__regressor__n_estimators": 600,
+}
+
+
+def test_scales_the_base_rounds():
+    assert _scale_rounds({"model__gate_epsilon": 0.1}, ROUNDS, 1 / 3) == {
+        "model__gate_epsilon": 0.1,
+        "model__classifier__n_estimators": 100,
+        "model__regressor__n_estimators": 200,
+    }
+
+
+def test_scales_a_candidate_own_rounds():
+    params = {"model__regressor__n_estimators": 900}
+    assert _scale_rounds(params, ROUNDS, 1 / 3) == {
+        "model__classifier__n_estimators": 100,
+        "model__regressor__n_estimators": 300,
+    }
+    assert _scale_rounds(params, ROUNDS, 1.0)[
+        "model__regressor__n_estimators"
+    ] == 900
+
+
+def test_keeps_at_least_one_round():
+    assert _scale_rounds({}, {"n_estimators": 2}, 0.01) == {"n_estimators": 1}
@@ -0,0 +1,24 @@
+import pickle
+
+import numpy as np
+
+from src.benchmark import synthetic_weather_frame, train_small_pipeline
+from src.model import build_pipeline, prune_feature_pipeline
+
+
+def test_prune_twice_unfitted():
+    pipe = build_pipeline(prune_features=True, profile=False)
+    steps = list(pipe.named_steps["features"].steps)
+    prune_feature_pipeline(pipe)
+    assert pipe.named_steps["features"].steps == steps
+
+
+def test_prune_saved_pruned_model():
+    pipe = train_small_pipeline(n_rows=2000, n_estimators=10,
+                                prune_features=True)
+    X = synthetic_weather_frame(200, seed=3)
+    expected = pipe.predict(X)
+
+    # What load_model does with a model that was saved pruned.
+    loaded = prune_feature_pipeline(pickle.loads(pickle.dumps(pipe)))
+    np.testing.assert_allclose(loaded.predict(X), expected)
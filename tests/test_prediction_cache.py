@@ -0,0 +1,86 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from src.app_service import PredictionCache, predict_rainfall
+from src.benchmark import synthetic_weather_frame, train_small_pipeline
+from src.feature_state import FeatureStateStore
+from src.model import attach_feature_state
+
+N_ROWS = 3000
+
+
+@pytest.fixture(scope="module")
+def history():
+    return synthetic_weather_frame(N_ROWS)
+
+
+@pytest.fixture
+def served(history):
+    state = FeatureStateStore().seed(history)
+    model = attach_feature_state(
+        train_small_pipeline(N_ROWS, n_estimators=20), state
+    )
+    return model, state
+
+
+@pytest.fixture
+def request_row(history):
+    # The day after the seeded history: reads the feature state.
+    last = history.iloc[[-1]].copy()
+    return last.assign(
+        date=(pd.Timestamp(last["date"].iloc[0]) + pd.Timedelta(days=1))
+        .strftime("%Y-%m-%d")
+    )
+
+
+def test_cached_prediction_equals_full_pipeline(served, request_row):
+    model, _ = served
+    cache = PredictionCache(max_entries=100, ttl_seconds=3600)
+    expected = predict_rainfall(model, request_row)
+
+    assert predict_rainfall(model, request_row, cache, version="v1") == expected
+    assert predict_rainfall(model, request_row, cache, version="v1") == expected
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_follows_the_feature_state(served, request_row):
+    model, state = served
+    cache = PredictionCache()
+    before = cache.key("v1", model, request_row)
+    assert cache.key("v1", model, request_row.copy()) == before
+
+    state.update(request_row.assign(mean_temperature_c=35.0))
+    after = cache.key("v1", model, request_row)
+    assert after != before
+
+    # Re-sending the same observation keeps the key.
+    state.update(request_row.assign(mean_temperature_c=35.0))
+    assert cache.key("v1", model, request_row) == after
+
+
+def test_model_swap_invalidates_the_version(served, history):
+    model, _ = served
+    cache = PredictionCache()
+    for i in range(3):
+        predict_rainfall(model, history.iloc[[i]], cache, version="v1")
+    assert cache.stats()["entries"] == 3
+
+    cache.key("v1", copy.deepcopy(model), history.iloc[[0]])
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_and_lru_bound(served, history):
+    model, _ = served
+    now = [0.0]
+    cache = PredictionCache(max_entries=3, ttl_seconds=10,
+                            clock=lambda: now[0])
+    keys = [cache.key("v1", model, history.iloc[[i]]) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, float(i))
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[4]) == 4.0
+    now[0] = 11.0
+    assert cache.get(keys[4]) is None
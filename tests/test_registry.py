@@ -0,0 +1,50 @@
+import threading
+
+from src.registry import ModelRegistry
+
+
+def test_shadow_work_is_bounded_and_drops_are_counted():
+    release = threading.Event()
+    registry = ModelRegistry(
+        loader=str, versions={"a": "a", "b": "b"}, default="a",
+        shadow="b", shadow_fraction=1.0, shadow_max_pending=2
+    )
+
+    def predict(model):
+        release.wait()
+        return 1.0
+
+    futures = [registry.shadow(predict, 1.0) for _ in range(5)]
+    assert sum(f is not None for f in futures) == 2
+    assert registry.stats()["shadow"]["dropped"] == 3
+
+    release.set()
+    for future in filter(None, futures):
+        future.result()
+    assert registry.shadow(predict, 1.0).result()["shadow"] == 1.0
+    assert registry.stats()["shadow"]["samples"] == 3
+    registry.close()
+
+
+def test_register_during_load_does_not_store_the_stale_model():
+    started, release = threading.Event(), threading.Event()
+
+    def loader(path):
+        if str(path) == "old":
+            started.set()
+            release.wait()
+        return str(path)
+
+    registry = ModelRegistry(loader, versions={"a": "old"}, default="a")
+    result = []
+    thread = threading.Thread(target=lambda: result.append(registry.get("a")))
+    thread.start()
+    started.wait()
+
+    registry.register("a", "new")
+    release.set()
+    thread.join()
+
+    assert result == ["old"]
+    assert registry.get("a") == "new"
+    registry.close()
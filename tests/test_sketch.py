@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.sketch import MedianSketch
+
+ACCURACY = 0.01
+
+
+def _frame(seed, n=20_000):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "location": np.array(["A", "B", "C"])[rng.integers(0, 3, n)],
+        "rain": rng.exponential(5.0, n) * (rng.random(n) < 0.6),
+        "temperature": rng.normal(27.0, 2.0, n),
+        "wind": -rng.gamma(2.0, 3.0, n),
+    })
+    frame.loc[rng.random(n) < 0.1, "temperature"] = np.nan
+    return frame
+
+
+def _within(got, expected):
+    return np.all(
+        np.abs(got - expected) <= ACCURACY * np.abs(expected) + 1e-12
+    )
+
+
+def test_merged_sketches_equal_one_sketch_and_stay_accurate():
+    chunks = [_frame(seed) for seed in range(4)]
+    full = pd.concat(chunks, ignore_index=True)
+
+    merged = MedianSketch(ACCURACY)
+    for chunk in chunks:
+        merged.merge(MedianSketch(ACCURACY).update(chunk))
+    single = MedianSketch(ACCURACY).update(full)
+
+    loc_median, global_median = merged.medians()
+    single_loc, single_global = single.medians()
+    pd.testing.assert_frame_equal(loc_median, single_loc)
+    pd.testing.assert_series_equal(global_median, single_global)
+    assert merged.n_rows_ == len(full)
+
+    columns = ["rain", "temperature", "wind"]
+    expected_loc = full.groupby("location")[columns].median()
+    assert _within(loc_median[columns].to_numpy(), expected_loc.to_numpy())
+    assert _within(
+        global_median[columns].to_numpy(), full[columns].median().to_numpy()
+    )
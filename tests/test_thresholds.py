@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix, f1_score
+
+from src.thresholds import OVERALL, threshold_sweep
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    y = rng.random(5000) < 0.4
+    proba = np.clip(0.4 * y + rng.normal(0.3, 0.2, len(y)), 0, 1)
+    groups = np.array(["A", "B", "C"])[rng.integers(0, 3, len(y))]
+    return y, proba, groups
+
+
+def _counts(y, predicted):
+    tn, fp, fn, tp = confusion_matrix(y, predicted, labels=[False, True]).ravel()
+    return [tp, fp, fn, tn]
+
+
+@pytest.mark.parametrize("thresholds", [101, None, [0.0, 0.3, 0.5, 1.0]])
+def test_counts_match_confusion_matrix(scores, thresholds):
+    y, proba, _ = scores
+    sweep = threshold_sweep(y, proba, thresholds=thresholds)
+
+    if thresholds is None:
+        assert len(sweep) == len(np.unique(proba))
+    for row in sweep.sample(20, random_state=0, replace=True).itertuples():
+        predicted = proba >= row.threshold
+        assert [row.tp, row.fp, row.fn, row.tn] == _counts(y, predicted)
+        assert row.f1 == pytest.approx(
+            f1_score(y, predicted, zero_division=0)
+        )
+
+
+def test_groups_match_confusion_matrix(scores):
+    y, proba, groups = scores
+    sweep = threshold_sweep(y, proba, thresholds=11, groups=groups)
+    assert set(sweep["location"]) == {"A", "B", "C", OVERALL}
+
+    for row in sweep.itertuples():
+        rows = (
+            np.ones(len(y), bool) if row.location == OVERALL
+            else groups == row.location
+        )
+        predicted = proba[rows] >= row.threshold
+        assert [row.tp, row.fp, row.fn, row.tn] == _counts(y[rows], predicted)
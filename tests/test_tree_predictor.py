@@ -0,0 +1,119 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.benchmark import synthetic_weather_frame, train_small_pipeline
+from src.model import build_pipeline, inference_data
+from src.numeric import build_numeric_pipeline
+from src.profiling import ProfiledStep, profile_pipeline
+from src.tree_predictor import compile_pipeline, compiled_pipeline
+
+# XGBoost accumulates leaf values in float32.
+RTOL, ATOL = 1e-5, 1e-4
+
+
+@pytest.fixture(scope="module", params=["onehot", "native"])
+def pipeline(request):
+    pipe = train_small_pipeline(
+        n_rows=3000, n_estimators=30, location_encoding=request.param
+    )
+    return build_numeric_pipeline(pickle.loads(pickle.dumps(pipe)))
+
+
+@pytest.fixture(scope="module")
+def X():
+    return synthetic_weather_frame(500, seed=7)
+
+
+@pytest.mark.parametrize("gate_epsilon", [None, 0.3])
+def test_compiled_matches_booster(pipeline, X, gate_epsilon):
+    pipeline.named_steps["model"].set_params(gate_epsilon=gate_epsilon)
+    expected = pipeline.predict(X)
+
+    np.testing.assert_allclose(
+        compile_pipeline(pipeline).predict(X), expected, rtol=RTOL, atol=ATOL
+    )
+    np.testing.assert_allclose(
+        compiled_pipeline(pipeline).predict(X), expected,
+        rtol=RTOL, atol=ATOL
+    )
+    if gate_epsilon:
+        assert (expected == 0).any()
+
+
+def test_cached_tables_follow_gate_and_refit(pipeline, X):
+    model = pipeline.named_steps["model"]
+    model.set_params(gate_epsilon=None)
+    first = compiled_pipeline(pipeline).named_steps["model"]
+    assert compiled_pipeline(pipeline).named_steps["model"].classifier \
+        is first.classifier
+
+    model.set_params(gate_epsilon=0.5)
+    gated = compiled_pipeline(pipeline)
+    assert gated.named_steps["model"].classifier is first.classifier
+    np.testing.assert_allclose(
+        gated.predict(X), pipeline.predict(X), rtol=RTOL, atol=ATOL
+    )
+
+    # Refit in place on other data: new boosters, new tables.
+    train = synthetic_weather_frame(2000, seed=3, with_target=True)
+    matrix = pipeline[:-1].transform(
+        train.drop(columns=["daily_rainfall_total_mm"])
+    )
+    model.fit(matrix, train["daily_rainfall_total_mm"].to_numpy())
+    refit = compiled_pipeline(pipeline)
+    assert refit.named_steps["model"].classifier is not first.classifier
+    np.testing.assert_allclose(
+        refit.predict(X), pipeline.predict(X), rtol=RTOL, atol=ATOL
+    )
+
+
+def test_compiled_step_is_inference_only(pipeline):
+    compiled = compile_pipeline(pipeline)
+    assert not hasattr(compiled, "fit")
+    assert not hasattr(compiled.named_steps["model"], "fit")
+
+
+def _fit_pipeline(**params):
+    train = synthetic_weather_frame(3000, seed=0, with_target=True)
+    pipe = build_pipeline(profile=False, **params)
+    pipe.set_params(**{
+        key: 20 for key in pipe.get_params()
+        if key.endswith("n_estimators")
+    })
+    return pipe.fit(
+        train.drop(columns=["daily_rainfall_total_mm"]),
+        train["daily_rainfall_total_mm"]
+    )
+
+
+def test_compiled_log_target_regressor(X):
+    pipe = _fit_pipeline(transform_target=True)
+    np.testing.assert_allclose(
+        compiled_pipeline(pipe).predict(X), pipe.predict(X),
+        rtol=RTOL, atol=ATOL
+    )
+
+
+def test_compiled_profiled_model(X):
+    pipe = profile_pipeline(_fit_pipeline(transform_target=True))
+    assert isinstance(pipe.named_steps["model"], ProfiledStep)
+    np.testing.assert_allclose(
+        compile_pipeline(pipe).predict(X), pipe.predict(X),
+        rtol=RTOL, atol=ATOL
+    )
+    np.testing.assert_allclose(
+        compiled_pipeline(pipe).predict(X), pipe.predict(X),
+        rtol=RTOL, atol=ATOL
+    )
+
+
+def test_other_final_steps_keep_the_sklearn_path(X):
+    pipe = _fit_pipeline(model_type="regressor")
+    assert compile_pipeline(pipe) is pipe
+    assert compiled_pipeline(pipe) is pipe
+    np.testing.assert_allclose(
+        inference_data(pipe, X, return_dataframe=False, backend="numpy"),
+        inference_data(pipe, X, return_dataframe=False)
+    )